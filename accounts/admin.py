@@ -1,6 +1,6 @@
 # accounts/admin.py
 from django.contrib import admin
-from .models import Profile, Notification
+from .models import Profile, Notification, NotificationFanout
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
@@ -44,3 +44,13 @@ class NotificationAdmin(admin.ModelAdmin):
     def message_short(self, obj):
         return (obj.message[:60] + "…") if len(obj.message) > 60 else obj.message
     message_short.short_description = "Mensaje"
+
+@admin.register(NotificationFanout)
+class NotificationFanoutAdmin(admin.ModelAdmin):
+    list_display = ("message_short", "sent", "last_user_id", "created", "finished_at")
+    list_filter = ("finished_at",)
+    readonly_fields = ("last_user_id", "sent", "created", "finished_at")
+
+    def message_short(self, obj):
+        return (obj.message[:60] + "…") if len(obj.message) > 60 else obj.message
+    message_short.short_description = "Mensaje"
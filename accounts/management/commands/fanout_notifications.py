@@ -0,0 +1,33 @@
+# accounts/management/commands/fanout_notifications.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.notifications import BATCH_SIZE, run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de NotificationFanout: crea en lotes las notificaciones de "
+        "los avisos masivos pendientes (se puede reiniciar sin duplicar)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Reparte lo pendiente y termina.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Segundos de espera cuando no hay trabajos pendientes.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            created = run_pending(batch_size=options["batch_size"])
+            if created:
+                self.stdout.write(f"notificaciones={created}")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,15 @@
+# accounts/management/commands/rebuild_unread_counters.py
+from django.core.management.base import BaseCommand
+
+from accounts.notifications import recount_unread
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula Profile.unread_notifications a partir de las "
+        "notificaciones no leídas y limpia su caché."
+    )
+
+    def handle(self, *args, **options):
+        profiles = recount_unread()
+        self.stdout.write(self.style.SUCCESS(f"Contadores recalculados: {profiles} perfiles."))
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.14 on 2026-10-18 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_remove_profile_fav_artifact_remove_profile_gamertag_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationFanout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField()),
+                ('last_user_id', models.PositiveBigIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created'],
+            },
+        ),
+    ]
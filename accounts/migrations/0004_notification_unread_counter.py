@@ -0,0 +1,36 @@
+# Generated by Django 4.2.14 on 2026-10-18 08:38
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_unread(apps, schema_editor):
+    Profile = apps.get_model("accounts", "Profile")
+    Notification = apps.get_model("accounts", "Notification")
+    counts = (
+        Notification.objects.filter(is_read=False)
+        .values("user_id")
+        .annotate(n=Count("id"))
+    )
+    for row in counts:
+        Profile.objects.filter(user_id=row["user_id"]).update(unread_notifications=row["n"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_notification_fanout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', 'created'], name='notif_user_read_created'),
+        ),
+        migrations.RunPython(fill_unread, migrations.RunPython.noop),
+    ]
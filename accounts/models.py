@@ -1,7 +1,10 @@
 # accounts/models.py
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 
 def avatar_upload_to(instance, filename):
@@ -32,6 +35,9 @@ class Profile(models.Model):
     )
     avatar = models.ImageField(upload_to=avatar_upload_to, blank=True, null=True)
 
+    # Contador desnormalizado de Notification no leídas (ver accounts/notifications.py)
+    unread_notifications = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return self.display_name or self.user.username
 
@@ -43,10 +49,75 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            # Bandeja (user, -created) y no leídas (user, is_read) con el mismo índice
+            models.Index(fields=['user', 'is_read', 'created'], name='notif_user_read_created'),
+        ]
 
     def __str__(self):
         return f'Notif({self.user.username}): {self.message[:32]}'
 
+def unread_cache_key(user_id):
+    return f'notif-unread:{user_id}'
+
+def bump_unread(user_ids, delta):
+    """Suma `delta` al contador de no leídas (nunca por debajo de 0) e invalida la caché."""
+    user_ids = list(user_ids)
+    if not user_ids or not delta:
+        return
+    Profile.objects.filter(user_id__in=user_ids).update(
+        unread_notifications=Greatest(F('unread_notifications') + delta, 0)
+    )
+    keys = [unread_cache_key(uid) for uid in user_ids]
+    cache.delete_many(keys)
+    # Por si alguien leyó el valor viejo antes de que la transacción terminara
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+@receiver(pre_save, sender=Notification)
+def remember_unread_state(sender, instance, raw=False, **kwargs):
+    # Edición (admin, .save() sobre una existente): cómo estaba antes
+    instance._unread_before = None
+    if instance.pk and not raw:
+        instance._unread_before = Notification.objects.filter(pk=instance.pk) \
+                                                      .values_list('user_id', 'is_read').first()
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, raw=False, **kwargs):
+    # bulk_create / update() no emiten señales: quien los use llama a bump_unread
+    if raw:
+        return
+    before = None if created else getattr(instance, '_unread_before', None)
+    was_unread = before is not None and not before[1]
+    if was_unread and (before[0] != instance.user_id or instance.is_read):
+        bump_unread([before[0]], -1)
+    if not instance.is_read and (not was_unread or before[0] != instance.user_id):
+        bump_unread([instance.user_id], 1)
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        bump_unread([instance.user_id], -1)
+
+class NotificationFanout(models.Model):
+    """
+    Aviso para todos los usuarios, repartido en segundo plano por
+    `manage.py fanout_notifications`. `last_user_id` es el cursor: cada lote
+    inserta las notificaciones de los usuarios con id > last_user_id y avanza
+    el cursor en la misma transacción, así un worker caído retoma sin duplicar.
+    """
+    message      = models.TextField()
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    sent         = models.PositiveIntegerField(default=0)
+    created      = models.DateTimeField(auto_now_add=True)
+    finished_at  = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created']
+
+    def __str__(self):
+        state = 'terminado' if self.finished_at else f'{self.sent} enviados'
+        return f'Fanout({state}): {self.message[:32]}'
+
 @receiver(post_save, sender=User)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
     # Al crear un User, crea Profile automáticamente.
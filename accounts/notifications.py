@@ -0,0 +1,112 @@
+# accounts/notifications.py
+"""
+Notificaciones masivas (fan-out on write).
+
+broadcast(message) sólo crea un NotificationFanout (O(1) en la petición);
+el worker `manage.py fanout_notifications` recorre los ids de User con un
+cursor keyset y crea las filas Notification en lotes acotados, de modo que
+la memoria no depende del número de usuarios.
+
+El contador de no leídas vive en Profile.unread_notifications (lo mantienen
+las señales de models.py, bump_unread y mark_read) y se cachea por usuario.
+Si se desvía (update() a mano, datos importados), recount_unread() o
+`manage.py rebuild_unread_counters` lo recalculan.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Notification, NotificationFanout, Profile, bump_unread, unread_cache_key
+
+BATCH_SIZE = 1000
+UNREAD_CACHE_TIMEOUT = 10 * 60
+
+
+def unread_count(user) -> int:
+    """No leídas de `user`; sin consulta mientras la caché siga válida."""
+    if not user.is_authenticated:
+        return 0
+    key = unread_cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Profile.objects.filter(user_id=user.pk) \
+                               .values_list("unread_notifications", flat=True) \
+                               .first() or 0
+        cache.set(key, count, UNREAD_CACHE_TIMEOUT)
+    return count
+
+
+def mark_read(user, ids=None) -> int:
+    """Marca como leídas las de `user` (sólo `ids` si se indican) y ajusta el contador."""
+    qs = Notification.objects.filter(user=user, is_read=False)
+    if ids is not None:
+        qs = qs.filter(pk__in=list(ids))
+    with transaction.atomic():
+        updated = qs.update(is_read=True)
+        bump_unread([user.pk], -updated)
+    return updated
+
+
+def recount_unread(user_ids=None) -> int:
+    """Recalcula el contador desde Notification (todos los perfiles si no hay `user_ids`)."""
+    unread = (
+        Notification.objects.filter(user=OuterRef("user"), is_read=False)
+        .order_by()
+        .values("user")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    qs = Profile.objects.all()
+    if user_ids is not None:
+        qs = qs.filter(user_id__in=list(user_ids))
+    with transaction.atomic():
+        updated = qs.update(
+            unread_notifications=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+        )
+        keys = [unread_cache_key(uid) for uid in qs.values_list("user_id", flat=True)]
+        cache.delete_many(keys)
+    return updated
+
+
+def broadcast(message: str) -> NotificationFanout:
+    return NotificationFanout.objects.create(message=message)
+
+
+def fanout_batch(job_id: int, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Inserta el siguiente lote de `job_id`. Devuelve cuántas notificaciones
+    creó (0 cuando el trabajo ya estaba terminado).
+    """
+    with transaction.atomic():
+        # El bloqueo evita que dos workers repartan el mismo tramo
+        job = NotificationFanout.objects.select_for_update().get(pk=job_id)
+        if job.finished_at:
+            return 0
+
+        user_ids = list(
+            User.objects.filter(pk__gt=job.last_user_id)
+                        .order_by("pk")
+                        .values_list("pk", flat=True)[:batch_size]
+        )
+        Notification.objects.bulk_create(
+            [Notification(user_id=uid, message=job.message) for uid in user_ids],
+            batch_size=batch_size,
+        )
+        bump_unread(user_ids, 1)
+        if user_ids:
+            job.last_user_id = user_ids[-1]
+            job.sent += len(user_ids)
+        if len(user_ids) < batch_size:
+            job.finished_at = timezone.now()
+        job.save(update_fields=["last_user_id", "sent", "finished_at"])
+        return len(user_ids)
+
+
+def run_pending(batch_size: int = BATCH_SIZE) -> int:
+    """Un lote de cada trabajo pendiente (reparto justo entre avisos)."""
+    pending = NotificationFanout.objects.filter(finished_at__isnull=True) \
+                                        .values_list("pk", flat=True)
+    return sum(fanout_batch(job_id, batch_size) for job_id in list(pending))
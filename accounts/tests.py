@@ -1,3 +1,71 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Notification, NotificationFanout
+from .notifications import broadcast, fanout_batch, run_pending, unread_count
+
+
+class NotificationFanoutTests(TestCase):
+    def test_fanout_runs_in_batches_and_resumes_without_duplicates(self):
+        users = [User.objects.create(username=f"u{i}") for i in range(5)]
+        job = broadcast("Nueva noticia: Parche 1.2")
+        self.assertFalse(Notification.objects.exists())
+
+        # Un lote y el worker "se cae": el cursor quedó guardado
+        self.assertEqual(fanout_batch(job.pk, batch_size=2), 2)
+        job.refresh_from_db()
+        self.assertEqual(job.last_user_id, users[1].pk)
+
+        while run_pending(batch_size=2):
+            pass
+        job.refresh_from_db()
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(job.sent, 5)
+        self.assertEqual(
+            sorted(Notification.objects.values_list("user_id", flat=True)),
+            [u.pk for u in users],
+        )
+        self.assertEqual(fanout_batch(job.pk), 0)
+        self.assertEqual(NotificationFanout.objects.filter(finished_at__isnull=True).count(), 0)
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("lector", password="x")
+        self.client.force_login(self.user)
+
+    def test_counter_follows_inserts_fanout_and_mark_read(self):
+        Notification.objects.create(user=self.user, message="hola")
+        self.assertEqual(unread_count(self.user), 1)
+
+        job = broadcast("Nueva noticia")
+        fanout_batch(job.pk)
+        self.assertEqual(unread_count(self.user), 2)
+
+        # Sólo sesión + usuario: el contador sale de la caché
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get("/accounts/notifications/badge/").json(), {"unread": 2})
+
+        r = self.client.get("/accounts/notifications/", HTTP_HX_REQUEST="true")
+        self.assertContains(r, "Nueva noticia")
+        self.assertEqual(unread_count(self.user), 0)
+        self.assertFalse(Notification.objects.filter(user=self.user, is_read=False).exists())
+
+    def test_editing_is_read_adjusts_counter_and_rebuild_fixes_drift(self):
+        n = Notification.objects.create(user=self.user, message="hola")
+        n.is_read = True
+        n.save()                        # p. ej. desde el admin
+        self.assertEqual(unread_count(self.user), 0)
+        n.is_read = False
+        n.save()
+        self.assertEqual(unread_count(self.user), 1)
+
+        Notification.objects.update(is_read=True)   # sin señales
+        self.assertEqual(unread_count(self.user), 1)
+        call_command("rebuild_unread_counters", stdout=StringIO())
+        self.assertEqual(unread_count(self.user), 0)
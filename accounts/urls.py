@@ -1,6 +1,6 @@
 # accounts/urls.py
 from django.urls import path
-from .views import register_view, ProfileView, profile_edit, notifications_list
+from .views import register_view, ProfileView, profile_edit, notifications_list, notifications_badge
 
 app_name = 'accounts'
 
@@ -9,4 +9,5 @@ urlpatterns = [
     path('profile/', ProfileView.as_view(), name='profile'),
     path('profile/edit/', profile_edit, name='profile_edit'),
     path('notifications/', notifications_list, name='notifications'),
+    path('notifications/badge/', notifications_badge, name='notifications_badge'),
 ]
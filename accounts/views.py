@@ -5,8 +5,14 @@ from django.contrib.auth import login
 from django.views.generic import TemplateView
 from django.contrib import messages
 from django.contrib.auth.models import User
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from core.pagination import paginate_cursor
 from .forms import RegisterForm, ProfileForm
 from .models import Notification
+from .notifications import mark_read, unread_count
+
+NOTIFICATIONS_PER_PAGE = 20
 
 class ProfileView(TemplateView):
     template_name = 'accounts/profile.html'
@@ -21,7 +27,7 @@ class ProfileView(TemplateView):
         # últimas 10 notificaciones
         ctx['notifications'] = Notification.objects.filter(user=u).order_by('-created')[:10]
         # contador de no leídas (para el template)
-        ctx['unread_count'] = Notification.objects.filter(user=u, is_read=False).count()
+        ctx['unread_count'] = unread_count(u)
         return ctx
 
 @login_required
@@ -52,7 +58,19 @@ def register_view(request):
 
 @login_required
 def notifications_list(request):
-    items = Notification.objects.filter(user=request.user).order_by('-created')
-    # marca como leídas al entrar
-    items.filter(is_read=False).update(is_read=True)
-    return render(request, 'accounts/notifications.html', {'items': items})
+    items = Notification.objects.filter(user=request.user)
+    page_obj = paginate_cursor(request, items, NOTIFICATIONS_PER_PAGE, ordering=('-created', '-id'))
+    # marca como leídas sólo las que se muestran
+    mark_read(request.user, [n.pk for n in page_obj if not n.is_read])
+    ctx = {'items': page_obj, 'page_obj': page_obj}
+    if request.htmx:
+        return render(request, 'accounts/_notification_list.html', ctx)
+    return render(request, 'accounts/notifications.html', ctx)
+
+@never_cache
+def notifications_badge(request):
+    """Contador para la cabecera: JSON, o el fragmento del badge si es HTMX."""
+    count = unread_count(request.user)
+    if request.htmx:
+        return render(request, 'accounts/_notification_badge.html', {'unread_count': count})
+    return JsonResponse({'unread': count})
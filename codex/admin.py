@@ -2,7 +2,7 @@
 from django.contrib import admin
 from .models import (
     Domain, LoreEntry, Artifact, Character, CharacterAnimation,
-    Enemy, EnemyAnimation, Trap, Guide, Asset
+    Enemy, EnemyAnimation, Trap, Guide, Asset, SyncOutbox, MediaJob
 )
 
 @admin.register(Domain)
@@ -69,3 +69,17 @@ class AssetAdmin(admin.ModelAdmin):
     list_display = ("file", "kind", "caption")
     list_filter = ("kind",)
     search_fields = ("caption", "file")
+
+@admin.register(SyncOutbox)
+class SyncOutboxAdmin(admin.ModelAdmin):
+    list_display = ("collection", "doc_id", "op", "attempts", "next_attempt_at", "last_error")
+    list_filter = ("collection", "op")
+    search_fields = ("doc_id", "last_error")
+    readonly_fields = ("collection", "doc_id", "op", "object_id", "version", "attempts", "last_error")
+
+
+@admin.register(MediaJob)
+class MediaJobAdmin(admin.ModelAdmin):
+    list_display = ("model", "object_id", "attempts", "next_attempt_at", "last_error")
+    list_filter = ("model",)
+    readonly_fields = ("model", "object_id", "version", "attempts", "last_error")
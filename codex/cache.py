@@ -0,0 +1,127 @@
+# codex/cache.py
+"""
+Caché de páginas del Códex.
+
+El Códex sólo se edita desde el admin, así que todo su contenido comparte
+una "versión" guardada en la caché. Cualquier save/delete/m2m de un modelo
+del Códex (ver codex/signals.py) la renueva con invalidate(): las claves
+de las páginas incluyen la versión, de modo que las viejas dejan de usarse
+y caducan solas. No hay que saber qué páginas muestran qué objeto.
+
+@codex_page, para las vistas:
+- ETag / Last-Modified a partir de la versión → 304 para quien repite.
+- Respuesta renderizada en caché por (versión, ruta, variante). La variante
+  es lo único de la página que depende del usuario: la barra de navegación
+  (anónimo / usuario / staff / superusuario); los fragmentos HTMX no la
+  llevan y se comparten entre todos.
+
+Funciona con cualquier backend de CACHES (local-memory, archivo, Redis);
+con varios procesos conviene uno compartido para que la versión sea común.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+VERSION_KEY = "codex:version"
+DEFAULT_TIMEOUT = 24 * 60 * 60
+
+
+def _new_version():
+    # Sin microsegundos: Last-Modified sólo tiene resolución de segundos
+    return {"token": uuid.uuid4().hex[:12], "at": timezone.now().replace(microsecond=0)}
+
+
+def content_version():
+    """(token, fecha) de la versión actual del contenido del Códex."""
+    data = cache.get(VERSION_KEY)
+    if data is None:
+        # Caché vacía o reiniciada: se estrena versión (todo lo anterior caduca)
+        cache.add(VERSION_KEY, _new_version(), None)
+        data = cache.get(VERSION_KEY) or _new_version()
+    return data["token"], data["at"]
+
+
+def bump_version():
+    cache.set(VERSION_KEY, _new_version(), None)
+
+
+def invalidate():
+    """Renueva la versión ya y otra vez al confirmar la transacción en curso."""
+    bump_version()
+    # Una petición pudo leer datos viejos entre el save y el commit y
+    # guardarlos con la versión nueva; el segundo cambio los descarta.
+    transaction.on_commit(bump_version)
+
+
+def _variant(request):
+    if request.htmx:
+        return "htmx"
+    user = request.user
+    if not user.is_authenticated:
+        return "anon"
+    if user.is_superuser:
+        return "superuser"
+    return "staff" if user.is_staff else "user"
+
+
+def _etag(request, *args, **kwargs):
+    token, _at = content_version()
+    return f'"{token}-{_variant(request)}-{request.LANGUAGE_CODE}"'
+
+
+def _last_modified(request, *args, **kwargs):
+    return content_version()[1]
+
+
+def page_key(request):
+    token, _at = content_version()
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"codex:page:{token}:{_variant(request)}:{request.LANGUAGE_CODE}:{path}"
+
+
+def _cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # get_token() en la plantilla: la respuesta lleva un token por usuario
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+    )
+
+
+def codex_page(view):
+    @wraps(view)
+    def cached(request, *args, **kwargs):
+        key = page_key(request)
+        hit = cache.get(key)
+        if hit is not None:
+            content, content_type = hit
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if request.method in ("GET", "HEAD") and _cacheable(request, response):
+            cache.set(
+                key,
+                (response.content, response["Content-Type"]),
+                getattr(settings, "CODEX_CACHE_TIMEOUT", DEFAULT_TIMEOUT),
+            )
+        return response
+
+    # condition() responde 304 sin llegar a `cached` si el cliente ya la tiene
+    conditional = condition(etag_func=_etag, last_modified_func=_last_modified)(cached)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional(request, *args, **kwargs)
+        patch_vary_headers(response, ("Cookie", "HX-Request", "Accept-Language"))
+        return response
+
+    return wrapper
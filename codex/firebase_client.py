@@ -1,12 +1,154 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+# codex/firebase_client.py
+"""
+Cliente de sincronización del Códex, elegido con settings.CODEX_SYNC_BACKEND:
+
+- "firestore": Firebase Admin real. Se inicializa en el primer uso (no al
+  importar), así manage.py, los tests y el arranque no tocan gRPC ni
+  necesitan el archivo de credenciales.
+- "in-memory": guarda los documentos en un dict (tests / desarrollo).
+- "null": acepta y descarta todas las escrituras.
+
+También acepta la ruta a una clase propia ("paquete.modulo.Clase").
+Todos exponen lo que usa codex.sync: collection(n).document(id) y
+batch() con set/delete/commit.
+"""
+import threading
+
 from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+# ─────────────────────────────────────────────────────────────
+# Firestore real (perezoso)
+# ─────────────────────────────────────────────────────────────
+class FirestoreClient:
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import firebase_admin
+                    from firebase_admin import credentials, firestore
+
+                    if not firebase_admin._apps:
+                        cred = credentials.Certificate(str(settings.FIREBASE_SERVICE_ACCOUNT))
+                        firebase_admin.initialize_app(cred, {
+                            "projectId": settings.FIREBASE_PROJECT_ID,
+                        })
+                    self._client = firestore.client()
+        return self._client
+
+    def collection(self, name):
+        return self._get().collection(name)
+
+    def batch(self):
+        return self._get().batch()
+
+
+# ─────────────────────────────────────────────────────────────
+# En memoria
+# ─────────────────────────────────────────────────────────────
+class _DocumentRef:
+    def __init__(self, client, collection, doc_id):
+        self.client = client
+        self.key = (collection, doc_id)
+
+    def get(self):
+        return self.client.docs.get(self.key)
+
+    def set(self, data):
+        self.client.docs[self.key] = dict(data)
+
+    def delete(self):
+        self.client.docs.pop(self.key, None)
+
+
+class _Collection:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def document(self, doc_id):
+        return _DocumentRef(self.client, self.name, doc_id)
+
+
+class _Batch:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    def set(self, ref, data):
+        self.ops.append((ref.set, data))
+
+    def delete(self, ref):
+        self.ops.append((lambda _data, ref=ref: ref.delete(), None))
+
+    def commit(self):
+        if self.client.fail_with is not None:
+            raise self.client.fail_with
+        self.client.commits += 1
+        for apply, data in self.ops:
+            apply(data)
+
+
+class InMemoryClient:
+    def __init__(self):
+        self.docs = {}          # {(colección, doc_id): dict}
+        self.commits = 0
+        self.fail_with = None   # excepción a lanzar en commit() (tests)
+
+    def collection(self, name):
+        return _Collection(self, name)
+
+    def batch(self):
+        return _Batch(self)
+
+
+# ─────────────────────────────────────────────────────────────
+# Nulo
+# ─────────────────────────────────────────────────────────────
+class _NullBatch:
+    def set(self, ref, data):
+        pass
+
+    def delete(self, ref):
+        pass
+
+    def commit(self):
+        pass
+
+
+class NullClient(InMemoryClient):
+    def batch(self):
+        return _NullBatch()
+
+
+BACKENDS = {
+    "firestore": FirestoreClient,
+    "in-memory": InMemoryClient,
+    "null": NullClient,
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Cliente del backend configurado (uno por proceso)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                name = getattr(settings, "CODEX_SYNC_BACKEND", "firestore")
+                cls = BACKENDS.get(name) or import_string(name)
+                _client = cls()
+    return _client
 
-# Configuraciones de Firebase.Str
-if not firebase_admin._apps:
-    cred = credentials.Certificate(str(settings.FIREBASE_SERVICE_ACCOUNT))
-    firebase_admin.initialize_app(cred, {
-        "projectId": settings.FIREBASE_PROJECT_ID,
-    })
 
-db = firestore.client()
+def reset_client():
+    """Olvida el cliente actual (p. ej. tras cambiar el setting en tests)."""
+    global _client
+    _client = None
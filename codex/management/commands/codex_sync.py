@@ -0,0 +1,138 @@
+# codex/management/commands/codex_sync.py
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from codex.firebase_client import get_client
+from codex.models import SyncState
+from codex.signals import COLLECTIONS
+from codex.sync import MAX_BATCH, content_hash, forget_synced, record_synced
+
+
+def _commit(client, collection, ops):
+    batch = client.batch()
+    for op, doc_id, data, _digest in ops:
+        ref = client.collection(collection).document(doc_id)
+        if op == "set":
+            batch.set(ref, data)
+        else:
+            batch.delete(ref)
+    batch.commit()
+    return ops
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye/reconcilia el espejo de Firestore desde la base de datos: "
+        "serializa cada colección, compara hashes con SyncState y sólo "
+        "escribe (o borra) los documentos que cambiaron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--collections",
+            nargs="+",
+            choices=sorted(COLLECTIONS),
+            help="Colecciones a sincronizar (por defecto, todas).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Sólo informa, no escribe.")
+        parser.add_argument("--workers", type=int, default=4, help="Commits en paralelo.")
+        parser.add_argument("--batch-size", type=int, default=MAX_BATCH)
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignora los hashes guardados y reescribe todo.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["collections"] or list(COLLECTIONS)
+        dry_run = options["dry_run"]
+        batch_size = min(options["batch_size"], MAX_BATCH)
+        if batch_size < 1:
+            raise CommandError("--batch-size debe ser >= 1")
+
+        client = None if dry_run else get_client()
+        started = time.monotonic()
+        totals = {"scanned": 0, "written": 0, "deleted": 0}
+
+        workers = max(options["workers"], 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for name in names:
+                stats = self._sync_collection(
+                    name, client, pool, workers * 2, batch_size, dry_run, options["full"]
+                )
+                for key in totals:
+                    totals[key] += stats[key]
+                self.stdout.write(
+                    f"{name}: {stats['scanned']} leídos, {stats['written']} a escribir, "
+                    f"{stats['deleted']} a borrar, {stats['scanned'] - stats['written']} sin cambios"
+                )
+
+        elapsed = time.monotonic() - started
+        rate = totals["scanned"] / elapsed if elapsed else 0
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{totals['scanned']} documentos en {elapsed:.2f}s ({rate:.0f} docs/s): "
+            f"{totals['written']} escritos, {totals['deleted']} borrados."
+        ))
+
+    def _sync_collection(self, name, client, pool, max_inflight, batch_size, dry_run, full):
+        """
+        Recorre la colección y manda cada lote en cuanto se llena, con como
+        mucho `max_inflight` commits en vuelo: la memoria depende del tamaño
+        de lote, no del de la colección.
+        """
+        spec = COLLECTIONS[name]
+        known = dict(
+            SyncState.objects.filter(collection=name).values_list("doc_id", "content_hash")
+        )
+        # Con --full se reescribe todo, pero los huérfanos se borran igual
+        stale = set(known)
+        if full:
+            known = {}
+        stats = {"scanned": 0, "written": 0, "deleted": 0}
+        inflight = deque()
+        ops = []
+
+        def record(future):
+            # El estado se guarda en este hilo (la conexión a la BD no se comparte)
+            done = future.result()
+            record_synced(name, {d: digest for op, d, _, digest in done if op == "set"})
+            forget_synced(name, [d for op, d, _, _ in done if op == "delete"])
+
+        def flush():
+            if not dry_run and ops:
+                if len(inflight) >= max_inflight:
+                    record(inflight.popleft())
+                inflight.append(pool.submit(_commit, client, name, list(ops)))
+            ops.clear()
+
+        qs = spec.model.objects.select_related(*spec.select_related) \
+                               .prefetch_related(*spec.prefetch_related) \
+                               .order_by("pk")
+
+        for obj in qs.iterator(chunk_size=batch_size):
+            stats["scanned"] += 1
+            doc_id = spec.doc_id(obj)
+            stale.discard(doc_id)
+            data = spec.to_dict(obj)
+            digest = content_hash(data)
+            if known.get(doc_id) != digest:
+                ops.append(("set", doc_id, data, digest))
+                stats["written"] += 1
+                if len(ops) >= batch_size:
+                    flush()
+
+        # Documentos que sincronizamos alguna vez y ya no existen en la BD
+        for doc_id in sorted(stale):
+            ops.append(("delete", doc_id, None, None))
+            stats["deleted"] += 1
+            if len(ops) >= batch_size:
+                flush()
+        flush()
+
+        while inflight:
+            record(inflight.popleft())
+        return stats
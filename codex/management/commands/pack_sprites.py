@@ -0,0 +1,81 @@
+# codex/management/commands/pack_sprites.py
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageSequence
+
+from codex.cache import invalidate
+from codex.models import Character
+from codex.spritesheet import atlas_sources, gif_frames, pack, pack_character
+
+
+def _decode_gif(data):
+    img = Image.open(io.BytesIO(data))
+    for frame in ImageSequence.Iterator(img):
+        frame.convert("RGBA")
+
+
+class Command(BaseCommand):
+    help = (
+        "Empaqueta los GIF de cada personaje en un atlas PNG con sus metadatos "
+        "(sprite_sheet / sprite_meta). Con --benchmark compara, sin escribir "
+        "nada, el atlas contra servir los GIF sueltos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Sólo estos personajes.")
+        parser.add_argument("--force", action="store_true", help="Reempaqueta aunque esté al día.")
+        parser.add_argument("--benchmark", action="store_true")
+
+    def handle(self, *args, **options):
+        qs = Character.objects.prefetch_related("animations").order_by("pk")
+        if options["slugs"]:
+            qs = qs.filter(slug__in=options["slugs"])
+
+        packed = 0
+        for character in qs:
+            if options["benchmark"]:
+                self._benchmark(character)
+            elif pack_character(character, force=options["force"]):
+                packed += 1
+                self.stdout.write(f"{character.slug}: atlas generado")
+
+        if packed:
+            invalidate()
+        if not options["benchmark"]:
+            self.stdout.write(self.style.SUCCESS(f"{packed} atlas generados."))
+
+    def _benchmark(self, character):
+        sources = atlas_sources(character)
+        if not sources:
+            return
+        gifs = []
+        for f in sources.values():
+            with f.storage.open(f.name, "rb") as fh:
+                gifs.append(fh.read())
+
+        started = time.perf_counter()
+        for data in gifs:
+            _decode_gif(data)
+        gif_ms = (time.perf_counter() - started) * 1000
+
+        animations = {key: gif_frames(f) for key, f in sources.items()}
+        started = time.perf_counter()
+        atlas, meta = pack(animations)
+        pack_ms = (time.perf_counter() - started) * 1000
+        buf = io.BytesIO()
+        atlas.save(buf, "PNG", optimize=True)
+        png = buf.getvalue()
+
+        started = time.perf_counter()
+        Image.open(io.BytesIO(png)).convert("RGBA")
+        atlas_ms = (time.perf_counter() - started) * 1000
+
+        total_frames = sum(len(frames) for frames in animations.values())
+        self.stdout.write(
+            f"{character.slug}: GIF {len(gifs)} peticiones, {sum(map(len, gifs)) / 1024:.1f} KiB, "
+            f"decodificar {gif_ms:.1f} ms | atlas 1 petición, {len(png) / 1024:.1f} KiB, "
+            f"decodificar {atlas_ms:.1f} ms ({atlas.width}x{atlas.height}, "
+            f"{len(meta['frames'])}/{total_frames} fotogramas únicos, empaquetado {pack_ms:.1f} ms)"
+        )
@@ -0,0 +1,42 @@
+# codex/management/commands/process_media.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from codex.cache import invalidate
+from codex.media import drain_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de la cola MediaJob: convierte a WebP animado, mp4/webm y "
+        "atlas las animaciones del Códex guardadas desde el admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Vacía lo pendiente y termina.")
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Segundos de espera cuando la cola está vacía.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            result = drain_jobs(limit=batch_size)
+            if result.processed:
+                self.stdout.write(
+                    f"procesados={result.done} fallidos={result.failed} archivos={result.created}"
+                )
+            # Las páginas cacheadas apuntaban al GIF: que vean el WebP
+            if result.created:
+                invalidate()
+
+            if result.processed == batch_size and not result.failed:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
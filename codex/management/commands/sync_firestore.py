@@ -0,0 +1,42 @@
+# codex/management/commands/sync_firestore.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from codex.firebase_client import get_client
+from codex.sync import MAX_BATCH, drain
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de la cola SyncOutbox: empuja a Firestore las escrituras "
+        "pendientes del Códex en commits por lotes (máx. 500)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Vacía lo pendiente y termina.")
+        parser.add_argument("--batch-size", type=int, default=MAX_BATCH)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Segundos de espera cuando la cola está vacía.",
+        )
+
+    def handle(self, *args, **options):
+        client = get_client()
+        # drain() nunca toma más de MAX_BATCH: es lo que cuenta como "lote lleno"
+        batch_size = min(options["batch_size"], MAX_BATCH)
+        while True:
+            result = drain(client, batch_size=batch_size)
+            if result.processed:
+                self.stdout.write(
+                    f"escritos={result.written} borrados={result.deleted} fallidos={result.failed}"
+                )
+
+            # Lote completo y sin fallos: probablemente hay más, seguimos ya
+            if result.processed == batch_size and not result.failed:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,37 @@
+# codex/management/commands/transcode_animations.py
+from django.core.management.base import BaseCommand
+
+from codex.cache import invalidate
+from codex.media import ANIMATED_FIELDS, ffmpeg_binary, process_instance
+
+
+class Command(BaseCommand):
+    help = (
+        "Convierte los GIF ya subidos del Códex a WebP animado, rellena "
+        "mp4/webm de las animaciones (si hay ffmpeg) y empaqueta los atlas "
+        "de sprites de los personajes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenera los WebP y atlas existentes.")
+
+    def handle(self, *args, **options):
+        if not ffmpeg_binary():
+            self.stdout.write(self.style.WARNING("ffmpeg no encontrado: sólo se generará WebP animado."))
+
+        total = 0
+        for model, fields in ANIMATED_FIELDS.items():
+            created = failed = 0
+            qs = model.objects.order_by("pk")
+            for obj in qs.iterator(chunk_size=200):
+                try:
+                    created += process_instance(obj, force=options["force"])
+                except Exception as exc:  # GIF corrupto, archivo perdido…
+                    failed += 1
+                    self.stderr.write(f"{model.__name__}#{obj.pk}: {exc}")
+            total += created
+            self.stdout.write(f"{model.__name__}: {created} archivos, {failed} con error")
+
+        if total:
+            invalidate()
+        self.stdout.write(self.style.SUCCESS(f"{total} archivos generados."))
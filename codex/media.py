@@ -0,0 +1,180 @@
+# codex/media.py
+"""
+Procesado de las animaciones del Códex.
+
+Cada GIF registrado en ANIMATED_FIELDS se convierte a WebP animado con
+Pillow (core.renditions.convert_animation); las plantillas lo sirven con el
+filtro |animated_url. En CharacterAnimation / EnemyAnimation, además, se
+rellenan `mp4` y `webm` si están vacíos y hay ffmpeg disponible
+(settings.FFMPEG_BINARY).
+
+Los GIF de un personaje (principal + animaciones) se empaquetan además en
+un atlas (codex/spritesheet.py).
+
+Al guardar, signals.py encola el objeto en MediaJob (misma transacción) y
+el worker `manage.py process_media` lo procesa con drain_jobs(): el WebP
+con method=6, dos ffmpeg y el atlas no caben en la petición del admin. La
+misma cola genera las variantes de las imágenes subidas de cualquier app
+(core.renditions.RENDITION_FIELDS). Con settings.CODEX_MEDIA_INLINE se
+procesa en el propio proceso tras el commit (desarrollo). Lo ya subido:
+`manage.py transcode_animations` y `manage.py build_renditions`.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core import renditions
+from core.renditions import convert_animation, find_animated
+from core.uploads import content_name
+from core.video import ffmpeg_binary
+
+from .models import Artifact, Character, CharacterAnimation, Enemy, EnemyAnimation, MediaJob, Trap
+from .spritesheet import pack_character
+from .sync import backoff
+
+ANIMATED_FIELDS = {
+    Artifact: ("gif",),
+    Character: ("sprite_gif",),
+    Enemy: ("sprite_gif",),
+    Trap: ("gif",),
+    CharacterAnimation: ("gif",),
+    EnemyAnimation: ("gif",),
+}
+
+# Modelos con campos de vídeo que se rellenan desde su `gif`
+VIDEO_MODELS = (CharacterAnimation, EnemyAnimation)
+
+FFMPEG_ARGS = {
+    "mp4": ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "23", "-movflags", "+faststart"],
+    "webm": ["-c:v", "libvpx-vp9", "-pix_fmt", "yuv420p", "-crf", "33", "-b:v", "0"],
+}
+# H.264/VP9 con yuv420p exigen dimensiones pares
+EVEN_SIZE = "scale=trunc(iw/2)*2:trunc(ih/2)*2:flags=neighbor"
+
+
+def is_gif(field_file):
+    return bool(field_file) and field_file.name.lower().endswith(".gif")
+
+
+def transcode(field_file, fmt):
+    """GIF → vídeo en bucle (bytes), o None si no hay ffmpeg o falla."""
+    binary = ffmpeg_binary()
+    if not binary:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "in.gif")
+        dst = os.path.join(tmp, f"out.{fmt}")
+        with field_file.storage.open(field_file.name, "rb") as fh, open(src, "wb") as out:
+            shutil.copyfileobj(fh, out)
+        cmd = [binary, "-y", "-loglevel", "error", "-i", src, "-an", "-vf", EVEN_SIZE,
+               *FFMPEG_ARGS[fmt], dst]
+        if subprocess.run(cmd, capture_output=True, timeout=300).returncode != 0:
+            return None
+        with open(dst, "rb") as fh:
+            return fh.read()
+
+
+def process_instance(obj, force=False):
+    """
+    Genera lo que falte para `obj` (todo, con `force`). Devuelve cuántos
+    archivos creó. Los campos de vídeo se guardan con update() para no
+    volver a disparar las señales de guardado.
+    """
+    created = 0
+    for name in ANIMATED_FIELDS.get(type(obj), ()):
+        f = getattr(obj, name)
+        if not is_gif(f):
+            continue
+        if force or not find_animated(f.storage, f.name):
+            if convert_animation(f):
+                created += 1
+
+        if not isinstance(obj, VIDEO_MODELS):
+            continue
+        updates = {}
+        for fmt in ("mp4", "webm"):
+            if getattr(obj, fmt):
+                continue
+            data = transcode(f, fmt)
+            if data is None:
+                continue
+            field = getattr(obj, fmt)
+            field.save(content_name(data, f".{fmt}"), ContentFile(data), save=False)
+            updates[fmt] = field.name
+        if updates:
+            type(obj).objects.filter(pk=obj.pk).update(**updates)
+            created += len(updates)
+
+    character = obj if isinstance(obj, Character) else getattr(obj, "character", None)
+    if isinstance(character, Character) and pack_character(character, force=force):
+        created += 1
+    return created
+
+
+def process_job(obj):
+    """Lo que hace un MediaJob: animaciones y variantes de imagen pendientes."""
+    return process_instance(obj) + renditions.build_instance(obj)
+
+
+# ─────────────────────────────────────────────────────────────
+# Cola MediaJob
+# ─────────────────────────────────────────────────────────────
+def enqueue(obj):
+    """Deja `obj` pendiente de procesar (coalesce si ya lo estaba)."""
+    label = obj._meta.label_lower
+    fields = {"attempts": 0, "last_error": "", "next_attempt_at": timezone.now()}
+    qs = MediaJob.objects.filter(model=label, object_id=obj.pk)
+    if qs.update(version=F("version") + 1, **fields):
+        return
+    try:
+        with transaction.atomic():
+            MediaJob.objects.create(model=label, object_id=obj.pk, **fields)
+    except IntegrityError:
+        qs.update(version=F("version") + 1, **fields)
+
+
+@dataclass
+class JobsResult:
+    done: int = 0
+    failed: int = 0
+    created: int = 0
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.failed
+
+
+def drain_jobs(limit=20, now=None):
+    """
+    Procesa hasta `limit` trabajos vencidos. Un fallo reprograma el suyo con
+    backoff; el objeto borrado entre medias simplemente se descarta.
+    """
+    now = now or timezone.now()
+    result = JobsResult()
+    for job in MediaJob.objects.filter(next_attempt_at__lte=now)[:limit]:
+        model = apps.get_model(job.model)
+        obj = model.objects.filter(pk=job.object_id).first()
+        try:
+            if obj is not None:
+                result.created += process_job(obj)
+        except Exception as exc:  # GIF corrupto, archivo perdido, ffmpeg…
+            attempts = job.attempts + 1
+            MediaJob.objects.filter(pk=job.pk).update(
+                attempts=attempts,
+                next_attempt_at=now + backoff(attempts),
+                last_error=str(exc)[:2000],
+            )
+            result.failed += 1
+            continue
+        # Si se volvió a encolar mientras se procesaba, se queda para otra vuelta
+        MediaJob.objects.filter(pk=job.pk, version=job.version).delete()
+        result.done += 1
+    return result
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.14 on 2026-10-18 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codex', '0004_alter_artifact_options_alter_character_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=40)),
+                ('doc_id', models.CharField(max_length=200)),
+                ('op', models.CharField(choices=[('set', 'Escribir'), ('delete', 'Borrar')], default='set', max_length=10)),
+                ('object_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(db_index=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Sincronización pendiente',
+                'verbose_name_plural': 'Sincronizaciones pendientes',
+                'ordering': ['next_attempt_at', 'id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='syncoutbox',
+            constraint=models.UniqueConstraint(fields=('collection', 'doc_id'), name='uniq_outbox_document'),
+        ),
+    ]
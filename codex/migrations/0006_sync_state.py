@@ -0,0 +1,31 @@
+# Generated by Django 4.2.14 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codex', '0005_sync_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=40)),
+                ('doc_id', models.CharField(max_length=200)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estado de sincronización',
+                'verbose_name_plural': 'Estados de sincronización',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='syncstate',
+            constraint=models.UniqueConstraint(fields=('collection', 'doc_id'), name='uniq_syncstate_document'),
+        ),
+    ]
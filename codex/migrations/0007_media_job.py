@@ -0,0 +1,35 @@
+# Generated by Django 4.2.14 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codex', '0006_sync_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=60)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(db_index=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Procesado de animación pendiente',
+                'verbose_name_plural': 'Procesados de animación pendientes',
+                'ordering': ['next_attempt_at', 'id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='mediajob',
+            constraint=models.UniqueConstraint(fields=('model', 'object_id'), name='uniq_mediajob_object'),
+        ),
+    ]
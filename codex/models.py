@@ -8,31 +8,34 @@ import time
 def _ts() -> int:
     return int(time.time())
 
+# `filename` ya llega como hash del contenido (core/uploads.py), así que una
+# ruta identifica un contenido y las subidas repetidas se reutilizan.
+
 # Compat (por migraciones antiguas): no lo uses nuevo, pero déjalo para que no falle.
 def upload_codex(instance, filename):
     return f'codex/legacy/{_ts()}_{filename}'
 
 def upload_domain_cover(instance, filename):
-    return f'codex/domains/{instance.slug}/cover_{_ts()}_{filename}'
+    return f'codex/domains/{instance.slug}/cover_{filename}'
 
 def upload_domain_banner(instance, filename):
-    return f'codex/domains/{instance.slug}/banner_{_ts()}_{filename}'
+    return f'codex/domains/{instance.slug}/banner_{filename}'
 
 def upload_asset_file(instance, filename):
     kind = getattr(instance, "kind", "misc")
-    return f'codex/assets/{kind}/{_ts()}_{filename}'
+    return f'codex/assets/{kind}/{filename}'
 
 def upload_artifact_media(instance, filename):
     slug = getattr(instance, "slug", "artifact")
-    return f'codex/artifacts/{slug}/{_ts()}_{filename}'
+    return f'codex/artifacts/{slug}/{filename}'
 
 def upload_character_image(instance, filename):
     slug = getattr(instance, "slug", "character")
-    return f'codex/characters/{slug}/{_ts()}_{filename}'
+    return f'codex/characters/{slug}/{filename}'
 
 def upload_enemy_image(instance, filename):
     slug = getattr(instance, "slug", "enemy")
-    return f'codex/enemies/{slug}/{_ts()}_{filename}'
+    return f'codex/enemies/{slug}/{filename}'
 
 def upload_character_media(instance, filename):
     # Para CharacterAnimation
@@ -40,7 +43,7 @@ def upload_character_media(instance, filename):
         slug = instance.character.slug
     except Exception:
         slug = "character"
-    return f'codex/characters/{slug}/{_ts()}_{filename}'
+    return f'codex/characters/{slug}/{filename}'
 
 def upload_enemy_media(instance, filename):
     # Para EnemyAnimation
@@ -48,7 +51,7 @@ def upload_enemy_media(instance, filename):
         slug = instance.enemy.slug
     except Exception:
         slug = "enemy"
-    return f'codex/enemies/{slug}/{_ts()}_{filename}'
+    return f'codex/enemies/{slug}/{filename}'
 
 def upload_trap_image(instance, filename):
     # Trampas por dominio
@@ -56,7 +59,7 @@ def upload_trap_image(instance, filename):
         dslug = instance.domain.slug
     except Exception:
         dslug = "domain"
-    return f'codex/traps/{dslug}/{_ts()}_{filename}'
+    return f'codex/traps/{dslug}/{filename}'
 
 
 # ---------- Dominio ----------
@@ -296,3 +299,83 @@ class Guide(models.Model):
 
     def get_absolute_url(self):
         return reverse('codex:guide_detail', args=[self.slug])
+
+
+# ---------- Cola de sincronización con Firestore (outbox) ----------
+class SyncOutbox(models.Model):
+    """
+    Escritura pendiente hacia Firestore. Hay como mucho una fila por
+    documento: guardar varias veces el mismo objeto sólo reescribe la fila
+    (coalescencia) y el worker (`manage.py sync_firestore`) la empuja en
+    commits por lotes. El documento se serializa al empujar, no al guardar.
+    """
+    OPS = (
+        ('set', 'Escribir'),
+        ('delete', 'Borrar'),
+    )
+
+    collection = models.CharField(max_length=40)
+    doc_id = models.CharField(max_length=200)
+    op = models.CharField(max_length=10, choices=OPS, default='set')
+    object_id = models.PositiveBigIntegerField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=1)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(db_index=True)
+    last_error = models.TextField(blank=True, default='')
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['collection', 'doc_id'], name='uniq_outbox_document'),
+        ]
+        verbose_name = "Sincronización pendiente"
+        verbose_name_plural = "Sincronizaciones pendientes"
+
+    def __str__(self):
+        return f'{self.op} {self.collection}/{self.doc_id}'
+
+
+class SyncState(models.Model):
+    """Hash del último contenido enviado a Firestore por documento (ver codex_sync)."""
+    collection = models.CharField(max_length=40)
+    doc_id = models.CharField(max_length=200)
+    content_hash = models.CharField(max_length=64)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['collection', 'doc_id'], name='uniq_syncstate_document'),
+        ]
+        verbose_name = "Estado de sincronización"
+        verbose_name_plural = "Estados de sincronización"
+
+    def __str__(self):
+        return f'{self.collection}/{self.doc_id}'
+
+
+class MediaJob(models.Model):
+    """
+    Animación pendiente de procesar (GIF → WebP, mp4/webm, atlas). Las
+    señales la encolan al guardar y el worker `manage.py process_media` la
+    ejecuta fuera de la petición del admin. Una fila por objeto: guardar
+    varias veces sólo la reescribe.
+    """
+    model = models.CharField(max_length=60)          # app_label.modelname
+    object_id = models.PositiveBigIntegerField()
+    version = models.PositiveIntegerField(default=1)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(db_index=True)
+    last_error = models.TextField(blank=True, default='')
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'object_id'], name='uniq_mediajob_object'),
+        ]
+        verbose_name = "Procesado de animación pendiente"
+        verbose_name_plural = "Procesados de animación pendientes"
+
+    def __str__(self):
+        return f'{self.model}#{self.object_id}'
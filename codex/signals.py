@@ -1,12 +1,17 @@
 # codex/signals.py
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+import logging
 
 from django.conf import settings
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete
 from django.dispatch import receiver
 
+from core import renditions
+
 from .models import (
     Asset,
     Domain,
@@ -15,23 +20,20 @@ from .models import (
     Enemy,
     Guide,
     LoreEntry,    # Historias
+    MediaJob,
+    SyncOutbox,
+    SyncState,
     Trap,
 )
+from .cache import invalidate
+from .media import ANIMATED_FIELDS, enqueue, process_job
+from .sync import enqueue_set, enqueue_delete
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-
-# ─────────────────────────────────────────────────────────────
-# Inicializar Firebase Admin UNA sola vez
-# ─────────────────────────────────────────────────────────────
-if not firebase_admin._apps:
-    cred_path = settings.FIREBASE_SERVICE_ACCOUNT
-    cred = credentials.Certificate(str(cred_path))
-    firebase_admin.initialize_app(cred, {
-        "projectId": settings.FIREBASE_PROJECT_ID,
-    })
+logger = logging.getLogger(__name__)
 
-db = firestore.client()
+# Los receivers NO hablan con Firestore: sólo dejan la escritura en la
+# cola SyncOutbox (misma transacción que el save) y el worker
+# `manage.py sync_firestore` la serializa y la empuja por lotes.
 
 
 # ─────────────────────────────────────────────────────────────
@@ -64,13 +66,12 @@ def asset_to_dict(instance: Asset) -> Dict[str, Any]:
 
 @receiver(post_save, sender=Asset)
 def sync_asset_to_firestore(sender, instance: Asset, **kwargs):
-    data = asset_to_dict(instance)
-    db.collection("assets").document(str(instance.pk)).set(data)
+    enqueue_set("assets", str(instance.pk), instance.pk)
 
 
 @receiver(post_delete, sender=Asset)
 def delete_asset_from_firestore(sender, instance: Asset, **kwargs):
-    db.collection("assets").document(str(instance.pk)).delete()
+    enqueue_delete("assets", str(instance.pk))
 
 
 # ─────────────────────────────────────────────────────────────
@@ -92,13 +93,12 @@ def domain_to_dict(instance: Domain) -> Dict[str, Any]:
 
 @receiver(post_save, sender=Domain)
 def sync_domain_to_firestore(sender, instance: Domain, **kwargs):
-    data = domain_to_dict(instance)
-    db.collection("domains").document(instance.slug).set(data)
+    enqueue_set("domains", instance.slug, instance.pk)
 
 
 @receiver(post_delete, sender=Domain)
 def delete_domain_from_firestore(sender, instance: Domain, **kwargs):
-    db.collection("domains").document(instance.slug).delete()
+    enqueue_delete("domains", instance.slug)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -122,13 +122,12 @@ def emblem_to_dict(instance: Artifact) -> Dict[str, Any]:
 
 @receiver(post_save, sender=Artifact)
 def sync_emblem_to_firestore(sender, instance: Artifact, **kwargs):
-    data = emblem_to_dict(instance)
-    db.collection("emblems").document(instance.slug).set(data)
+    enqueue_set("emblems", instance.slug, instance.pk)
 
 
 @receiver(post_delete, sender=Artifact)
 def delete_emblem_from_firestore(sender, instance: Artifact, **kwargs):
-    db.collection("emblems").document(instance.slug).delete()
+    enqueue_delete("emblems", instance.slug)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -149,13 +148,12 @@ def character_to_dict(instance: Character) -> Dict[str, Any]:
 
 @receiver(post_save, sender=Character)
 def sync_character_to_firestore(sender, instance: Character, **kwargs):
-    data = character_to_dict(instance)
-    db.collection("characters").document(instance.slug).set(data)
+    enqueue_set("characters", instance.slug, instance.pk)
 
 
 @receiver(post_delete, sender=Character)
 def delete_character_from_firestore(sender, instance: Character, **kwargs):
-    db.collection("characters").document(instance.slug).delete()
+    enqueue_delete("characters", instance.slug)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -177,13 +175,12 @@ def enemy_to_dict(instance: Enemy) -> Dict[str, Any]:
 
 @receiver(post_save, sender=Enemy)
 def sync_enemy_to_firestore(sender, instance: Enemy, **kwargs):
-    data = enemy_to_dict(instance)
-    db.collection("enemies").document(instance.slug).set(data)
+    enqueue_set("enemies", instance.slug, instance.pk)
 
 
 @receiver(post_delete, sender=Enemy)
 def delete_enemy_from_firestore(sender, instance: Enemy, **kwargs):
-    db.collection("enemies").document(instance.slug).delete()
+    enqueue_delete("enemies", instance.slug)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -210,13 +207,12 @@ def guide_to_dict(instance: Guide) -> Dict[str, Any]:
 
 @receiver(post_save, sender=Guide)
 def sync_guide_to_firestore(sender, instance: Guide, **kwargs):
-    data = guide_to_dict(instance)
-    db.collection("guides").document(instance.slug).set(data)
+    enqueue_set("guides", instance.slug, instance.pk)
 
 
 @receiver(post_delete, sender=Guide)
 def delete_guide_from_firestore(sender, instance: Guide, **kwargs):
-    db.collection("guides").document(instance.slug).delete()
+    enqueue_delete("guides", instance.slug)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -243,13 +239,12 @@ def loreentry_to_dict(instance: LoreEntry) -> Dict[str, Any]:
 
 @receiver(post_save, sender=LoreEntry)
 def sync_loreentry_to_firestore(sender, instance: LoreEntry, **kwargs):
-    data = loreentry_to_dict(instance)
-    db.collection("stories").document(instance.slug).set(data)
+    enqueue_set("stories", instance.slug, instance.pk)
 
 
 @receiver(post_delete, sender=LoreEntry)
 def delete_loreentry_from_firestore(sender, instance: LoreEntry, **kwargs):
-    db.collection("stories").document(instance.slug).delete()
+    enqueue_delete("stories", instance.slug)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -269,16 +264,104 @@ def trap_to_dict(instance: Trap) -> Dict[str, Any]:
     }
 
 
+def trap_doc_id(instance: Trap) -> str:
+    # Si NO hay slug en el modelo, usamos el ID de la trampa como documentId
+    return getattr(instance, "slug", None) or str(instance.pk)
+
+
 @receiver(post_save, sender=Trap)
 def sync_trap_to_firestore(sender, instance: Trap, **kwargs):
-    data = trap_to_dict(instance)
-    # Si NO hay slug en el modelo, usamos el ID de la trampa como documentId
-    doc_id = data.get("slug") or str(instance.pk)
-    db.collection("traps").document(doc_id).set(data)
+    enqueue_set("traps", trap_doc_id(instance), instance.pk)
 
 
 @receiver(post_delete, sender=Trap)
 def delete_trap_from_firestore(sender, instance: Trap, **kwargs):
-    doc_id = getattr(instance, "slug", None) or str(instance.pk)
-    db.collection("traps").document(doc_id).delete()
-    
\ No newline at end of file
+    enqueue_delete("traps", trap_doc_id(instance))
+
+
+# ─────────────────────────────────────────────────────────────
+# Registro para el worker y codex_sync: colección -> cómo cargar,
+# identificar y serializar sus documentos.
+# ─────────────────────────────────────────────────────────────
+class SyncSpec(NamedTuple):
+    model: type
+    to_dict: Callable[[Any], Dict[str, Any]]
+    doc_id: Callable[[Any], str]
+    select_related: Tuple[str, ...] = ()
+    prefetch_related: Tuple[str, ...] = ()
+
+
+def _slug_id(instance) -> str:
+    return instance.slug
+
+
+def _pk_id(instance) -> str:
+    return str(instance.pk)
+
+
+COLLECTIONS: Dict[str, SyncSpec] = {
+    "assets": SyncSpec(Asset, asset_to_dict, _pk_id),
+    "domains": SyncSpec(Domain, domain_to_dict, _slug_id),
+    "emblems": SyncSpec(Artifact, emblem_to_dict, _slug_id, ("domain",)),
+    "characters": SyncSpec(Character, character_to_dict, _slug_id, ("domain",)),
+    "enemies": SyncSpec(Enemy, enemy_to_dict, _slug_id, ("domain",)),
+    "guides": SyncSpec(
+        Guide,
+        guide_to_dict,
+        _slug_id,
+        ("domain",),
+        ("related_artifacts", "related_characters", "related_enemies"),
+    ),
+    "stories": SyncSpec(LoreEntry, loreentry_to_dict, _slug_id, ("domain",), ("gallery",)),
+    "traps": SyncSpec(Trap, trap_to_dict, trap_doc_id, ("domain",)),
+}
+
+
+# ─────────────────────────────────────────────────────────────
+# Caché de páginas: cualquier cambio de contenido renueva la versión
+# ─────────────────────────────────────────────────────────────
+# Las colas y el estado de sincronización no son contenido visible
+NOT_CONTENT = (SyncOutbox, SyncState, MediaJob)
+
+
+def _is_content(model) -> bool:
+    return model._meta.app_label == "codex" and not issubclass(model, NOT_CONTENT)
+
+
+@receiver(post_save, dispatch_uid="codex-cache-save")
+@receiver(post_delete, dispatch_uid="codex-cache-delete")
+def invalidate_codex_cache(sender, **kwargs):
+    if _is_content(sender):
+        invalidate()
+
+
+@receiver(m2m_changed, dispatch_uid="codex-cache-m2m")
+def invalidate_codex_cache_m2m(sender, instance, action, **kwargs):
+    if action.startswith("post_") and _is_content(type(instance)):
+        invalidate()
+
+
+# ─────────────────────────────────────────────────────────────
+# Animaciones (GIF → WebP animado, vídeo) y variantes de imágenes subidas
+# ─────────────────────────────────────────────────────────────
+# Por defecto sólo se encola (MediaJob) y lo hace `manage.py process_media`;
+# con CODEX_MEDIA_INLINE, en este proceso después del commit. Nunca al
+# renderizar: {% rendition %} sirve el original hasta que existan.
+def _process_media(obj):
+    try:
+        if process_job(obj):
+            invalidate()
+    except Exception:  # un GIF roto no debe tumbar la petición del admin
+        logger.exception("No se pudo procesar la animación de %r", obj)
+
+
+@receiver(post_save, dispatch_uid="codex-media-save")
+def process_codex_media(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if sender not in ANIMATED_FIELDS and not renditions.pending(instance):
+        return
+    if getattr(settings, "CODEX_MEDIA_INLINE", False):
+        transaction.on_commit(lambda: _process_media(instance))
+    else:
+        enqueue(instance)
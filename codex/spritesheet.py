@@ -0,0 +1,159 @@
+# codex/spritesheet.py
+"""
+Empaquetado de sprites: todas las animaciones GIF de un personaje en una
+sola textura (atlas PNG) + metadatos JSON, para que el navegador haga una
+petición y decodifique una imagen en vez de un GIF por animación.
+
+- Cada fotograma se recorta a su caja no transparente (Image.getbbox, en C).
+- Los fotogramas idénticos tras el recorte se guardan una sola vez.
+- Se colocan por estanterías (shelf packing), de más alto a más bajo.
+
+Formato de sprite_meta (frame_w / frame_h / fps se mantienen por
+compatibilidad con los sprites hechos a mano):
+
+    {
+      "version": 2, "frame_w": 64, "frame_h": 64, "fps": 12,
+      "frames": [[x, y, w, h, ox, oy], …],     # rectángulo en el atlas + desplazamiento
+      "animations": {"main": {"frames": [0, 1, 1, 2], "durations": [80, …], "loop": true}, …},
+      "sources": ["codex/…/idle.gif", …]       # para no reempaquetar si nada cambió
+    }
+"""
+import hashlib
+import io
+import math
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageSequence
+
+from core.uploads import collect, content_name
+
+PADDING = 1   # px entre fotogramas (evita sangrado al escalar)
+
+
+def gif_frames(field_file):
+    """[(Image RGBA, duración ms)] de un GIF guardado."""
+    with field_file.storage.open(field_file.name, "rb") as fh:
+        img = Image.open(io.BytesIO(fh.read()))
+        return [
+            (frame.convert("RGBA"), frame.info.get("duration", 100) or 100)
+            for frame in ImageSequence.Iterator(img)
+        ]
+
+
+def _trim(frame):
+    bbox = frame.getchannel("A").getbbox()
+    if bbox is None:                      # fotograma vacío
+        return frame.crop((0, 0, 1, 1)), 0, 0
+    return frame.crop(bbox), bbox[0], bbox[1]
+
+
+def _shelf_pack(sizes):
+    """Posiciones (x, y) para `sizes` [(w, h)] y tamaño total del atlas."""
+    area = sum((w + PADDING) * (h + PADDING) for w, h in sizes)
+    max_w = max((w for w, _ in sizes), default=1)
+    width = max(max_w, int(math.ceil(math.sqrt(area))))
+
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    positions = [None] * len(sizes)
+    x = y = shelf_h = 0
+    for i in order:
+        w, h = sizes[i]
+        if x and x + w > width:
+            x, y = 0, y + shelf_h + PADDING
+            shelf_h = 0
+        positions[i] = (x, y)
+        x += w + PADDING
+        shelf_h = max(shelf_h, h)
+    return positions, (width, y + shelf_h)
+
+
+def pack(animations, loops=None):
+    """
+    animations: {nombre: [(Image RGBA, duración ms), …]}
+    Devuelve (atlas Image RGBA, meta dict).
+    """
+    loops = loops or {}
+    unique, index_of = [], {}
+    meta_anims = {}
+    frame_w = frame_h = 0
+
+    for name, frames in animations.items():
+        seq, durations = [], []
+        for frame, duration in frames:
+            frame_w, frame_h = max(frame_w, frame.width), max(frame_h, frame.height)
+            crop, ox, oy = _trim(frame)
+            key = hashlib.sha1(
+                f"{crop.size}{ox},{oy}".encode() + crop.tobytes()
+            ).digest()
+            if key not in index_of:
+                index_of[key] = len(unique)
+                unique.append((crop, ox, oy))
+            seq.append(index_of[key])
+            durations.append(duration)
+        meta_anims[name] = {"frames": seq, "durations": durations, "loop": loops.get(name, True)}
+
+    positions, size = _shelf_pack([crop.size for crop, _, _ in unique])
+    atlas = Image.new("RGBA", (max(size[0], 1), max(size[1], 1)), (0, 0, 0, 0))
+    rects = []
+    for (crop, ox, oy), (x, y) in zip(unique, positions):
+        atlas.paste(crop, (x, y))
+        rects.append([x, y, crop.width, crop.height, ox, oy])
+
+    all_durations = [d for a in meta_anims.values() for d in a["durations"]]
+    avg = sum(all_durations) / len(all_durations) if all_durations else 100
+    meta = {
+        "version": 2,
+        "frame_w": frame_w,
+        "frame_h": frame_h,
+        "fps": max(1, round(1000 / avg)),
+        "frames": rects,
+        "animations": meta_anims,
+    }
+    return atlas, meta
+
+
+def atlas_sources(character):
+    """GIFs que entran en el atlas del personaje: {clave: FieldFile}."""
+    from .media import is_gif  # import local: media importa los modelos
+
+    sources = {}
+    if is_gif(character.sprite_gif):
+        sources["main"] = character.sprite_gif
+    for anim in character.animations.all():
+        if is_gif(anim.gif):
+            sources[f"anim-{anim.pk}"] = anim.gif
+    return sources
+
+
+def pack_character(character, force=False):
+    """
+    (Re)genera Character.sprite_sheet y sprite_meta con todas sus
+    animaciones GIF. Devuelve False si no había nada que hacer.
+    """
+    sources = atlas_sources(character)
+    if not sources:
+        return False
+    names = sorted(f.name for f in sources.values())
+    current = character.sprite_meta or {}
+    if character.sprite_sheet and not force:
+        # Sprite sheet hecho a mano (meta sin "version") o atlas ya al día
+        if current.get("version") != 2 or current.get("sources") == names:
+            return False
+
+    loops = {f"anim-{a.pk}": a.loop for a in character.animations.all()}
+    atlas, meta = pack({key: gif_frames(f) for key, f in sources.items()}, loops)
+    meta["sources"] = names
+
+    buf = io.BytesIO()
+    atlas.save(buf, "PNG", optimize=True)
+    data = buf.getvalue()
+    old = character.sprite_sheet.name if character.sprite_sheet else None
+    character.sprite_sheet.save(content_name(data, ".png"), ContentFile(data), save=False)
+    character.sprite_meta = meta
+    # update(): sin señales (evita reempaquetar en bucle); la caché la invalida quien llama
+    type(character).objects.filter(pk=character.pk).update(
+        sprite_sheet=character.sprite_sheet.name, sprite_meta=meta
+    )
+    if old and old != character.sprite_sheet.name:
+        collect(character.sprite_sheet.storage, [old])
+    return True
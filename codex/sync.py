@@ -0,0 +1,198 @@
+# codex/sync.py
+"""
+Cola de sincronización Códex → Firestore.
+
+- enqueue_set / enqueue_delete: los llaman las señales; un UPDATE (o INSERT
+  la primera vez) sobre SyncOutbox, sin red.
+- drain(client): lo llama el worker; toma hasta 500 filas vencidas, carga
+  los objetos por lotes, los serializa con los *_to_dict de signals.py y
+  los empuja en un único batch.commit(). Si falla, reprograma las filas
+  con backoff exponencial; una fila que no se puede serializar se
+  reprograma sola, sin frenar al resto del lote.
+
+`client` es cualquier objeto con la interfaz de firestore.Client que se
+usa aquí: collection(name).document(id) y batch() con set/delete/commit.
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import SyncOutbox, SyncState
+
+# Límite de escrituras por commit de Firestore
+MAX_BATCH = 500
+BACKOFF_BASE = 2          # segundos: 2, 4, 8, …
+BACKOFF_MAX = 15 * 60     # tope de espera entre reintentos
+
+
+def _enqueue(collection: str, doc_id: str, op: str, object_id=None):
+    fields = {
+        "op": op,
+        "object_id": object_id,
+        "attempts": 0,
+        "last_error": "",
+        "next_attempt_at": timezone.now(),
+    }
+    qs = SyncOutbox.objects.filter(collection=collection, doc_id=doc_id)
+    # Caso habitual al reeditar: ya hay fila pendiente → se coalesce
+    if qs.update(version=F("version") + 1, **fields):
+        return
+    try:
+        with transaction.atomic():
+            SyncOutbox.objects.create(collection=collection, doc_id=doc_id, **fields)
+    except IntegrityError:
+        # Otro proceso la insertó entre medias
+        qs.update(version=F("version") + 1, **fields)
+
+
+def enqueue_set(collection: str, doc_id: str, object_id) -> None:
+    _enqueue(collection, doc_id, "set", object_id)
+
+
+def enqueue_delete(collection: str, doc_id: str) -> None:
+    _enqueue(collection, doc_id, "delete")
+
+
+def backoff(attempts: int) -> datetime.timedelta:
+    return datetime.timedelta(seconds=min(BACKOFF_BASE ** attempts, BACKOFF_MAX))
+
+
+def content_hash(data) -> str:
+    """Hash estable del documento serializado (orden de claves fijo)."""
+    raw = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def record_synced(collection: str, hashes: dict) -> None:
+    """Guarda {doc_id: hash} como último contenido enviado (un solo upsert)."""
+    if not hashes:
+        return
+    SyncState.objects.bulk_create(
+        [SyncState(collection=collection, doc_id=d, content_hash=h) for d, h in hashes.items()],
+        update_conflicts=True,
+        unique_fields=["collection", "doc_id"],
+        update_fields=["content_hash", "synced_at"],
+        batch_size=MAX_BATCH,
+    )
+
+
+def forget_synced(collection: str, doc_ids) -> None:
+    if doc_ids:
+        SyncState.objects.filter(collection=collection, doc_id__in=list(doc_ids)).delete()
+
+
+@dataclass
+class DrainResult:
+    written: int = 0
+    deleted: int = 0
+    failed: int = 0
+
+    @property
+    def processed(self) -> int:
+        return self.written + self.deleted + self.failed
+
+
+def _reschedule(rows, now, exc):
+    """Reintento con backoff exponencial, guardando el error."""
+    by_attempts = defaultdict(list)
+    for row in rows:
+        by_attempts[row.attempts + 1].append(row.pk)
+    for attempts, pks in by_attempts.items():
+        SyncOutbox.objects.filter(pk__in=pks).update(
+            attempts=attempts,
+            next_attempt_at=now + backoff(attempts),
+            last_error=str(exc)[:2000],
+        )
+
+
+def _load_documents(rows):
+    """
+    ({row.pk: dict} para las filas 'set', {row.pk: excepción} de las que no
+    se pudieron serializar), con una consulta por colección.
+    """
+    from .signals import COLLECTIONS  # import local: signals importa este módulo
+
+    ids_by_collection = defaultdict(list)
+    for row in rows:
+        if row.op == "set" and row.object_id is not None:
+            ids_by_collection[row.collection].append(row.object_id)
+
+    docs, errors = {}, {}
+    for collection, ids in ids_by_collection.items():
+        spec = COLLECTIONS[collection]
+        qs = spec.model.objects.select_related(*spec.select_related) \
+                               .prefetch_related(*spec.prefetch_related)
+        objects = qs.in_bulk(ids)
+        for row in rows:
+            obj = objects.get(row.object_id) if row.collection == collection else None
+            if obj is None:
+                continue
+            try:
+                docs[row.pk] = spec.to_dict(obj)
+            except Exception as exc:  # FK rota, archivo perdido…: sólo esa fila
+                errors[row.pk] = exc
+    return docs, errors
+
+
+def drain(client, batch_size: int = MAX_BATCH, now=None) -> DrainResult:
+    """Empuja un lote de escrituras pendientes. Devuelve el resumen."""
+    now = now or timezone.now()
+    batch_size = min(batch_size, MAX_BATCH)
+    rows = list(SyncOutbox.objects.filter(next_attempt_at__lte=now)[:batch_size])
+    result = DrainResult()
+    if not rows:
+        return result
+
+    docs, errors = _load_documents(rows)
+    if errors:
+        # Se reintentan aparte; el resto del lote sigue adelante
+        for row in rows:
+            if row.pk in errors:
+                _reschedule([row], now, errors[row.pk])
+        result.failed += len(errors)
+        rows = [row for row in rows if row.pk not in errors]
+        if not rows:
+            return result
+
+    batch = client.batch()
+    written = defaultdict(dict)
+    deleted = defaultdict(list)
+    for row in rows:
+        ref = client.collection(row.collection).document(row.doc_id)
+        data = docs.get(row.pk)
+        if data is None:
+            # Borrado explícito, o el objeto desapareció antes de empujarlo
+            batch.delete(ref)
+            deleted[row.collection].append(row.doc_id)
+            result.deleted += 1
+        else:
+            batch.set(ref, data)
+            written[row.collection][row.doc_id] = content_hash(data)
+            result.written += 1
+
+    try:
+        batch.commit()
+    except Exception as exc:  # red, cuota, credenciales…
+        _reschedule(rows, now, exc)
+        return DrainResult(failed=len(rows) + len(errors))
+
+    # Sólo se borran las filas que nadie volvió a encolar mientras tanto
+    done = Q()
+    for row in rows:
+        done |= Q(pk=row.pk, version=row.version)
+    SyncOutbox.objects.filter(done).delete()
+
+    # Así codex_sync sabe qué ya está al día en Firestore
+    for collection, hashes in written.items():
+        record_synced(collection, hashes)
+    for collection, doc_ids in deleted.items():
+        forget_synced(collection, doc_ids)
+    return result
@@ -1,3 +1,279 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from core.renditions import animated_url
+
+from .spritesheet import pack
+
+from .firebase_client import InMemoryClient, NullClient, get_client, reset_client
+from .models import Domain, Character, LoreEntry, MediaJob, SyncOutbox, SyncState
+from .signals import COLLECTIONS
+from .sync import MAX_BATCH, drain
+
+
+class FirestoreOutboxTests(TestCase):
+    def test_repeated_saves_coalesce_into_one_batched_write(self):
+        d = Domain.objects.create(name="Tiempo", slug="tiempo")
+        for i in range(3):
+            d.order = i
+            d.save()
+        c = Character.objects.create(name="Simplon", slug="simplon", domain=d)
+        self.assertEqual(SyncOutbox.objects.count(), 2)
+
+        client = InMemoryClient()
+        result = drain(client)
+        self.assertEqual((result.written, client.commits), (2, 1))
+        self.assertEqual(client.docs[("domains", "tiempo")]["order"], 2)
+        self.assertEqual(client.docs[("characters", "simplon")]["domainId"], "tiempo")
+        self.assertFalse(SyncOutbox.objects.exists())
+
+        c.delete()
+        drain(client)
+        self.assertNotIn(("characters", "simplon"), client.docs)
+
+    def test_failed_commit_is_rescheduled_with_backoff(self):
+        Domain.objects.create(name="Niebla", slug="niebla")
+        client = InMemoryClient()
+        client.fail_with = ConnectionError("sin red")
+        result = drain(client)
+        self.assertEqual(result.failed, 1)
+
+        row = SyncOutbox.objects.get()
+        self.assertEqual(row.attempts, 1)
+        self.assertIn("sin red", row.last_error)
+        # Aún no vence: el siguiente drain no lo toca
+        self.assertEqual(drain(InMemoryClient()).processed, 0)
+
+    def test_row_that_fails_to_serialize_is_rescheduled_alone(self):
+        Domain.objects.create(name="Tiempo", slug="tiempo")
+        Domain.objects.create(name="Rota", slug="rota")
+        spec = COLLECTIONS["domains"]
+
+        def to_dict(obj):
+            if obj.slug == "rota":
+                raise ValueError("archivo perdido")
+            return spec.to_dict(obj)
+
+        client = InMemoryClient()
+        with mock.patch.dict(COLLECTIONS, {"domains": spec._replace(to_dict=to_dict)}):
+            result = drain(client)
+        self.assertEqual((result.written, result.failed), (1, 1))
+        self.assertIn(("domains", "tiempo"), client.docs)
+        row = SyncOutbox.objects.get()
+        self.assertEqual((row.doc_id, row.attempts), ("rota", 1))
+        self.assertIn("archivo perdido", row.last_error)
+
+
+class SyncWorkerTests(TestCase):
+    def tearDown(self):
+        reset_client()
+
+    @override_settings(CODEX_SYNC_BACKEND="in-memory")
+    def test_full_batches_keep_draining_past_max_batch(self):
+        now = timezone.now()
+        SyncOutbox.objects.bulk_create(
+            SyncOutbox(collection="domains", doc_id=f"d{i}", op="delete", next_attempt_at=now)
+            for i in range(MAX_BATCH + 1)
+        )
+        reset_client()
+        call_command("sync_firestore", "--once", "--batch-size", "1000", stdout=StringIO())
+        self.assertFalse(SyncOutbox.objects.exists())
+
+
+class SyncBackendTests(TestCase):
+    def tearDown(self):
+        reset_client()
+
+    def test_backend_is_chosen_from_settings(self):
+        for name, cls in (("null", NullClient), ("in-memory", InMemoryClient)):
+            with self.settings(CODEX_SYNC_BACKEND=name):
+                reset_client()
+                self.assertIs(type(get_client()), cls)
+
+
+class CodexSyncCommandTests(TestCase):
+    def setUp(self):
+        reset_client()
+        self.settings_override = self.settings(CODEX_SYNC_BACKEND="in-memory")
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        reset_client()
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command("codex_sync", "--collections", "domains", "characters", *args, stdout=out)
+        return out.getvalue()
+
+    def test_only_changed_documents_are_written(self):
+        d = Domain.objects.create(name="Tiempo", slug="tiempo")
+        Character.objects.create(name="Simplon", slug="simplon", domain=d)
+        client = get_client()
+
+        self._run("--dry-run")
+        self.assertEqual((client.commits, SyncState.objects.count()), (0, 0))
+
+        self._run()
+        self.assertEqual(client.docs[("characters", "simplon")]["domainId"], "tiempo")
+        self.assertEqual(SyncState.objects.count(), 2)
+
+        commits = client.commits
+        self.assertIn("0 escritos, 0 borrados", self._run())
+        self.assertEqual(client.commits, commits)
+
+        d.order = 5
+        d.save()
+        Character.objects.filter(slug="simplon").delete()   # sin señales
+        self.assertIn("1 escritos, 1 borrados", self._run())
+        self.assertEqual(client.docs[("domains", "tiempo")]["order"], 5)
+        self.assertNotIn(("characters", "simplon"), client.docs)
+
+    def test_full_rewrites_everything_and_purges_orphans(self):
+        Domain.objects.create(name="Tiempo", slug="tiempo")
+        Domain.objects.create(name="Niebla", slug="niebla")
+        client = get_client()
+        self._run()
+        Domain.objects.filter(slug="niebla").delete()   # sin señales
+
+        self.assertIn("1 escritos, 1 borrados", self._run("--full"))
+        self.assertNotIn(("domains", "niebla"), client.docs)
+        self.assertEqual(SyncState.objects.filter(collection="domains").count(), 1)
+
+    def test_batches_are_committed_as_they_fill(self):
+        for i in range(5):
+            Domain.objects.create(name=f"D{i}", slug=f"d{i}")
+        client = get_client()
+        self.assertIn("5 escritos", self._run("--batch-size", "2", "--workers", "1"))
+        self.assertEqual(client.commits, 3)
+        self.assertEqual(SyncState.objects.count(), 5)
+
+
+class CodexPageCacheTests(TestCase):
+    url = "/codex/historias/"
+
+    def setUp(self):
+        cache.clear()
+        LoreEntry.objects.create(title="El reloj roto", slug="reloj", body="…")
+
+    def _get(self, **headers):
+        return self.client.get(self.url, HTTP_HX_REQUEST="true", **headers)
+
+    def test_fragment_is_cached_revalidated_and_invalidated_on_save(self):
+        first = self._get()
+        self.assertContains(first, "El reloj roto")
+        etag = first["ETag"]
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get().content, first.content)
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        LoreEntry.objects.create(title="La niebla", slug="niebla", body="…")
+        fresh = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertContains(fresh, "La niebla")
+
+    def test_user_marker_goes_in_cookie_not_in_cached_page(self):
+        user = User.objects.create_user("eco", password="x")
+        self.client.force_login(user)
+        response = self._get()
+        marker = response.cookies["nexo_user"].value
+        self.assertTrue(marker)
+        self.assertNotIn(marker.encode(), response.content)
+        # Con la cookie ya puesta no se reescribe
+        self.assertNotIn("nexo_user", self._get().cookies)
+
+        self.client.logout()   # borra todas las cookies del cliente
+        self.client.cookies["nexo_user"] = marker
+        self.assertEqual(self._get().cookies["nexo_user"].value, "")
+
+
+def make_gif(frames=4, size=48):
+    images = []
+    for i in range(frames):
+        im = Image.new("P", (size, size))
+        im.putpalette([0, 0, 0, 255, 0, 0, 0, 255, 0, 0, 0, 255] + [0] * 756)
+        for x in range(size):
+            for y in range(size):
+                im.putpixel((x, y), (x // 4 + y // 4 + i) % 4)
+        images.append(im)
+    buf = io.BytesIO()
+    images[0].save(buf, "GIF", save_all=True, append_images=images[1:], duration=80, loop=0)
+    return buf.getvalue()
+
+
+class TempMediaMixin:
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media, STORAGES={
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage",
+                        "OPTIONS": {"location": media}},
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        }, FFMPEG_BINARY="ffmpeg-que-no-existe")
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class AnimationProcessingTests(TempMediaMixin, TestCase):
+    def test_saved_gif_gets_a_smaller_animated_webp(self):
+        gif = make_gif()
+        with self.captureOnCommitCallbacks(execute=True):
+            c = Character.objects.create(
+                name="Simplon", slug="simplon",
+                sprite_gif=SimpleUploadedFile("simplon.gif", gif, content_type="image/gif"),
+            )
+        # El guardado sólo encola; el worker hace la conversión
+        self.assertFalse(animated_url(c.sprite_gif).endswith(".anim.webp"))
+        self.assertEqual(MediaJob.objects.count(), 1)
+        call_command("process_media", "--once", stdout=StringIO())
+        self.assertFalse(MediaJob.objects.exists())
+
+        url = animated_url(c.sprite_gif)
+        self.assertTrue(url.endswith(".anim.webp"))
+        name = url.split("/media/", 1)[1]
+        with c.sprite_gif.storage.open(name) as fh:
+            data = fh.read()
+        self.assertLess(len(data), len(gif))
+        webp = Image.open(io.BytesIO(data))
+        self.assertEqual(webp.n_frames, 4)
+
+
+class SpriteSheetTests(TempMediaMixin, TestCase):
+    def test_pack_trims_and_deduplicates_frames(self):
+        frames = []
+        for i in (0, 1, 0):   # el tercero repite el primero
+            im = Image.new("RGBA", (32, 32), (0, 0, 0, 0))
+            im.paste((255, 0, 0, 255), (8 + i, 8, 16 + i, 20))
+            frames.append((im, 100))
+        atlas, meta = pack({"main": frames})
+
+        self.assertEqual(meta["animations"]["main"]["frames"], [0, 1, 0])
+        self.assertEqual(len(meta["frames"]), 2)
+        x, y, w, h, ox, oy = meta["frames"][1]
+        self.assertEqual((w, h, ox, oy), (8, 12, 9, 8))
+        self.assertEqual((meta["frame_w"], meta["frame_h"], meta["fps"]), (32, 32, 10))
+
+    @override_settings(CODEX_MEDIA_INLINE=True)
+    def test_character_gifs_are_packed_into_one_atlas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            c = Character.objects.create(
+                name="Simplon", slug="simplon",
+                sprite_gif=SimpleUploadedFile("idle.gif", make_gif(frames=8), content_type="image/gif"),
+            )
+        c.refresh_from_db()
+        self.assertRegex(c.sprite_sheet.name, r"^codex/characters/simplon/[0-9a-f]{32}\.png$")
+        self.assertEqual(len(c.sprite_meta["animations"]["main"]["frames"]), 8)
+        self.assertEqual(len(c.sprite_meta["frames"]), 4)
@@ -1,10 +1,12 @@
 # codex/views.py
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
 
+from core.pagination import paginate_cursor
+from .cache import codex_page
 from .models import Domain, LoreEntry, Character, Enemy, Artifact, Guide
 
 
+@codex_page
 def codex_index(request):
     ctx = {
         "domains": Domain.objects.all(),
@@ -18,12 +20,15 @@ def codex_index(request):
 
 
 # ----- Historias -----
+@codex_page
 def lore_index(request):
-    qs = LoreEntry.objects.select_related("domain").order_by("title")
-    page_obj = Paginator(qs, 12).get_page(request.GET.get("page"))
-    return render(request, "codex/lore_index.html", {"page_obj": page_obj})
+    qs = LoreEntry.objects.select_related("domain")
+    page_obj = paginate_cursor(request, qs, 12, ("title", "id"))
+    template = "codex/_lore_list.html" if request.htmx else "codex/lore_index.html"
+    return render(request, template, {"page_obj": page_obj})
 
 
+@codex_page
 def lore_detail(request, slug):
     # Traemos también la galería para no hacer consultas extra
     item = get_object_or_404(
@@ -52,35 +57,43 @@ def lore_detail(request, slug):
 
 
 # ----- Personajes -----
+@codex_page
 def characters_index(request):
-    qs = Character.objects.select_related("domain").order_by("name")
-    page_obj = Paginator(qs, 18).get_page(request.GET.get("page"))
-    return render(request, "codex/characters_index.html", {"page_obj": page_obj})
+    qs = Character.objects.select_related("domain")
+    page_obj = paginate_cursor(request, qs, 18, ("name", "id"))
+    template = "codex/_characters_list.html" if request.htmx else "codex/characters_index.html"
+    return render(request, template, {"page_obj": page_obj})
 
 
+@codex_page
 def character_detail(request, slug):
     item = get_object_or_404(Character.objects.select_related("domain"), slug=slug)
     return render(request, "codex/character_detail.html", {"item": item})
 
 
 # ----- Enemigos -----
+@codex_page
 def enemies_index(request):
-    qs = Enemy.objects.select_related("domain").order_by("name")
-    page_obj = Paginator(qs, 18).get_page(request.GET.get("page"))
-    return render(request, "codex/enemies_index.html", {"page_obj": page_obj})
+    qs = Enemy.objects.select_related("domain")
+    page_obj = paginate_cursor(request, qs, 18, ("name", "id"))
+    template = "codex/_enemies_list.html" if request.htmx else "codex/enemies_index.html"
+    return render(request, template, {"page_obj": page_obj})
 
 
+@codex_page
 def enemy_detail(request, slug):
     item = get_object_or_404(Enemy.objects.select_related("domain"), slug=slug)
     return render(request, "codex/enemy_detail.html", {"item": item})
 
 
 # ----- Dominios -----
+@codex_page
 def domains_index(request):
     items = Domain.objects.order_by("order", "name")
     return render(request, "codex/domains_index.html", {"items": items})
 
 
+@codex_page
 def domain_detail(request, slug):
     d = get_object_or_404(Domain, slug=slug)
     ctx = {
@@ -96,25 +109,31 @@ def domain_detail(request, slug):
 
 
 # ----- Artefactos -----
+@codex_page
 def artifacts_index(request):
-    qs = Artifact.objects.select_related("domain").order_by("name")
-    page_obj = Paginator(qs, 18).get_page(request.GET.get("page"))
-    return render(request, "codex/artifacts_index.html", {"page_obj": page_obj})
+    qs = Artifact.objects.select_related("domain")
+    page_obj = paginate_cursor(request, qs, 18, ("name", "id"))
+    template = "codex/_artifacts_list.html" if request.htmx else "codex/artifacts_index.html"
+    return render(request, template, {"page_obj": page_obj})
 
 
+@codex_page
 def artifact_detail(request, slug):
     item = get_object_or_404(Artifact.objects.select_related("domain"), slug=slug)
     return render(request, "codex/artifact_detail.html", {"item": item})
 
 
 # ----- Guías -----
+@codex_page
 def guides_index(request):
-    # Ahora existe 'updated' en Guide; se puede ordenar por última edición y creación.
-    qs = Guide.objects.select_related("domain").order_by("-updated", "-created", "title")
-    page_obj = Paginator(qs, 12).get_page(request.GET.get("page"))
-    return render(request, "codex/guides_index.html", {"page_obj": page_obj})
+    # 'updated' está indexado: keyset por última edición (+ id como desempate).
+    qs = Guide.objects.select_related("domain")
+    page_obj = paginate_cursor(request, qs, 12, ("-updated", "-id"))
+    template = "codex/_guides_list.html" if request.htmx else "codex/guides_index.html"
+    return render(request, template, {"page_obj": page_obj})
 
 
+@codex_page
 def guide_detail(request, slug):
     item = get_object_or_404(Guide.objects.select_related("domain"), slug=slug)
     return render(request, "codex/guide_detail.html", {"item": item})
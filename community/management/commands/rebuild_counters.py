@@ -0,0 +1,32 @@
+# community/management/commands/rebuild_counters.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from community import ranking, reactions
+from community.models import Post, Comment, count_subquery
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los contadores desnormalizados de la comunidad "
+        "(Post.comments_count, Comment.replies_count y, en posts y "
+        "comentarios, reactions_count y el desglose por tipo) y hot_score."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            posts = Post.objects.update(
+                comments_count=count_subquery(Comment, "post", is_removed=False),
+            )
+            reactions.recount("post")
+            comments = Comment.objects.update(
+                replies_count=count_subquery(Comment, "parent", is_removed=False),
+            )
+            reactions.recount("comment")
+            ranking.decay()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Contadores recalculados: {posts} posts, {comments} comentarios."
+            )
+        )
@@ -0,0 +1,20 @@
+# community/management/commands/rescore_hot.py
+from django.core.management.base import BaseCommand
+
+from community import ranking
+
+
+class Command(BaseCommand):
+    help = (
+        "Decaimiento del orden \"populares\": recalcula hot_score de los posts "
+        "recientes (ranking.HOT_WINDOW) y pone a 0 los que salen de la ventana. "
+        "Pensado para ejecutarse periódicamente (cron)."
+    )
+
+    def handle(self, *args, **options):
+        rescored, expired = ranking.decay()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"hot_score: {rescored} posts recalculados, {expired} fuera de la ventana."
+            )
+        )
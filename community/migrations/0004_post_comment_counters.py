@@ -0,0 +1,57 @@
+# Generated by Django 4.2.14 on 2026-10-18 08:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model("community", "Post")
+    Comment = apps.get_model("community", "Comment")
+    for post in Post.objects.all():
+        post.comments_count = post.comments.filter(is_removed=False).count()
+        post.reactions_count = post.reactions.count()
+        post.save(update_fields=["comments_count", "reactions_count"])
+    for comment in Comment.objects.all():
+        comment.reactions_count = comment.reactions.count()
+        comment.save(update_fields=["reactions_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0003_remove_comment_parent_alter_commentreaction_reaction_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='community.comment'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reactions_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reactions_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='commentreaction',
+            name='reaction',
+            field=models.CharField(choices=[('like', 'Me gusta'), ('gg', 'GG'), ('wow', 'Wow'), ('salt', 'Salado')], default='like', max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='postreaction',
+            name='reaction',
+            field=models.CharField(choices=[('like', 'Me gusta'), ('gg', 'GG'), ('wow', 'Wow'), ('salt', 'Salado')], default='like', max_length=16),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.14 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0004_post_comment_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'is_removed', 'created'], name='community_c_post_id_513cb5_idx'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.14 on 2026-10-18 09:06
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_summary(apps, schema_editor):
+    for model_name, reaction_model, fk in (
+        ("Post", "PostReaction", "post"),
+        ("Comment", "CommentReaction", "comment"),
+    ):
+        Model = apps.get_model("community", model_name)
+        Reaction = apps.get_model("community", reaction_model)
+        rows = (
+            Reaction.objects.values(fk, "reaction")
+            .annotate(n=Count("pk"))
+            .order_by()
+        )
+        for row in rows:
+            # Antes no se validaba el tipo: los desconocidos no tienen columna
+            if row["reaction"] not in ("like", "gg", "wow", "salt"):
+                continue
+            Model.objects.filter(pk=row[fk]).update(**{f"{row['reaction']}_count": row["n"]})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0005_comment_post_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='gg_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='salt_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='wow_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='gg_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='salt_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='wow_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_summary, migrations.RunPython.noop),
+    ]
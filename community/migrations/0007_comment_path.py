@@ -0,0 +1,46 @@
+# Generated by Django 4.2.14 on 2026-10-18 09:08
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    # Misma codificación que community.models.path_segment (las migraciones
+    # no deben importar código del modelo, que puede cambiar)
+    def segment(pk):
+        digits = ""
+        while pk:
+            pk, rest = divmod(pk, 36)
+            digits = "0123456789abcdefghijklmnopqrstuvwxyz"[rest] + digits
+        return digits.rjust(7, "0") + "/"
+
+    Comment = apps.get_model("community", "Comment")
+    paths, batch = {}, []
+    # Un padre siempre tiene un id menor que sus respuestas
+    for c in Comment.objects.order_by("id").only("id", "parent_id").iterator():
+        c.path = paths.get(c.parent_id, "") + segment(c.id)
+        paths[c.id] = c.path
+        batch.append(c)
+        if len(batch) >= 500:
+            Comment.objects.bulk_update(batch, ["path"])
+            batch = []
+    Comment.objects.bulk_update(batch, ["path"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0006_reaction_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='community_c_post_id_a98548_idx'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
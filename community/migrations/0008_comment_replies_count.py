@@ -0,0 +1,39 @@
+# Generated by Django 4.2.14 on 2026-10-18 09:10
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_replies_count(apps, schema_editor):
+    Comment = apps.get_model("community", "Comment")
+    replies = (
+        Comment.objects.filter(parent=OuterRef("pk"), is_removed=False)
+        .order_by()
+        .values("parent")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Comment.objects.update(
+        replies_count=Coalesce(Subquery(replies, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0007_comment_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='replies_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['parent', 'is_removed', 'path'], name='community_c_parent__b102fc_idx'),
+        ),
+        migrations.RunPython(fill_replies_count, migrations.RunPython.noop),
+    ]
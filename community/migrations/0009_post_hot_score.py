@@ -0,0 +1,46 @@
+# Generated by Django 4.2.14 on 2026-10-18 09:12
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Copia de community/ranking.py en el momento de la migración
+GRAVITY = 1.8
+COMMENT_WEIGHT = 2
+HOT_WINDOW = datetime.timedelta(days=7)
+
+
+def fill_hot_score(apps, schema_editor):
+    """Puntúa los posts de la ventana para que "populares" no salga vacío hasta el primer rescore_hot."""
+    Post = apps.get_model('community', 'Post')
+    now = timezone.now()
+    changed = []
+    rows = Post.objects.filter(created__gte=now - HOT_WINDOW, is_removed=False) \
+                       .values_list('pk', 'reactions_count', 'comments_count', 'created')
+    for pk, reactions, comments, created in rows.iterator():
+        hours = max((now - created).total_seconds(), 0) / 3600
+        score = (reactions + COMMENT_WEIGHT * comments) / (hours + 2) ** GRAVITY
+        if score:
+            changed.append(Post(pk=pk, hot_score=score))
+    Post.objects.bulk_update(changed, ['hot_score'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0008_comment_replies_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_removed', '-hot_score', '-id'], name='community_p_is_remo_5dfc97_idx'),
+        ),
+        migrations.RunPython(fill_hot_score, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils.text import slugify
@@ -6,14 +8,85 @@ import time
 
 
 def upload_post_image(instance, filename):
-    return f"community/posts/{instance.author_id}/{int(time.time())}_{filename}"
+    return f"community/posts/{instance.author_id}/{filename}"
 
 
 def upload_forum_image(instance, filename):
-    return f"community/forums/{instance.author_id}/{int(time.time())}_{filename}"
+    return f"community/forums/{instance.author_id}/{filename}"
 
 
-class Post(models.Model):
+def bump_counter(model, pk, field, delta):
+    """
+    Suma `delta` a un contador desnormalizado con un UPDATE atómico
+    (F-expression), sin leer la fila a Python.
+    """
+    bump_counters(model, pk, {field: delta})
+
+
+def bump_counters(model, pk, deltas):
+    """Como bump_counter, para varios contadores en un solo UPDATE."""
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if updates:
+        model.objects.filter(pk=pk).update(**updates)
+
+
+def count_subquery(model, fk, **filters):
+    """Subconsulta correlacionada: COUNT(*) de `model` agrupado por `fk`."""
+    qs = (
+        model.objects.filter(**{fk: OuterRef("pk")}, **filters)
+        .order_by()
+        .values(fk)
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(qs, output_field=IntegerField()), Value(0))
+
+
+REACTION_CHOICES = (
+    ("like", "Me gusta"),
+    ("gg", "GG"),
+    ("wow", "Wow"),
+    ("salt", "Salado"),
+)
+
+
+def reaction_field(reaction):
+    """Columna del desglose por tipo: "gg" → "gg_count"."""
+    return f"{reaction}_count"
+
+
+# Para refresh_from_db(fields=…) tras reaccionar
+REACTION_COUNT_FIELDS = ["reactions_count"] + [reaction_field(r) for r, _ in REACTION_CHOICES]
+
+
+class ReactionSummary(models.Model):
+    """
+    Desglose de reacciones por tipo, en la propia fila del objeto: una
+    página del feed lo lee sin GROUP BY. community.reactions lo mantiene en
+    el mismo UPDATE que reactions_count.
+    """
+
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    gg_count = models.PositiveIntegerField(default=0, editable=False)
+    wow_count = models.PositiveIntegerField(default=0, editable=False)
+    salt_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def reaction_summary(self):
+        """[(reaction, etiqueta, n), …] de los tipos con alguna reacción, de más a menos."""
+        summary = [
+            (key, label, getattr(self, reaction_field(key)))
+            for key, label in REACTION_CHOICES
+        ]
+        return sorted(
+            (item for item in summary if item[2]), key=lambda item: -item[2]
+        )
+
+
+class Post(ReactionSummary):
     POST_TYPES = (
         ("post", "Publicación"),
         ("review", "Reseña"),
@@ -29,6 +102,12 @@ class Post(models.Model):
     slug = models.SlugField(max_length=180, unique=True, blank=True)
     is_removed = models.BooleanField(default=False)
 
+    # Contadores desnormalizados (ver bump_counter / rebuild_counters)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    reactions_count = models.PositiveIntegerField(default=0, editable=False)
+    # Orden "populares" (ver community/ranking.py)
+    hot_score = models.FloatField(default=0, editable=False)
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(f"{self.title}-{self.author_id}-{int(time.time())}")
@@ -39,20 +118,39 @@ class Post(models.Model):
 
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            models.Index(fields=["is_removed", "-hot_score", "-id"]),
+        ]
 
     def __str__(self):
         return self.title
 
-    @property
-    def comments_count(self):
-        return self.comments.filter(is_removed=False).count()
 
-    @property
-    def reactions_count(self):
-        return self.reactions.count()
+# ── Ruta materializada de los comentarios ──
+# Cada comentario guarda en `path` los ids de sus ancestros y el suyo, en
+# base 36 con ancho fijo: "00000a1/00000b7/". Ordenar por path recorre el
+# árbol en profundidad (hermanos por antigüedad) y un subárbol es el rango
+# [path, path con la última "/" cambiada por "0"), que usa el índice
+# (post, path). "/" es el carácter anterior a "0" en ASCII.
+PATH_SEGMENT = 7  # 36**7 ≈ 7,8e10 ids
+PATH_MAX_DEPTH = 30
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def path_segment(pk):
+    digits = ""
+    while pk:
+        pk, rest = divmod(pk, 36)
+        digits = _BASE36[rest] + digits
+    return digits.rjust(PATH_SEGMENT, "0") + "/"
+
+
+def subtree_q(path, prefix=""):
+    """Q del subárbol que empieza en `path` (incluido) como rango indexable."""
+    return models.Q(**{f"{prefix}path__gte": path, f"{prefix}path__lt": path[:-1] + "0"})
 
 
-class Comment(models.Model):
+class Comment(ReactionSummary):
     post = models.ForeignKey(
         Post, related_name="comments", on_delete=models.CASCADE
     )
@@ -70,29 +168,80 @@ class Comment(models.Model):
     body = models.TextField(max_length=1000)
     created = models.DateTimeField(auto_now_add=True)
     is_removed = models.BooleanField(default=False)
+    reactions_count = models.PositiveIntegerField(default=0, editable=False)
+    # Ruta materializada (ver path_segment); se fija al crear el comentario
+    path = models.CharField(max_length=255, editable=False, default="")
+    # Respuestas directas visibles (desnormalizado, ver bump_counter)
+    replies_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["created"]
+        indexes = [
+            models.Index(fields=["post", "is_removed", "created"]),
+            models.Index(fields=["post", "path"]),
+            models.Index(fields=["parent", "is_removed", "path"]),
+        ]
 
     def __str__(self):
         return f"Comentario de {self.author}"
 
-    @property
-    def reactions_count(self):
-        return self.reactions.count()
-
     @property
     def is_root(self):
         return self.parent_id is None
 
+    @property
+    def depth(self):
+        return len(self.path) // (PATH_SEGMENT + 1) - 1
 
-class PostReaction(models.Model):
-    REACTION_CHOICES = (
-        ("like", "Me gusta"),
-        ("gg", "GG"),
-        ("wow", "Wow"),
-        ("salt", "Salado"),
+    @property
+    def can_reply(self):
+        return self.depth < PATH_MAX_DEPTH - 1
+
+    def save(self, *args, **kwargs):
+        # Demasiado profundo: la respuesta se cuelga del abuelo
+        if self.parent is not None and not self.path and not self.parent.can_reply:
+            self.parent = self.parent.parent
+        super().save(*args, **kwargs)
+        if not self.path:
+            prefix = self.parent.path if self.parent is not None else ""
+            self.path = prefix + path_segment(self.pk)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+    def subtree(self):
+        """El comentario y todas sus respuestas, en orden de árbol (una consulta por rango)."""
+        return Comment.objects.filter(subtree_q(self.path), post_id=self.post_id).order_by("path")
+
+
+def replies_prefetch(n, to_attr="replies_list"):
+    """
+    Prefetch de las `n` primeras respuestas directas visibles de cada
+    comentario (orden de path), recortadas en SQL como latest_comments_prefetch.
+    """
+    qs = (
+        Comment.objects.filter(is_removed=False)
+        .select_related("author")
+        .order_by("path")
     )
+    return models.Prefetch("replies", queryset=qs[:n], to_attr=to_attr)
+
+
+def latest_comments_prefetch(n=2, to_attr="latest_comments"):
+    """
+    Prefetch de los `n` comentarios visibles más recientes de cada post.
+
+    El recorte se hace en la base de datos (ROW_NUMBER() OVER PARTITION BY
+    post), así que la memoria no depende del tamaño del hilo.
+    """
+    qs = (
+        Comment.objects.filter(is_removed=False)
+        .select_related("author")
+        .order_by("-created", "-id")
+    )
+    return models.Prefetch("comments", queryset=qs[:n], to_attr=to_attr)
+
+
+class PostReaction(models.Model):
+    REACTION_CHOICES = REACTION_CHOICES
 
     post = models.ForeignKey(
         Post, related_name="reactions", on_delete=models.CASCADE
@@ -114,12 +263,7 @@ class PostReaction(models.Model):
 
 
 class CommentReaction(models.Model):
-    REACTION_CHOICES = (
-        ("like", "Me gusta"),
-        ("gg", "GG"),
-        ("wow", "Wow"),
-        ("salt", "Salado"),
-    )
+    REACTION_CHOICES = REACTION_CHOICES
 
     comment = models.ForeignKey(
         Comment, related_name="reactions", on_delete=models.CASCADE
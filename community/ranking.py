@@ -0,0 +1,66 @@
+# community/ranking.py
+"""
+Orden "populares" del feed: puntuación con decaimiento temporal al estilo
+Hacker News,
+
+    hot = (reacciones + COMMENT_WEIGHT · comentarios) / (horas + 2) ** GRAVITY
+
+guardada en Post.hot_score (índice junto a is_removed e id) para que el feed
+ordene directamente desde el índice, sin agregar PostReaction ni Comment por
+petición.
+
+- Cada reacción o comentario recalcula la puntuación de ese post (rescore),
+  en la misma transacción que sus contadores.
+- La edad corre aunque nadie escriba: `manage.py rescore_hot`, periódico
+  (p. ej. cada 15 minutos con cron), recalcula sólo los posts de la ventana
+  HOT_WINDOW y deja a 0 los que han salido de ella.
+"""
+import datetime
+
+from django.utils import timezone
+
+from .models import Post
+
+GRAVITY = 1.8
+COMMENT_WEIGHT = 2
+# Más allá, un post deja de competir en "populares" (puntuación 0)
+HOT_WINDOW = datetime.timedelta(days=7)
+
+
+def hot_score(reactions, comments, created, now=None):
+    now = now or timezone.now()
+    age = now - created
+    if age > HOT_WINDOW:
+        return 0.0
+    hours = max(age.total_seconds(), 0) / 3600
+    return (reactions + COMMENT_WEIGHT * comments) / (hours + 2) ** GRAVITY
+
+
+def rescore(queryset, now=None):
+    """Recalcula hot_score de los posts de `queryset`; devuelve cuántos cambiaron."""
+    now = now or timezone.now()
+    changed = []
+    rows = queryset.values_list("pk", "reactions_count", "comments_count", "created", "hot_score")
+    for pk, reactions, comments, created, old in rows.iterator():
+        score = hot_score(reactions, comments, created, now)
+        if score != old:
+            changed.append(Post(pk=pk, hot_score=score))
+    Post.objects.bulk_update(changed, ["hot_score"], batch_size=500)
+    return len(changed)
+
+
+def rescore_posts(pks, now=None):
+    """Tras escribir en unos posts concretos (reacciones, comentarios)."""
+    return rescore(Post.objects.filter(pk__in=pks), now)
+
+
+def decay(now=None):
+    """
+    Trabajo periódico: reescala los posts de la ventana y apaga los que ya
+    han salido de ella. Devuelve (recalculados, apagados).
+    """
+    now = now or timezone.now()
+    cutoff = now - HOT_WINDOW
+    rescored = rescore(Post.objects.filter(created__gte=cutoff, is_removed=False), now)
+    expired = Post.objects.filter(created__lt=cutoff, hot_score__gt=0).update(hot_score=0)
+    return rescored, expired
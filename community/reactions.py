@@ -0,0 +1,150 @@
+# community/reactions.py
+"""
+Servicio de reacciones a posts y comentarios.
+
+toggle() aplica un clic de reacción sin leer antes la fila:
+
+    DELETE FROM <reacciones> WHERE objeto=? AND usuario=? RETURNING reaction
+    INSERT ... ON CONFLICT (objeto, usuario) DO NOTHING RETURNING id   (si cambia)
+
+Las dos sentencias y el ajuste de los contadores (reactions_count, el
+desglose por tipo de ReactionSummary y, en posts, hot_score) van en la
+misma transacción.
+Como la primera ya escribe, SQLite toma el bloqueo de escritura desde el
+principio: un doble clic concurrente espera su turno (busy timeout) y ve el
+resultado del primero, en vez de leer con get_or_create, intentar subir a
+escritura y fallar con "database is locked" o IntegrityError por el
+unique_together. Requiere RETURNING (SQLite ≥ 3.35 o Postgres).
+
+bulk_import() carga reacciones en lote (importaciones, reproducir un
+registro) con INSERT ... ON CONFLICT DO UPDATE y recalcula los contadores de
+los objetos afectados (total y por tipo) con un único UPDATE.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import ranking
+from .models import (
+    REACTION_CHOICES,
+    Comment,
+    CommentReaction,
+    Post,
+    PostReaction,
+    bump_counters,
+    count_subquery,
+    reaction_field,
+)
+
+REACTIONS = dict(REACTION_CHOICES)
+
+# kind → (modelo de reacción, FK al objeto, modelo del objeto)
+TARGETS = {
+    "post": (PostReaction, "post", Post),
+    "comment": (CommentReaction, "comment", Comment),
+}
+
+
+def _target(kind):
+    try:
+        return TARGETS[kind]
+    except KeyError:
+        raise ValueError(f"Tipo de objeto desconocido: {kind!r}") from None
+
+
+def _check(reaction):
+    if reaction not in REACTIONS:
+        raise ValueError(f"Reacción desconocida: {reaction!r}")
+
+
+def toggle(kind, target_id, user_id, reaction):
+    """
+    Un clic del usuario en `reaction` sobre el objeto `target_id`:
+    - sin reacción previa → la añade
+    - misma reacción → la quita
+    - otra reacción → la cambia
+
+    Devuelve (anterior, actual); cualquiera de las dos puede ser None.
+    """
+    _check(reaction)
+    model, fk, target = _target(kind)
+    table = connection.ops.quote_name(model._meta.db_table)
+    fk_col = connection.ops.quote_name(model._meta.get_field(fk).column)
+    user_col = connection.ops.quote_name(model._meta.get_field("user").column)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {fk_col} = %s AND {user_col} = %s RETURNING reaction",
+            [target_id, user_id],
+        )
+        row = cursor.fetchone()
+        previous = row[0] if row else None
+        current = None
+
+        if previous != reaction:
+            cursor.execute(
+                f"INSERT INTO {table} ({fk_col}, {user_col}, reaction, created) "
+                f"VALUES (%s, %s, %s, %s) "
+                f"ON CONFLICT ({fk_col}, {user_col}) DO NOTHING RETURNING id",
+                [
+                    target_id,
+                    user_id,
+                    reaction,
+                    connection.ops.adapt_datetimefield_value(timezone.now()),
+                ],
+            )
+            # Sin fila: otra petición del mismo usuario insertó entre medias
+            # (sólo posible fuera de SQLite); gana la suya
+            if cursor.fetchone():
+                current = reaction
+
+        deltas = {"reactions_count": (current is not None) - (previous is not None)}
+        if previous in REACTIONS:
+            deltas[reaction_field(previous)] = -1
+        if current:
+            deltas[reaction_field(current)] = 1
+        bump_counters(target, target_id, deltas)
+        if kind == "post":
+            ranking.rescore_posts([target_id])
+
+    return previous, current
+
+
+def recount(kind, ids=None):
+    """Recalcula los contadores de reacciones de los objetos `ids` (todos si es None)."""
+    model, fk, target = _target(kind)
+    qs = target.objects.all() if ids is None else target.objects.filter(pk__in=ids)
+    return qs.update(
+        reactions_count=count_subquery(model, fk),
+        **{reaction_field(r): count_subquery(model, fk, reaction=r) for r in REACTIONS},
+    )
+
+
+def bulk_import(kind, rows, batch_size=500):
+    """
+    Carga reacciones `(target_id, user_id, reaction)` en lote. Si el usuario
+    ya había reaccionado a ese objeto, se queda la reacción de `rows` (la
+    última si se repite). Devuelve cuántas filas se escribieron.
+    """
+    model, fk, _ = _target(kind)
+    latest = {}
+    for target_id, user_id, reaction in rows:
+        _check(reaction)
+        latest[(target_id, user_id)] = reaction
+
+    objs = [
+        model(**{f"{fk}_id": target_id, "user_id": user_id, "reaction": reaction})
+        for (target_id, user_id), reaction in latest.items()
+    ]
+    with transaction.atomic():
+        model.objects.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=[fk, "user"],
+            update_fields=["reaction"],
+        )
+        targets = {target_id for target_id, _ in latest}
+        recount(kind, targets)
+        if kind == "post":
+            ranking.rescore_posts(targets)
+    return len(objs)
@@ -1,3 +1,306 @@
-from django.test import TestCase
+import datetime
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import ranking, reactions
+from .models import (
+    Post, Comment, Forum, Thread, PostReaction, CommentReaction, latest_comments_prefetch,
+)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("eco", password="x")
+        self.post = Post.objects.create(author=self.user, title="Hola", body="...")
+        self.client.force_login(self.user)
+
+    def test_comment_create_reply_and_delete_update_counter(self):
+        self.client.post(
+            reverse("community:comment_create", args=[self.post.slug]),
+            {"body": "raíz"},
+        )
+        root = Comment.objects.get(post=self.post)
+        self.client.post(
+            reverse("community:comment_reply", args=[root.pk]), {"body": "hija"}
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 2)
+
+        self.client.post(reverse("community:comment_delete", args=[root.pk]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+
+    def test_post_react_toggle_updates_counter(self):
+        url = reverse("community:post_react", args=[self.post.slug, "gg"])
+        self.client.post(url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.reactions_count, 1)
+
+        self.client.post(reverse("community:post_react", args=[self.post.slug, "wow"]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.reactions_count, 1)
+
+        self.client.post(reverse("community:post_react", args=[self.post.slug, "wow"]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.reactions_count, 0)
+
+    def test_rebuild_counters(self):
+        Comment.objects.create(post=self.post, author=self.user, body="a")
+        PostReaction.objects.create(post=self.post, user=self.user, reaction="gg")
+        call_command("rebuild_counters", stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertEqual(self.post.reactions_count, 1)
+
+
+class ReactionServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("eco", password="x")
+        self.post = Post.objects.create(author=self.user, title="Hola", body="...")
+
+    def toggle(self, reaction):
+        result = reactions.toggle("post", self.post.pk, self.user.pk, reaction)
+        self.post.refresh_from_db()
+        return result
+
+    def test_toggle_adds_switches_and_removes(self):
+        self.assertEqual(self.toggle("gg"), (None, "gg"))
+        self.assertEqual(self.toggle("salt"), ("gg", "salt"))
+        self.assertEqual(self.post.reactions_count, 1)
+        self.assertEqual((self.post.gg_count, self.post.salt_count), (0, 1))
+        self.assertEqual(PostReaction.objects.get().reaction, "salt")
+        self.assertEqual(self.toggle("salt"), ("salt", None))
+        self.assertEqual(self.post.reactions_count, 0)
+        self.assertFalse(PostReaction.objects.exists())
+        with self.assertRaises(ValueError):
+            self.toggle("meh")
+
+    def test_bulk_import_upserts_and_recounts(self):
+        other = User.objects.create_user("otro", password="x")
+        comment = Comment.objects.create(post=self.post, author=self.user, body="a")
+        reactions.toggle("comment", comment.pk, self.user.pk, "like")
+
+        written = reactions.bulk_import("comment", [
+            (comment.pk, self.user.pk, "wow"),
+            (comment.pk, other.pk, "gg"),
+            (comment.pk, other.pk, "salt"),
+        ])
+        comment.refresh_from_db()
+        self.assertEqual(written, 2)
+        self.assertEqual(comment.reactions_count, 2)
+        self.assertEqual(
+            [(key, n) for key, _, n in comment.reaction_summary], [("wow", 1), ("salt", 1)]
+        )
+        self.assertEqual(
+            dict(CommentReaction.objects.values_list("user__username", "reaction")),
+            {"eco": "wow", "otro": "salt"},
+        )
+
+
+@override_settings(STORAGES={
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class CommentTreeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("eco", password="x")
+        self.post = Post.objects.create(author=self.user, title="Hola", body="...")
+
+    def comment(self, body, parent=None):
+        return Comment.objects.create(post=self.post, author=self.user, body=body, parent=parent)
+
+    def test_subtree_is_depth_first_and_removed_in_one_update(self):
+        a = self.comment("a")
+        b = self.comment("b")
+        a1 = self.comment("a1", a)
+        a1x = self.comment("a1x", a1)
+        a2 = self.comment("a2", a)
+        self.assertEqual((a.depth, a1.depth, a1x.depth), (0, 1, 2))
+        self.assertEqual([c.body for c in a.subtree()], ["a", "a1", "a1x", "a2"])
+        self.assertEqual(
+            [c.body for c in Comment.objects.filter(post=self.post).order_by("path")],
+            ["a", "a1", "a1x", "a2", "b"],
+        )
+
+        call_command("rebuild_counters", stdout=StringIO())
+        self.client.force_login(self.user)
+        self.client.post(reverse("community:comment_delete", args=[a1.pk]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 3)
+        self.assertEqual(Comment.objects.get(pk=a.pk).replies_count, 1)
+        self.assertEqual(
+            set(Comment.objects.filter(is_removed=True).values_list("body", flat=True)),
+            {"a1", "a1x"},
+        )
+        self.assertTrue(Comment.objects.get(pk=a2.pk).path.startswith(a.path))
+        self.assertFalse(Comment.objects.get(pk=b.pk).is_removed)
+
+    def test_detail_is_paged_by_branch_with_a_preview_of_replies(self):
+        root = self.comment("raíz")
+        hija = self.comment("hija", root)
+        self.comment("nieta", hija)
+        for i in range(3):
+            self.comment(f"hermana {i}", root)
+        for i in range(3):
+            self.comment(f"otra {i}")
+        call_command("rebuild_counters", stdout=StringIO())
+
+        with mock.patch("community.views.COMMENT_BRANCHES_PER_PAGE", 2), \
+                mock.patch("community.views.REPLIES_PREVIEW", 2):
+            response = self.client.get(self.post.get_absolute_url())
+        html = response.content.decode()
+        self.assertIn("otra 0", html)
+        self.assertNotIn("otra 1", html)
+        self.assertIn('hx-trigger="revealed"', html)
+        # Muestra de 2 respuestas; la nieta y el resto de hermanas, bajo demanda
+        self.assertIn("hermana 0", html)
+        self.assertNotIn("hermana 1", html)
+        self.assertNotIn("nieta", html)
+        self.assertIn(reverse("community:comment_replies", args=[hija.pk]), html)
+
+        with mock.patch("community.views.REPLIES_PER_PAGE", 1):
+            more = self.client.get(
+                reverse("community:comment_replies", args=[root.pk]),
+                {"despues": Comment.objects.get(body="hermana 0").path},
+            ).content.decode()
+        self.assertIn("hermana 1", more)
+        self.assertNotIn("hermana 2", more)
+        self.assertIn("despues=", more)
+
+        # Post moderado: sus respuestas tampoco se sirven por separado
+        Post.objects.filter(pk=self.post.pk).update(is_removed=True)
+        response = self.client.get(reverse("community:comment_replies", args=[root.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(STORAGES={
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class HotRankingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("eco", password="x")
+
+    def post(self, title, hours_ago):
+        post = Post.objects.create(author=self.user, title=title, body="...")
+        created = timezone.now() - datetime.timedelta(hours=hours_ago)
+        Post.objects.filter(pk=post.pk).update(created=created)
+        post.created = created
+        return post
+
+    def test_score_decays_with_age(self):
+        now = timezone.now()
+        fresh = ranking.hot_score(10, 0, now - datetime.timedelta(hours=1), now)
+        old = ranking.hot_score(10, 0, now - datetime.timedelta(hours=30), now)
+        self.assertGreater(fresh, old)
+        self.assertEqual(ranking.hot_score(10, 0, now - ranking.HOT_WINDOW * 2, now), 0)
+
+    def test_writes_update_score_and_feed_orders_by_it(self):
+        quiet = self.post("tranquilo", hours_ago=1)
+        busy = self.post("movido", hours_ago=5)
+        stale = self.post("viejo", hours_ago=24 * 30)
+        Post.objects.filter(pk=stale.pk).update(hot_score=99)
+
+        reactions.toggle("post", busy.pk, self.user.pk, "gg")
+        self.client.force_login(self.user)
+        self.client.post(reverse("community:comment_create", args=[busy.slug]), {"body": "a"})
+        busy.refresh_from_db()
+        self.assertGreater(busy.hot_score, 0)
+
+        _, expired = ranking.decay()
+        self.assertEqual(expired, 1)
+        response = self.client.get(reverse("community:feed"), {"orden": "populares"})
+        titles = [p.title for p in response.context["posts"]]
+        self.assertEqual(titles, [busy.title, stale.title, quiet.title])
+        quiet.refresh_from_db()
+        self.assertEqual(quiet.hot_score, 0)   # sin actividad no puntúa
+
+
+class LatestCommentsPrefetchTests(TestCase):
+    def test_only_latest_n_visible_comments_per_post(self):
+        user = User.objects.create_user("eco", password="x")
+        a = Post.objects.create(author=user, title="A", body="...")
+        b = Post.objects.create(author=user, title="B", body="...")
+        for i in range(5):
+            Comment.objects.create(post=a, author=user, body=f"a{i}")
+        Comment.objects.create(post=b, author=user, body="b0")
+        Comment.objects.create(post=b, author=user, body="oculto", is_removed=True)
+
+        posts = {
+            p.title: p
+            for p in Post.objects.prefetch_related(latest_comments_prefetch(2))
+        }
+        self.assertEqual([c.body for c in posts["A"].latest_comments], ["a4", "a3"])
+        self.assertEqual([c.body for c in posts["B"].latest_comments], ["b0"])
+
+
+@override_settings(STORAGES={
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class HtmxFragmentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("eco", password="x")
+        self.post = Post.objects.create(author=self.user, title="Hola", body="...")
+        self.client.force_login(self.user)
+
+    def hx_post(self, url, data=None):
+        return self.client.post(url, data or {}, HTTP_HX_REQUEST="true")
+
+    def test_reaction_returns_only_the_bar(self):
+        response = self.hx_post(reverse("community:post_react", args=[self.post.slug, "gg"]))
+        html = response.content.decode()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('id="post-reactions"', html)
+        self.assertIn("1 reacción", html)
+        self.assertIn('data-reaction="gg">1 GG</span>', html)
+        self.assertNotIn("<html", html)
+        self.assertNotIn("comments-panel", html)
+
+    def test_comment_and_reply_return_nodes_with_oob_counter(self):
+        response = self.hx_post(
+            reverse("community:comment_create", args=[self.post.slug]), {"body": "raíz"}
+        )
+        root = Comment.objects.get(post=self.post)
+        html = response.content.decode()
+        self.assertIn(f'id="comment-{root.pk}"', html)
+        self.assertIn('id="comments-count" class="text-xs text-white/60" hx-swap-oob="true"', html)
+        self.assertIn("1 comentario", html)
+
+        response = self.hx_post(reverse("community:comment_reply", args=[root.pk]), {"body": "hija"})
+        html = response.content.decode()
+        self.assertIn(f'id="comment-{root.pk}-replies"', html)
+        self.assertIn("hija", html)
+        self.assertIn("2 comentarios", html)
+
+        response = self.hx_post(reverse("community:comment_reply", args=[root.pk]), {"body": " "})
+        self.assertEqual(response.status_code, 400)
+
+        # La página completa usa los mismos fragmentos
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, f'id="comment-{root.pk}-replies"')
+        self.assertContains(response, 'id="post-reactions"')
+
+    def test_comment_react_returns_button(self):
+        comment = Comment.objects.create(post=self.post, author=self.user, body="a")
+        response = self.hx_post(reverse("community:comment_react", args=[comment.pk, "like"]))
+        html = response.content.decode()
+        self.assertIn(f'id="comment-react-{comment.pk}"', html)
+        self.assertIn("comment-chip active", html)
+
+    def test_thread_reply_fragment_and_full_page(self):
+        forum = Forum.objects.create(title="General", slug="general")
+        thread = Thread.objects.create(forum=forum, author=self.user, title="Hilo", body="...")
+        response = self.hx_post(reverse("community:thread_reply", args=[thread.slug]), {"body": "hola"})
+        self.assertIn('class="card mb-3" id="reply-', response.content.decode())
+
+        # Sin HTMX se sigue redirigiendo a la página completa, que renderiza
+        response = self.client.post(reverse("community:thread_reply", args=[thread.slug]), {"body": "otra"})
+        self.assertRedirects(response, thread.get_absolute_url())
+        self.assertContains(self.client.get(thread.get_absolute_url()), 'id="thread-replies"')
@@ -31,6 +31,11 @@ urlpatterns = [
         views.comment_reply,
         name="comment_reply",
     ),
+    path(
+        "comentario/<int:pk>/respuestas/",
+        views.comment_replies,
+        name="comment_replies",
+    ),
     path(
         "comentario/<int:pk>/eliminar/",
         views.comment_delete,
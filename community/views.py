@@ -1,10 +1,10 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from django.template.loader import render_to_string
 from django.apps import apps
-from django.db.models import Count, Q, Prefetch
+from django.db import transaction
 
 from .models import (
     Post,
@@ -15,8 +15,15 @@ from .models import (
     ModerationLog,
     PostReaction,
     CommentReaction,
+    REACTION_COUNT_FIELDS,
+    bump_counter,
+    latest_comments_prefetch,
+    replies_prefetch,
 )
 from .forms import PostForm, CommentForm, ThreadForm, ThreadReplyForm
+from . import ranking, reactions
+from core import search
+from core.pagination import paginate_cursor
 
 
 try:
@@ -25,6 +32,70 @@ except LookupError:
     Notification = None
 
 
+def _fragment(request, template, context, post=None):
+    """
+    Respuesta HTMX: sólo el fragmento que cambió. Con `post`, añade el
+    contador de comentarios como swap out-of-band (hx-swap-oob).
+    """
+    html = render_to_string(template, context, request=request)
+    if post is not None:
+        post.refresh_from_db(fields=["comments_count"])
+        html += render_to_string(
+            "community/_comments_count.html", {"post": post, "oob": True}, request=request
+        )
+    return HttpResponse(html)
+
+
+def _annotate_user_reactions(user, comments):
+    """Pone en cada comentario `user_reaction` (la reacción de `user` o None)."""
+    by_comment = {}
+    if user.is_authenticated:
+        by_comment = dict(
+            CommentReaction.objects.filter(comment__in=comments, user=user)
+            .values_list("comment_id", "reaction")
+        )
+    for c in comments:
+        c.user_reaction = by_comment.get(c.id)
+
+
+COMMENT_BRANCHES_PER_PAGE = 20
+# Respuestas que se muestran de entrada bajo cada comentario; el resto, con
+# "Ver más respuestas" (comment_replies), de REPLIES_PER_PAGE en REPLIES_PER_PAGE
+REPLIES_PREVIEW = 3
+REPLIES_PER_PAGE = 10
+
+
+def _with_replies(request, comments):
+    """
+    `comments` (ya evaluados con replies_prefetch) + sus respuestas de
+    muestra, con la reacción del usuario en todos.
+    """
+    nodes = list(comments)
+    for c in comments:
+        nodes.extend(c.replies_list)
+    _annotate_user_reactions(request.user, nodes)
+    return comments
+
+
+def _comment_page(request, post):
+    """
+    Una página de ramas de comentarios: los comentarios raíz por cursor
+    (orden de path = antigüedad), cada uno con sus REPLIES_PREVIEW primeras
+    respuestas. Lo demás se carga bajo demanda, así que una página cuesta lo
+    mismo con 10 comentarios que con 5.000.
+    """
+    page = paginate_cursor(
+        request,
+        post.comments.filter(parent__isnull=True, is_removed=False)
+        .select_related("author")
+        .prefetch_related(replies_prefetch(REPLIES_PREVIEW)),
+        COMMENT_BRANCHES_PER_PAGE,
+        ("path",),
+    )
+    _with_replies(request, page.object_list)
+    return page
+
+
 # ========= FEED / POSTS =========
 
 
@@ -34,8 +105,10 @@ def feed(request):
     - filtro por tipo (?tipo=post|review|all)
     - búsqueda por texto (?q=...)
     - filtro por autor (?autor=username)
+    - orden (?orden=recientes|populares)
     """
     current_type = request.GET.get("tipo", "all")
+    current_order = request.GET.get("orden", "recientes")
     query = (request.GET.get("q") or "").strip()
     author_username = (request.GET.get("autor") or "").strip()
 
@@ -50,120 +123,73 @@ def feed(request):
     else:
         current_type = "all"
 
-    # Búsqueda por texto
+    # Búsqueda por texto (índice FTS, sin LIKE '%q%')
     if query:
-        qs = qs.filter(
-            Q(title__icontains=query) |
-            Q(body__icontains=query)
-        )
+        qs = search.filter_queryset(qs, "post", query)
 
     # Filtro por autor
     if author_username:
         qs = qs.filter(author__username__iexact=author_username)
 
-    # Anotaciones agregadas
-    qs = (
-        qs.annotate(
-            num_comments=Count(
-                "comments",
-                filter=Q(comments__is_removed=False),
-            ),
-            num_reactions=Count("reactions", distinct=True),
-        )
-        .prefetch_related(
-            Prefetch(
-                "comments",
-                queryset=Comment.objects.filter(is_removed=False)
-                .select_related("author")
-                .order_by("-created"),
-                to_attr="all_comments",
-            )
-        )
-        .order_by("-created")
-    )
-
-    paginator = Paginator(qs, 10)
-    page = request.GET.get("page")
-    posts = paginator.get_page(page)
+    # Los contadores ya vienen en la fila (comments_count / reactions_count)
+    # Últimos 2 comentarios recientes para preview (recortados en SQL)
+    qs = qs.prefetch_related(latest_comments_prefetch(2))
 
-    # Últimos 2 comentarios recientes para preview
-    for p in posts:
-        p.latest_comments = getattr(p, "all_comments", [])[:2]
+    # Paginación por cursor: sin COUNT ni OFFSET. "populares" ordena por la
+    # puntuación precalculada (índice is_removed, -hot_score, -id)
+    if current_order == "populares":
+        ordering = ("-hot_score", "-id")
+    else:
+        current_order = "recientes"
+        ordering = ("-created", "-id")
+    posts = paginate_cursor(request, qs, 10, ordering)
 
     context = {
         "posts": posts,
         "current_type": current_type,
+        "current_order": current_order,
         "query": query,
         "author_username": author_username,
     }
+    # Scroll infinito: HTMX sólo necesita el siguiente bloque de tarjetas
+    if request.htmx:
+        return render(request, "community/_post_list.html", context)
     return render(request, "community/index.html", context)
 
 
 def post_detail(request, slug):
     """
-    Detalle de un post: cuerpo, imagen, estadísticas,
-    comentarios (en árbol simple: raíz + respuestas)
-    y reacciones.
+    Detalle de un post: cuerpo, imagen, estadísticas, reacciones y
+    comentarios en árbol, paginados por rama (ver _comment_page).
     """
     post = get_object_or_404(
-        Post.objects.annotate(
-            num_comments=Count(
-                "comments",
-                filter=Q(comments__is_removed=False),
-            ),
-            num_reactions=Count("reactions", distinct=True),
-        ),
+        Post.objects.select_related("author"),
         slug=slug,
         is_removed=False,
     )
 
-    comments_qs = (
-        post.comments.filter(is_removed=False)
-        .select_related("author")
-        .annotate(num_reactions=Count("reactions", distinct=True))
-        .order_by("created")
-    )
-    all_comments = list(comments_qs)
+    comments = _comment_page(request, post)
+    # Scroll infinito: HTMX sólo necesita las siguientes ramas
+    if request.htmx:
+        return render(request, "community/_comment_page.html", {"post": post, "comments": comments})
 
     form = CommentForm()
     user_post_reaction = None
 
-    # Mapa de reacciones del usuario a cada comentario
-    reactions_by_comment = {}
-
     if request.user.is_authenticated:
         # Reacción del usuario al post
-        user_post_reaction = PostReaction.objects.filter(
-            post=post, user=request.user
-        ).first()
-
-        user_comment_reactions = CommentReaction.objects.filter(
-            comment__in=all_comments, user=request.user
+        user_post_reaction = (
+            PostReaction.objects.filter(post=post, user=request.user)
+            .values_list("reaction", flat=True)
+            .first()
         )
-        reactions_by_comment = {r.comment_id: r for r in user_comment_reactions}
-
-    for c in all_comments:
-        c.user_reaction = reactions_by_comment.get(c.id)
-
-    # Construimos árbol: comentarios raíz + sus respuestas
-    root_comments = []
-    replies_map = {}
-
-    for c in all_comments:
-        if c.parent_id:
-            replies_map.setdefault(c.parent_id, []).append(c)
-        else:
-            root_comments.append(c)
-
-    for c in root_comments:
-        c.replies_list = replies_map.get(c.id, [])
 
     return render(
         request,
         "community/post_detail.html",
         {
             "post": post,
-            "comments": root_comments,
+            "comments": comments,
             "form": form,
             "user_post_reaction": user_post_reaction,
         },
@@ -265,8 +291,19 @@ def comment_create(request, slug):
         c.post = post
         c.author = request.user
         # parent = None por defecto → comentario raíz
-        c.save()
+        with transaction.atomic():
+            c.save()
+            bump_counter(Post, post.pk, "comments_count", 1)
+            ranking.rescore_posts([post.pk])
+
+        if request.htmx:
+            # Sólo el nodo nuevo, que HTMX añade al final de la lista
+            c.replies_list = []
+            c.user_reaction = None
+            return _fragment(request, "community/_comment.html", {"c": c}, post=post)
         messages.success(request, "Comentario publicado.")
+    elif request.htmx:
+        return HttpResponseBadRequest()
 
     return redirect(post.get_absolute_url())
 
@@ -282,23 +319,110 @@ def comment_reply(request, pk):
     if request.method == "POST":
         body = (request.POST.get("body") or "").strip()
         if not body:
+            if request.htmx:
+                return HttpResponseBadRequest()
             messages.error(request, "Escribe un mensaje para responder.")
         else:
-            Comment.objects.create(
-                post=post,
-                author=request.user,
-                parent=parent,
-                body=body,
-            )
+            with transaction.atomic():
+                reply = Comment.objects.create(
+                    post=post,
+                    author=request.user,
+                    parent=parent,
+                    body=body,
+                )
+                bump_counter(Post, post.pk, "comments_count", 1)
+                bump_counter(Comment, reply.parent_id, "replies_count", 1)
+                ranking.rescore_posts([post.pk])
+            # Más allá de PATH_MAX_DEPTH la respuesta se cuelga del abuelo
+            parent = reply.parent
+
+            if request.htmx:
+                # La muestra de respuestas del comentario, ya desplegada, con
+                # la nueva al final aunque no entre en la muestra
+                parent.refresh_from_db(fields=["replies_count"])
+                parent.replies_list = list(
+                    parent.replies.filter(is_removed=False)
+                    .select_related("author")
+                    .order_by("path")[:REPLIES_PREVIEW]
+                )
+                new_reply = None
+                if reply not in parent.replies_list:
+                    new_reply = reply
+                _annotate_user_reactions(request.user, parent.replies_list + [reply])
+                return _fragment(
+                    request,
+                    "community/_comment_replies.html",
+                    {
+                        "c": parent,
+                        "open": True,
+                        "new_reply": new_reply,
+                        # ¿Quedan respuestas entre la muestra y la nueva?
+                        "more_replies": parent.replies_count > len(parent.replies_list) + 1,
+                    },
+                    post=post,
+                )
             messages.success(request, "Respuesta publicada.")
 
     return redirect(post.get_absolute_url())
 
 
+def comment_replies(request, pk):
+    """
+    "Ver más respuestas" (HTMX): la siguiente página de respuestas directas
+    de un comentario, en orden de path, cada una con su muestra de
+    respuestas, y el botón para la siguiente página si queda algo.
+    ?despues=<path> continúa tras la última mostrada; ?hasta=<path> deja
+    fuera la respuesta recién publicada que ya está en pantalla.
+    """
+    parent = get_object_or_404(Comment, pk=pk, is_removed=False, post__is_removed=False)
+    qs = (
+        parent.replies.filter(is_removed=False)
+        .select_related("author")
+        .prefetch_related(replies_prefetch(REPLIES_PREVIEW))
+        .order_by("path")
+    )
+    after = request.GET.get("despues")
+    until = request.GET.get("hasta")
+    if after:
+        qs = qs.filter(path__gt=after)
+    if until:
+        qs = qs.filter(path__lt=until)
+
+    replies = list(qs[: REPLIES_PER_PAGE + 1])
+    has_more = len(replies) > REPLIES_PER_PAGE
+    replies = _with_replies(request, replies[:REPLIES_PER_PAGE])
+    return render(
+        request,
+        "community/_replies_page.html",
+        {
+            "parent": parent,
+            "replies": replies,
+            "next_after": replies[-1].path if has_more else None,
+            "until": until,
+        },
+    )
+
+
+def _remove_comment(comment):
+    """
+    Marca el comentario y todo su subárbol como eliminados (un UPDATE por
+    rango de path) y descuenta del contador del post sólo los que seguían
+    visibles.
+    """
+    with transaction.atomic():
+        was_visible = not comment.is_removed
+        removed = comment.subtree().filter(is_removed=False).update(is_removed=True)
+        bump_counter(Post, comment.post_id, "comments_count", -removed)
+        if was_visible and comment.parent_id:
+            bump_counter(Comment, comment.parent_id, "replies_count", -1)
+        ranking.rescore_posts([comment.post_id])
+    comment.is_removed = True
+
+
 @login_required
 def comment_delete(request, pk):
     """
-    Eliminar comentario (y opcionalmente sus respuestas).
+    Eliminar comentario con todas sus respuestas.
     Superuser: registra ModerationLog, motivo opcional.
     Autor normal: sólo marca como eliminado.
     """
@@ -313,11 +437,8 @@ def comment_delete(request, pk):
             if not reason:
                 reason = "Eliminado por moderación."
 
-            comment.is_removed = True
-            comment.save()
-
-            # Ocultamos también sus respuestas directas
-            Comment.objects.filter(parent=comment).update(is_removed=True)
+            # Ocultamos también todas sus respuestas
+            _remove_comment(comment)
 
             ModerationLog.objects.create(
                 content_type="comment",
@@ -334,9 +455,7 @@ def comment_delete(request, pk):
 
             messages.success(request, "Comentario retirado.")
         elif request.user == owner:
-            comment.is_removed = True
-            comment.save()
-            Comment.objects.filter(parent=comment).update(is_removed=True)
+            _remove_comment(comment)
             messages.success(request, "Comentario eliminado por ti.")
         else:
             return HttpResponseForbidden()
@@ -347,6 +466,14 @@ def comment_delete(request, pk):
 # ========= REACCIONES =========
 
 
+def _reaction_message(previous, current):
+    if previous is None:
+        return "Reacción añadida."
+    if current is None:
+        return "Reacción eliminada."
+    return "Reacción actualizada."
+
+
 @login_required
 def post_react(request, slug, reaction):
     """
@@ -357,21 +484,19 @@ def post_react(request, slug, reaction):
     if request.method != "POST":
         return redirect(post.get_absolute_url())
 
-    obj, created = PostReaction.objects.get_or_create(
-        post=post, user=request.user, defaults={"reaction": reaction}
-    )
-
-    if not created:
-        if obj.reaction == reaction:
-            obj.delete()
-            messages.success(request, "Reacción eliminada.")
-        else:
-            obj.reaction = reaction
-            obj.save()
-            messages.success(request, "Reacción actualizada.")
-    else:
-        messages.success(request, "Reacción añadida.")
-
+    if reaction not in reactions.REACTIONS:
+        raise Http404("Reacción desconocida.")
+    previous, current = reactions.toggle("post", post.pk, request.user.pk, reaction)
+
+    if request.htmx:
+        # Sólo la barra de reacciones (sin comentarios ni el resto de la página)
+        post.refresh_from_db(fields=REACTION_COUNT_FIELDS + ["comments_count"])
+        return _fragment(
+            request,
+            "community/_reaction_bar.html",
+            {"post": post, "user_post_reaction": current},
+        )
+    messages.success(request, _reaction_message(previous, current))
     return redirect(post.get_absolute_url())
 
 
@@ -386,21 +511,16 @@ def comment_react(request, pk, reaction):
     if request.method != "POST":
         return redirect(post.get_absolute_url())
 
-    obj, created = CommentReaction.objects.get_or_create(
-        comment=comment, user=request.user, defaults={"reaction": reaction}
-    )
-
-    if not created:
-        if obj.reaction == reaction:
-            obj.delete()
-            messages.success(request, "Reacción eliminada.")
-        else:
-            obj.reaction = reaction
-            obj.save()
-            messages.success(request, "Reacción actualizada.")
-    else:
-        messages.success(request, "Reacción añadida.")
+    if reaction not in reactions.REACTIONS:
+        raise Http404("Reacción desconocida.")
+    previous, current = reactions.toggle("comment", comment.pk, request.user.pk, reaction)
 
+    if request.htmx:
+        # Sólo el botón de ese comentario
+        comment.refresh_from_db(fields=REACTION_COUNT_FIELDS)
+        comment.user_reaction = current
+        return _fragment(request, "community/_comment_react.html", {"c": comment})
+    messages.success(request, _reaction_message(previous, current))
     return redirect(post.get_absolute_url())
 
 
@@ -414,10 +534,12 @@ def forum_index(request):
 
 def forum_detail(request, slug):
     forum = get_object_or_404(Forum, slug=slug)
-    threads = forum.threads.filter(is_removed=False)
-    return render(
-        request, "community/forum_detail.html", {"forum": forum, "threads": threads}
-    )
+    qs = forum.threads.filter(is_removed=False).select_related("author", "forum")
+    threads = paginate_cursor(request, qs, 20, ("-created", "-id"))
+    ctx = {"forum": forum, "threads": threads}
+    if request.htmx:
+        return render(request, "community/_thread_list.html", ctx)
+    return render(request, "community/forum_detail.html", ctx)
 
 
 @login_required
@@ -451,6 +573,8 @@ def thread_reply(request, slug):
     thread = get_object_or_404(Thread, slug=slug)
 
     if thread.is_locked:
+        if request.htmx:
+            return HttpResponseForbidden("El hilo está cerrado.")
         messages.error(request, "El hilo está cerrado.")
         return redirect(thread.get_absolute_url())
 
@@ -461,7 +585,12 @@ def thread_reply(request, slug):
         r.thread = thread
         r.author = request.user
         r.save()
+        if request.htmx:
+            # Sólo la respuesta nueva, que HTMX añade al final de la lista
+            return _fragment(request, "community/_thread_reply.html", {"r": r})
         messages.success(request, "Respuesta publicada.")
+    elif request.htmx:
+        return HttpResponseBadRequest()
 
     return redirect(thread.get_absolute_url())
 
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Índice de búsqueda: se actualiza al guardar/borrar contenido indexable
+        from .signals import connect_search_signals, connect_upload_signals
+        connect_search_signals()
+
+        # Subidas: normalizar/deduplicar al guardar y borrar las reemplazadas
+        connect_upload_signals()
@@ -0,0 +1,477 @@
+# core/cssbuild.py
+"""
+CSS de utilidades "a la Tailwind" generado sin red ni Node.
+
+Sustituye al CDN de Tailwind (que compilaba las clases en el navegador en
+cada carga). `manage.py build_css`:
+
+1. Recorre las plantillas, los JS de static/js y los .py de las apps (los
+   `attrs={"class": …}` de los formularios) y extrae todo lo que parece una
+   clase, igual que hace Tailwind con su `content`.
+2. Genera CSS sólo para las que reconoce este módulo (las propias del tema,
+   p. ej. `.hero-title`, están en theme.css y se ignoran), con el preflight
+   de Tailwind delante, y lo minifica → static/css/tailwind.css.
+3. Con una copia local de Font Awesome (--fontawesome o
+   settings.FONTAWESOME_SOURCE) escribe static/css/icons.css sólo con los
+   iconos usados y copia sus webfonts.
+
+Ambos archivos van a STATICFILES_DIRS: collectstatic los versiona con hash
+y entran en el manifest y en la precaché del service worker.
+
+Soporta el subconjunto de Tailwind v3 que usa el sitio (ver RULES) con las
+variantes sm/md/lg/xl/2xl, hover, focus, active, group-hover; los valores
+arbitrarios `[...]` donde tienen sentido (bg-[#0b0f14], tracking-[.2em]…) y
+la opacidad en colores (text-white/70). Una clase nueva que no salga en el
+CSS se añade en RULES.
+"""
+import re
+from pathlib import Path
+
+# Sólo plantillas y JS: en los .py las clases de los widgets son propias
+# (input, select…) y escanearlos mete falsos positivos (tests, reglas)
+CONTENT_GLOBS = ("templates/**/*.html", "*/templates/**/*.html", "static/js/*.js")
+PREFLIGHT = Path(__file__).with_name("css") / "preflight.css"
+
+_CANDIDATE = re.compile(r"[A-Za-z0-9_:/\[\]#.%()-]+")
+
+SCREENS = {"sm": "640px", "md": "768px", "lg": "1024px", "xl": "1280px", "2xl": "1536px"}
+PSEUDO = {"hover": ":hover", "focus": ":focus", "focus-visible": ":focus-visible",
+          "active": ":active", "disabled": ":disabled", "first": ":first-child", "last": ":last-child"}
+
+# ─────────────────────────────────────────────────────────────
+# Tema (valores por defecto de Tailwind v3)
+# ─────────────────────────────────────────────────────────────
+PALETTE = {
+    "slate": ("#f8fafc #f1f5f9 #e2e8f0 #cbd5e1 #94a3b8 #64748b #475569 #334155 #1e293b #0f172a #020617"),
+    "zinc": ("#fafafa #f4f4f5 #e4e4e7 #d4d4d8 #a1a1aa #71717a #52525b #3f3f46 #27272a #18181b #09090b"),
+    "red": ("#fef2f2 #fee2e2 #fecaca #fca5a5 #f87171 #ef4444 #dc2626 #b91c1c #991b1b #7f1d1d #450a0a"),
+}
+SHADES = ("50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950")
+COLORS = {"white": "#ffffff", "black": "#000000"}
+for _family, _values in PALETTE.items():
+    COLORS.update({f"{_family}-{s}": v for s, v in zip(SHADES, _values.split())})
+
+FONT_SIZES = {
+    "xs": ".75rem/1rem", "sm": ".875rem/1.25rem", "base": "1rem/1.5rem", "lg": "1.125rem/1.75rem",
+    "xl": "1.25rem/1.75rem", "2xl": "1.5rem/2rem", "3xl": "1.875rem/2.25rem", "4xl": "2.25rem/2.5rem",
+    "5xl": "3rem/1", "6xl": "3.75rem/1",
+}
+FONT_WEIGHTS = {"thin": 100, "extralight": 200, "light": 300, "normal": 400, "medium": 500,
+                "semibold": 600, "bold": 700, "extrabold": 800, "black": 900}
+TRACKING = {"tighter": "-0.05em", "tight": "-0.025em", "normal": "0em", "wide": "0.025em",
+            "wider": "0.05em", "widest": "0.1em"}
+MAX_WIDTHS = {"xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem",
+              "2xl": "42rem", "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem",
+              "7xl": "80rem", "none": "none", "full": "100%", "prose": "65ch"}
+RADII = {"none": "0px", "sm": "0.125rem", "": "0.25rem", "md": "0.375rem", "lg": "0.5rem",
+         "xl": "0.75rem", "2xl": "1rem", "3xl": "1.5rem", "full": "9999px"}
+FONT_SANS = ('ui-sans-serif,system-ui,sans-serif,"Apple Color Emoji","Segoe UI Emoji",'
+             '"Segoe UI Symbol","Noto Color Emoji"')
+EASE = "cubic-bezier(0.4,0,0.2,1)"
+TRANSITIONS = {
+    "": "color,background-color,border-color,text-decoration-color,fill,stroke,opacity,"
+        "box-shadow,transform,filter,backdrop-filter",
+    "colors": "color,background-color,border-color,text-decoration-color,fill,stroke",
+    "opacity": "opacity", "shadow": "box-shadow", "transform": "transform", "all": "all",
+}
+KEYFRAMES = {
+    "spin": ("1s linear infinite", "@keyframes spin{to{transform:rotate(360deg)}}"),
+    "ping": ("1s cubic-bezier(0,0,0.2,1) infinite",
+             "@keyframes ping{75%,100%{transform:scale(2);opacity:0}}"),
+    "pulse": ("2s cubic-bezier(0.4,0,0.6,1) infinite", "@keyframes pulse{50%{opacity:.5}}"),
+}
+TRANSFORM = ("translate(var(--tw-translate-x),var(--tw-translate-y)) rotate(var(--tw-rotate)) "
+             "skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) scaleX(var(--tw-scale-x)) "
+             "scaleY(var(--tw-scale-y))")
+SHORTHANDS = {"margin", "padding", "inset", "gap", "overflow", "border-width", "border-radius"}
+GRADIENT_DIRS = {"t": "top", "tr": "top right", "r": "right", "br": "bottom right",
+                 "b": "bottom", "bl": "bottom left", "l": "left", "tl": "top left"}
+
+
+def spacing(value):
+    """Escala de espaciado: 4 → 1rem, 0.5 → 0.125rem, px, [12px], auto…"""
+    if value.startswith("[") and value.endswith("]"):
+        return value[1:-1].replace("_", " ")
+    if value == "px":
+        return "1px"
+    if value in ("auto", "full", "screen", "fit", "min", "max"):
+        return {"auto": "auto", "full": "100%", "screen": "100vw", "fit": "fit-content",
+                "min": "min-content", "max": "max-content"}[value]
+    if "/" in value:
+        num, den = value.split("/", 1)
+        if num.isdigit() and den.isdigit():
+            return f"{int(num) / int(den) * 100:g}%"
+        return None
+    try:
+        n = float(value)
+    except ValueError:
+        return None
+    return "0px" if n == 0 else f"{n / 4:g}rem"
+
+
+def color(value):
+    """'white/70' → 'rgb(255 255 255 / 0.7)'; también [#hex], transparent, current."""
+    value, _, alpha = value.partition("/")
+    if value == "transparent":
+        return "transparent"
+    if value == "current":
+        return "currentColor"
+    if value.startswith("[#") and value.endswith("]"):
+        hexa = value[1:-1]
+    else:
+        hexa = COLORS.get(value)
+    if hexa is None:
+        return None
+    if not alpha:
+        return hexa
+    if not alpha.isdigit():
+        return None
+    h = hexa.lstrip("#")
+    if len(h) == 3:
+        h = "".join(c * 2 for c in h)
+    r, g, b = (int(h[i:i + 2], 16) for i in (0, 2, 4))
+    return f"rgb({r} {g} {b} / {int(alpha) / 100:g})"
+
+
+def transparent_of(value):
+    c = color(value.partition("/")[0])
+    if c is None or not c.startswith("#"):
+        return "rgb(255 255 255 / 0)"
+    h = c.lstrip("#")
+    return "rgb({} {} {} / 0)".format(*(int(h[i:i + 2], 16) for i in (0, 2, 4)))
+
+
+def _arbitrary(value):
+    if value.startswith("[") and value.endswith("]"):
+        return value[1:-1].replace("_", " ")
+    return None
+
+
+# ─────────────────────────────────────────────────────────────
+# Reglas: (patrón, función → declaraciones). El orden es el del CSS final,
+# como el de los plugins de Tailwind (lo de abajo gana a lo de arriba).
+# ─────────────────────────────────────────────────────────────
+def _decl(**kw):
+    # _webkit_box_orient → -webkit-box-orient
+    return [(k.replace("_", "-"), v) for k, v in kw.items()]
+
+
+def _sides(prefix, prop):
+    sides = {"": [prop], "x": [f"{prop}-left", f"{prop}-right"], "y": [f"{prop}-top", f"{prop}-bottom"],
+             "t": [f"{prop}-top"], "r": [f"{prop}-right"], "b": [f"{prop}-bottom"], "l": [f"{prop}-left"]}
+
+    def rule(m):
+        neg, side, value = m.group(1), m.group(2), m.group(3)
+        v = spacing(value)
+        if v is None:
+            return None
+        if neg:
+            if v in ("auto", "0px"):
+                return None
+            v = f"-{v}"
+        return [(p, v) for p in sides[side]]
+    return (rf"^(-?){prefix}([xytrbl]?)-(.+)$", rule)
+
+
+def _inset(m):
+    neg, side, value = m.groups()
+    v = spacing(value)
+    if v is None:
+        return None
+    v = f"-{v}" if neg and v not in ("auto", "0px") else v
+    props = {"inset": ["inset"], "inset-x": ["left", "right"], "inset-y": ["top", "bottom"]}.get(side, [side])
+    return [(p, v) for p in props]
+
+
+def _text(m):
+    value = m.group(1)
+    if value in FONT_SIZES:
+        size, line = FONT_SIZES[value].split("/")
+        return _decl(font_size=size, line_height=line)
+    if value in ("left", "center", "right", "justify", "start", "end"):
+        return _decl(text_align=value)
+    c = color(value)
+    return _decl(color=c) if c else None
+
+
+def _border(m):
+    side, rest = m.group(1) or "", m.group(2)
+    prop = {"": "border-width", "t": "border-top-width", "r": "border-right-width",
+            "b": "border-bottom-width", "l": "border-left-width",
+            "x": None, "y": None}[side]
+    if rest is None:
+        if prop is None:
+            return None
+        return [(prop, "1px")]
+    if rest.isdigit() and prop:
+        return [(prop, f"{rest}px")]
+    # border-transparent: la "t" no es un lado
+    c = color(m.group(0)[len("border-"):])
+    return _decl(border_color=c) if c else None
+
+
+def _gradient_stop(m):
+    kind, value = m.groups()
+    c = color(value)
+    if c is None:
+        return None
+    if kind == "from":
+        return [("--tw-gradient-from", c), ("--tw-gradient-to", transparent_of(value)),
+                ("--tw-gradient-stops", "var(--tw-gradient-from),var(--tw-gradient-to)")]
+    if kind == "via":
+        return [("--tw-gradient-to", transparent_of(value)),
+                ("--tw-gradient-stops", f"var(--tw-gradient-from),{c},var(--tw-gradient-to)")]
+    return [("--tw-gradient-to", c)]
+
+
+def _translate(m):
+    neg, axis, value = m.groups()
+    v = spacing(value)
+    if v is None:
+        return None
+    v = f"-{v}" if neg and v != "0px" else v
+    return [(f"--tw-translate-{axis}", v), ("transform", TRANSFORM)]
+
+
+def _scale(m):
+    axis, value = m.groups()
+    v = _arbitrary(value) or (f"{int(value) / 100:g}" if value.isdigit() else None)
+    if v is None:
+        return None
+    axes = ("x", "y") if not axis else (axis[1],)
+    return [(f"--tw-scale-{a}", v) for a in axes] + [("transform", TRANSFORM)]
+
+
+def _keyed(table, prop):
+    def rule(m):
+        value = m.group(1)
+        v = table.get(value) or _arbitrary(value)
+        return [(prop, v)] if v else None
+    return rule
+
+
+RULES = [
+    (r"^sr-only$", lambda m: _decl(position="absolute", width="1px", height="1px", padding="0",
+                                   margin="-1px", overflow="hidden", clip="rect(0,0,0,0)",
+                                   white_space="nowrap", border_width="0")),
+    (r"^pointer-events-(none|auto)$", lambda m: _decl(pointer_events=m.group(1))),
+    (r"^(visible|invisible)$", lambda m: _decl(visibility="hidden" if m.group(1) == "invisible" else "visible")),
+    (r"^(static|fixed|absolute|relative|sticky)$", lambda m: _decl(position=m.group(1))),
+    (r"^(-?)(inset-x|inset-y|inset|top|right|bottom|left)-(.+)$", _inset),
+    (r"^z-(\d+|auto|\[.+\])$", lambda m: _decl(z_index=_arbitrary(m.group(1)) or m.group(1))),
+    (r"^col-span-(\d+|full)$", lambda m: _decl(
+        grid_column="1 / -1" if m.group(1) == "full" else f"span {m.group(1)} / span {m.group(1)}")),
+    _sides("m", "margin"),
+    (r"^line-clamp-(\d+|none)$", lambda m: _decl(
+        overflow="hidden", display="-webkit-box", _webkit_box_orient="vertical",
+        _webkit_line_clamp=m.group(1))),
+    (r"^(block|inline-block|inline|flex|inline-flex|grid|inline-grid|contents|hidden|table)$",
+     lambda m: _decl(display="none" if m.group(1) == "hidden" else m.group(1))),
+    (r"^aspect-(auto|square|video|\[.+\])$", lambda m: _decl(aspect_ratio={
+        "auto": "auto", "square": "1 / 1", "video": "16 / 9"}.get(m.group(1)) or _arbitrary(m.group(1)))),
+    (r"^h-(.+)$", lambda m: _decl(height="100vh" if m.group(1) == "screen" else spacing(m.group(1)))
+     if spacing(m.group(1)) else None),
+    (r"^min-h-(0|full|screen|fit)$", lambda m: _decl(min_height={
+        "0": "0px", "full": "100%", "screen": "100vh", "fit": "fit-content"}[m.group(1)])),
+    (r"^w-(.+)$", lambda m: _decl(width=spacing(m.group(1))) if spacing(m.group(1)) else None),
+    (r"^max-w-(.+)$", _keyed(MAX_WIDTHS, "max-width")),
+    (r"^flex-(1|auto|initial|none)$", lambda m: _decl(flex={
+        "1": "1 1 0%", "auto": "1 1 auto", "initial": "0 1 auto", "none": "none"}[m.group(1)])),
+    (r"^(shrink|grow)(-0)?$", lambda m: [(f"flex-{m.group(1)}", "0" if m.group(2) else "1")]),
+    (r"^(-?)translate-(x|y)-(.+)$", _translate),
+    (r"^scale(-[xy])?-(.+)$", _scale),
+    (r"^animate-(spin|ping|pulse|none)$", lambda m: _decl(
+        animation="none" if m.group(1) == "none" else f"{m.group(1)} {KEYFRAMES[m.group(1)][0]}")),
+    (r"^cursor-(pointer|default|not-allowed|wait|text|move)$", lambda m: _decl(cursor=m.group(1))),
+    (r"^list-(disc|decimal|none)$", lambda m: _decl(list_style_type=m.group(1))),
+    (r"^grid-cols-(\d+|none)$", lambda m: _decl(grid_template_columns="none" if m.group(1) == "none"
+                                                else f"repeat({m.group(1)},minmax(0,1fr))")),
+    (r"^flex-(row|row-reverse|col|col-reverse)$", lambda m: _decl(
+        flex_direction=m.group(1).replace("col", "column"))),
+    (r"^flex-(wrap|wrap-reverse|nowrap)$", lambda m: _decl(flex_wrap=m.group(1))),
+    (r"^items-(start|end|center|baseline|stretch)$", lambda m: _decl(
+        align_items={"start": "flex-start", "end": "flex-end"}.get(m.group(1), m.group(1)))),
+    (r"^justify-(start|end|center|between|around|evenly)$", lambda m: _decl(justify_content={
+        "start": "flex-start", "end": "flex-end", "between": "space-between",
+        "around": "space-around", "evenly": "space-evenly"}.get(m.group(1), m.group(1)))),
+    (r"^gap-(x-|y-)?(.+)$", lambda m: [({"": "gap", "x-": "column-gap", "y-": "row-gap"}[m.group(1) or ""],
+                                         spacing(m.group(2)))] if spacing(m.group(2)) else None),
+    (r"^space-(x|y)-(.+)$", lambda m: [("margin-left" if m.group(1) == "x" else "margin-top",
+                                        spacing(m.group(2)))] if spacing(m.group(2)) else None),
+    (r"^overflow-(x-|y-)?(auto|hidden|visible|scroll|clip)$", lambda m: [(
+        "overflow" + ("-" + m.group(1)[0] if m.group(1) else ""), m.group(2))]),
+    (r"^whitespace-(normal|nowrap|pre|pre-line|pre-wrap|break-spaces)$", lambda m: _decl(white_space=m.group(1))),
+    (r"^rounded(?:-(.+))?$", lambda m: _decl(border_radius=RADII.get(m.group(1) or "")
+                                             or _arbitrary(m.group(1) or "")) if (
+        (m.group(1) or "") in RADII or _arbitrary(m.group(1) or "")) else None),
+    (r"^border(?:-([trblxy]))?(?:-(.+))?$", _border),
+    (r"^bg-gradient-to-(t|tr|r|br|b|bl|l|tl)$", lambda m: _decl(
+        background_image=f"linear-gradient(to {GRADIENT_DIRS[m.group(1)]},var(--tw-gradient-stops))")),
+    (r"^bg-(.+)$", lambda m: _decl(background_color=color(m.group(1))) if color(m.group(1)) else None),
+    (r"^(from)-(.+)$", _gradient_stop),
+    (r"^(via)-(.+)$", _gradient_stop),
+    (r"^(to)-(.+)$", _gradient_stop),
+    (r"^object-(cover|contain|fill|none|scale-down)$", lambda m: _decl(object_fit=m.group(1))),
+    _sides("p", "padding"),
+    (r"^font-(sans)$", lambda m: _decl(font_family=FONT_SANS)),
+    (r"^text-(.+)$", _text),
+    (r"^font-(.+)$", lambda m: _decl(font_weight=str(FONT_WEIGHTS[m.group(1)]))
+     if m.group(1) in FONT_WEIGHTS else None),
+    (r"^(uppercase|lowercase|capitalize|normal-case)$", lambda m: _decl(
+        text_transform="none" if m.group(1) == "normal-case" else m.group(1))),
+    (r"^(italic|not-italic)$", lambda m: _decl(font_style="italic" if m.group(1) == "italic" else "normal")),
+    (r"^tracking-(.+)$", _keyed(TRACKING, "letter-spacing")),
+    (r"^(underline|no-underline|line-through)$", lambda m: _decl(
+        text_decoration_line="none" if m.group(1) == "no-underline" else m.group(1))),
+    (r"^antialiased$", lambda m: _decl(_webkit_font_smoothing="antialiased",
+                                       _moz_osx_font_smoothing="grayscale")),
+    (r"^opacity-(\d+)$", lambda m: _decl(opacity=f"{int(m.group(1)) / 100:g}")),
+    (r"^backdrop-blur-(\[.+\]|sm|md|lg|xl)$", lambda m: (lambda v: [
+        ("-webkit-backdrop-filter", f"blur({v})"), ("backdrop-filter", f"blur({v})")])(
+        _arbitrary(m.group(1)) or {"sm": "4px", "md": "12px", "lg": "16px", "xl": "24px"}[m.group(1)])),
+    (r"^transition(?:-(colors|opacity|shadow|transform|all|none))?$", lambda m: _decl(
+        transition_property="none" if m.group(1) == "none" else TRANSITIONS[m.group(1) or ""],
+        transition_timing_function=EASE, transition_duration="150ms")),
+    (r"^duration-(\d+)$", lambda m: _decl(transition_duration=f"{m.group(1)}ms")),
+]
+_COMPILED = [(re.compile(p), fn) for p, fn in RULES]
+
+
+# ─────────────────────────────────────────────────────────────
+# Generación
+# ─────────────────────────────────────────────────────────────
+def escape(cls):
+    return re.sub(r"([^A-Za-z0-9_-])", r"\\\1", cls)
+
+
+def resolve(utility):
+    """(índice de regla, declaraciones) de una utilidad sin variantes, o None."""
+    for index, (pattern, fn) in enumerate(_COMPILED):
+        m = pattern.match(utility)
+        if m:
+            decls = fn(m)
+            if decls and all(v for _p, v in decls):
+                return index, decls
+    return None
+
+
+def _specificity(decls):
+    """Atajo (margin) < eje (mx) < lado (mt), para que el más concreto gane."""
+    if len(decls) == 1 and decls[0][0] in SHORTHANDS:
+        return 0
+    return 1 if len(decls) == 2 else 2
+
+
+def parse(token):
+    """'md:hover:text-white' → (pantalla, [pseudo…], utilidad) o None."""
+    *variants, utility = token.split(":")
+    screen, pseudos = None, []
+    for v in variants:
+        if v in SCREENS and screen is None:
+            screen = v
+        elif v in PSEUDO or v == "group-hover":
+            pseudos.append(v)
+        else:
+            return None
+    return screen, pseudos, utility
+
+
+def selector(token, pseudos, utility):
+    sel = "." + escape(token)
+    for p in pseudos:
+        if p != "group-hover":
+            sel += PSEUDO[p]
+    if "group-hover" in pseudos:
+        sel = ".group:hover " + sel
+    if utility.startswith("space-"):
+        sel += " > :not([hidden]) ~ :not([hidden])"
+    return sel
+
+
+def scan(base_dir):
+    """Candidatos a clase en los archivos de CONTENT_GLOBS."""
+    base = Path(base_dir)
+    found = set()
+    for pattern in CONTENT_GLOBS:
+        for path in base.glob(pattern):
+            if "migrations" in path.parts:
+                continue
+            text = path.read_text(encoding="utf-8", errors="ignore")
+            found.update(_CANDIDATE.findall(text))
+    return found
+
+
+def generate(tokens):
+    """CSS (sin minificar) de las utilidades reconocidas en `tokens` y cuántas son."""
+    rules = []
+    keyframes = set()
+    for token in tokens:
+        parsed = parse(token)
+        if parsed is None:
+            continue
+        screen, pseudos, utility = parsed
+        resolved = resolve(utility)
+        if resolved is None:
+            continue
+        index, decls = resolved
+        if utility.startswith("animate-") and utility[8:] in KEYFRAMES:
+            keyframes.add(KEYFRAMES[utility[8:]][1])
+        order = (list(SCREENS).index(screen) + 1 if screen else 0, bool(pseudos), index,
+                 _specificity(decls), token)
+        body = ";".join(f"{p}:{v}" for p, v in decls)
+        rules.append((order, screen, f"{selector(token, pseudos, utility)}{{{body}}}"))
+
+    rules.sort(key=lambda r: r[0])
+    out, current = [], None
+    for _order, screen, css in rules:
+        if screen != current:
+            if current:
+                out.append("}")
+            if screen:
+                out.append(f"@media (min-width:{SCREENS[screen]}){{")
+            current = screen
+        out.append(css)
+    if current:
+        out.append("}")
+    return "\n".join(sorted(keyframes) + out), len(rules)
+
+
+def minify(css):
+    css = re.sub(r"/\*(?!!).*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>~])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def build(base_dir):
+    """(CSS minificado con preflight, nº de utilidades generadas)."""
+    utilities, count = generate(scan(base_dir))
+    return minify(PREFLIGHT.read_text(encoding="utf-8") + "\n" + utilities) + "\n", count
+
+
+# ─────────────────────────────────────────────────────────────
+# Font Awesome: sólo los iconos usados
+# ─────────────────────────────────────────────────────────────
+_FA_ICON = re.compile(r"^\.fa-([a-z0-9-]+):{1,2}before$")
+_FA_RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+
+
+def subset_fontawesome(css, used):
+    """
+    Quita de `css` (all.css de Font Awesome 6) las reglas de iconos que no
+    están en `used` (nombres sin "fa-"). El resto (base, tamaños, animaciones,
+    @font-face) se conserva.
+    """
+    def keep(match):
+        selectors = [s.strip() for s in match.group(1).split(",")]
+        icons = [_FA_ICON.match(s) for s in selectors]
+        if not all(icons):
+            return match.group(0)
+        wanted = [s for s, m in zip(selectors, icons) if m.group(1) in used]
+        return f"{','.join(wanted)}{{{match.group(2)}}}" if wanted else ""
+
+    return _FA_RULE.sub(keep, css)
+
+
+def fontawesome_icons(tokens):
+    return {t[3:] for t in tokens if t.startswith("fa-")}
@@ -0,0 +1,57 @@
+# core/management/commands/build_css.py
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import cssbuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera static/css/tailwind.css con sólo las utilidades usadas en "
+        "plantillas/JS (sin CDN ni Node) y, con una copia local de Font "
+        "Awesome, static/css/icons.css con sólo los iconos usados. Ejecutar "
+        "antes de collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fontawesome",
+            help="Carpeta de fontawesome-free (con css/all.css y webfonts/). "
+                 "Por defecto settings.FONTAWESOME_SOURCE.",
+        )
+
+    def handle(self, *args, **options):
+        base = Path(settings.BASE_DIR)
+        out_dir = Path(settings.STATICFILES_DIRS[0])
+
+        css, count = cssbuild.build(base)
+        target = out_dir / "css" / "tailwind.css"
+        target.write_text(css, encoding="utf-8")
+        self.stdout.write(f"{target.relative_to(base)}: {count} utilidades, {len(css) // 1024} KB")
+
+        source = options["fontawesome"] or getattr(settings, "FONTAWESOME_SOURCE", None)
+        if not source or not (Path(source) / "css" / "all.css").exists():
+            self.stdout.write(self.style.WARNING(
+                "Sin copia local de Font Awesome (FONTAWESOME_SOURCE): se sigue usando el CDN."
+            ))
+        else:
+            self._icons(Path(source), base, out_dir)
+        self.stdout.write(self.style.SUCCESS("CSS generado."))
+
+    def _icons(self, source, base, out_dir):
+        used = cssbuild.fontawesome_icons(cssbuild.scan(base))
+        css = cssbuild.subset_fontawesome((source / "css" / "all.css").read_text(encoding="utf-8"), used)
+        target = out_dir / "css" / "icons.css"
+        target.write_text(cssbuild.minify(css) + "\n", encoding="utf-8")
+
+        # url(../webfonts/…) relativo a css/ → static/webfonts/ (collectstatic
+        # falla si falta alguno de los archivos a los que apunta el CSS)
+        fonts = out_dir / "webfonts"
+        fonts.mkdir(exist_ok=True)
+        for font in (source / "webfonts").iterdir():
+            if font.suffix in (".woff2", ".ttf"):
+                shutil.copy2(font, fonts / font.name)
+        self.stdout.write(f"{target.relative_to(base)}: {len(used)} iconos, {target.stat().st_size // 1024} KB")
@@ -0,0 +1,48 @@
+# core/management/commands/build_renditions.py
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.renditions import RENDITION_FIELDS, generate, get_manifest, is_passthrough
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera por adelantado las variantes (WebP + JPEG/PNG a varios anchos) "
+        "de las imágenes ya subidas; las nuevas las encola el guardado "
+        "para `manage.py process_media`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models",
+            nargs="+",
+            choices=sorted(RENDITION_FIELDS),
+            help="Sólo estos modelos (app.Modelo).",
+        )
+        parser.add_argument("--force", action="store_true", help="Regenera aunque ya existan.")
+
+    def handle(self, *args, **options):
+        labels = options["models"] or list(RENDITION_FIELDS)
+        for label in labels:
+            model = apps.get_model(label)
+            fields = RENDITION_FIELDS[label]
+            done = skipped = failed = 0
+
+            qs = model._default_manager.only("pk", *fields).order_by("pk")
+            for obj in qs.iterator(chunk_size=500):
+                for name in fields:
+                    f = getattr(obj, name)
+                    if not f or is_passthrough(f.name):
+                        continue
+                    if not options["force"] and get_manifest(f):
+                        skipped += 1
+                        continue
+                    try:
+                        generate(f)
+                        done += 1
+                    except Exception as exc:  # archivo perdido, imagen corrupta…
+                        failed += 1
+                        self.stderr.write(f"{label}#{obj.pk}.{name}: {exc}")
+
+            self.stdout.write(f"{label}: {done} generadas, {skipped} ya estaban, {failed} con error")
+        self.stdout.write(self.style.SUCCESS("Variantes generadas."))
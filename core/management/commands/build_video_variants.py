@@ -0,0 +1,65 @@
+# core/management/commands/build_video_variants.py
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import video
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea el póster (primer fotograma) y la variante ligera para móvil de "
+        "los vídeos de static/videos, y comprueba que empiezan a reproducirse "
+        "sin descargarse enteros (moov al principio). Requiere ffmpeg."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("videos", nargs="*", help="Rutas a .mp4 (por defecto, static/videos/*.mp4).")
+        parser.add_argument("--force", action="store_true", help="Regenera aunque ya existan.")
+        parser.add_argument("--height", type=int, default=video.MOBILE_HEIGHT, help="Alto de la variante móvil.")
+        parser.add_argument("--bitrate", default=video.MOBILE_BITRATE, help="Bitrate de la variante móvil (p. ej. 600k).")
+
+    def handle(self, *args, **options):
+        paths = [Path(p) for p in options["videos"]] or sorted(
+            p for p in (Path(settings.STATICFILES_DIRS[0]) / "videos").glob("*.mp4")
+            if not video.is_variant(p.name)
+        )
+        has_ffmpeg = bool(video.ffmpeg_binary())
+        if not has_ffmpeg:
+            self.stderr.write(self.style.WARNING(
+                "No se encontró ffmpeg (settings.FFMPEG_BINARY): sólo se comprobará faststart."
+            ))
+
+        for path in paths:
+            src = str(path)
+            started = time.monotonic()
+            notes = []
+
+            if video.moov_first(src):
+                notes.append("faststart ok")
+            elif has_ffmpeg and video.make_faststart(src):
+                notes.append("faststart aplicado")
+            else:
+                notes.append("SIN faststart")
+
+            if has_ffmpeg:
+                for variant, build in (
+                    ("poster", video.make_poster),
+                    ("mobile", lambda s, d: video.make_mobile(s, d, options["height"], options["bitrate"])),
+                ):
+                    dst = video.variant_name(src, variant)
+                    if os.path.exists(dst) and not options["force"]:
+                        notes.append(f"{variant} ya estaba")
+                    elif build(src, dst):
+                        notes.append(f"{variant} {os.path.getsize(dst) // 1024} KB")
+                    else:
+                        notes.append(f"{variant} ERROR")
+
+            size = path.stat().st_size // 1024
+            self.stdout.write(
+                f"{path.name} ({size} KB): {', '.join(notes)} [{time.monotonic() - started:.1f}s]"
+            )
+        self.stdout.write(self.style.SUCCESS("Vídeos revisados."))
@@ -0,0 +1,48 @@
+# core/management/commands/prune_media.py
+import posixpath
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.renditions import is_animated_name
+from core.uploads import UPLOAD_APPS, collect, is_referenced
+
+
+def _walk(storage, folder):
+    try:
+        dirs, files = storage.listdir(folder)
+    except FileNotFoundError:
+        return
+    for name in files:
+        yield posixpath.join(folder, name)
+    for d in dirs:
+        # Variantes: se borran junto a su original
+        if not d.endswith(".renditions"):
+            yield from _walk(storage, posixpath.join(folder, d))
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista (o borra con --delete) los archivos de media que ya no usa "
+        "ninguna fila: subidas reemplazadas antes de que existiera la limpieza "
+        "automática, duplicados, etc."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delete", action="store_true", help="Borra de verdad (por defecto sólo lista).")
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        orphans = []
+        for folder in UPLOAD_APPS:
+            for name in _walk(storage, folder):
+                if is_animated_name(name) or is_referenced(name):
+                    continue
+                orphans.append(name)
+                self.stdout.write(name)
+
+        if options["delete"]:
+            removed = collect(storage, orphans)
+            self.stdout.write(self.style.SUCCESS(f"{removed} archivos borrados."))
+        else:
+            self.stdout.write(f"{len(orphans)} huérfanos (usa --delete para borrarlos).")
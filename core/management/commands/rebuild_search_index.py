@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda (FTS) desde la base de datos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kinds",
+            nargs="+",
+            help="Sólo estos tipos (post, thread, news, lore, guide, character, enemy, artifact).",
+        )
+
+    def handle(self, *args, **options):
+        for kind, total in rebuild(kinds=set(options.get("kinds") or [])).items():
+            self.stdout.write(f"{kind}: {total} documentos")
+
+        self.stdout.write(self.style.SUCCESS("Índice de búsqueda reconstruido."))
@@ -0,0 +1,41 @@
+# core/middleware.py
+"""
+Cookie "nexo_user": marca opaca del usuario de la sesión para el JS.
+
+static/js/app.js la compara con la última vista para pedir al service
+worker que vacíe las páginas guardadas cuando cambia el usuario (login,
+logout, otra cuenta). Va en una cookie y no en el HTML porque las páginas
+del Códex se cachean por variante (codex/cache.py), no por usuario: una
+marca en el marcado se serviría a otros.
+
+El valor es un HMAC del id (no revela el id ni se puede fabricar) y no es
+HttpOnly para que lo lea document.cookie. Sólo se escribe cuando cambia.
+"""
+from django.utils.crypto import salted_hmac
+
+COOKIE_NAME = "nexo_user"
+
+
+def user_marker(user):
+    if not user.is_authenticated:
+        return ""
+    return salted_hmac("core.middleware.user_marker", user.pk).hexdigest()[:16]
+
+
+class UserMarkerCookieMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if user is None:
+            return response
+        marker = user_marker(user)
+        if request.COOKIES.get(COOKIE_NAME, "") == marker:
+            return response
+        if marker:
+            response.set_cookie(COOKIE_NAME, marker, samesite="Lax", httponly=False)
+        else:
+            response.delete_cookie(COOKIE_NAME, samesite="Lax")
+        return response
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # Tabla virtual FTS5: sólo existe en SQLite (ver settings.SEARCH_BACKEND)
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, title, body, slug UNINDEXED, "
+        "visible_at UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def fill_search_index(apps, schema_editor):
+    """Indexa lo que ya hay; a partir de aquí lo mantienen las señales (core/signals.py)."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    from core.search import SQLiteFTS5Backend, rebuild
+
+    # Los documentos sólo leen campos que ya existen en los 0001 de abajo
+    rebuild(get_model=apps.get_model, backend=SQLiteFTS5Backend())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0001_initial'),
+        ('news', '0001_initial'),
+        ('codex', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,155 @@
+# core/pagination.py
+"""
+Paginación por cursor (keyset) compartida por los listados del sitio.
+
+A diferencia de django.core.paginator.Paginator no hace COUNT(*) ni OFFSET:
+cada página filtra "después de la última fila vista" sobre las columnas de
+orden (p. ej. (created, id)), así que la página 500 cuesta lo mismo que la 1.
+Los cursores son tokens opacos (JSON en base64 url-safe).
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+def _encode(values, direction):
+    def plain(v):
+        if isinstance(v, (datetime.datetime, datetime.date)):
+            return v.isoformat()
+        return v
+
+    raw = json.dumps({"v": [plain(v) for v in values], "d": direction})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return list(data["v"]), data["d"]
+    except (ValueError, KeyError, TypeError):
+        return None, None
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    `ordering` debe identificar cada fila de forma única (termina en "id")
+    y sus campos no deben ser NULL; para columnas opcionales anota antes un
+    Coalesce y ordena por la anotación.
+    """
+
+    def __init__(self, queryset, per_page, ordering=("-created", "-id")):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [o.lstrip("-") for o in self.ordering]
+
+    def _keyset_q(self, values, reverse):
+        """
+        (f1, f2, …) "después de" values según el orden:
+        f1 > v1  OR  (f1 = v1 AND f2 > v2)  OR …
+        """
+        q = Q()
+        for i, order in enumerate(self.ordering):
+            desc = order.startswith("-") != reverse
+            lookup = f"{self.fields[i]}__{'lt' if desc else 'gt'}"
+            term = Q(**{lookup: values[i]})
+            for field, value in zip(self.fields[:i], values[:i]):
+                term &= Q(**{field: value})
+            q |= term
+        return q
+
+    def _coerce(self, values):
+        """
+        Valores del cursor al tipo de cada columna de orden. Un token bien
+        formado puede traer basura ({"v": ["zz", 1]}): devuelve None y se
+        sirve la primera página en vez de un 500 al filtrar.
+        """
+        if len(values) != len(self.fields):
+            return None
+        opts = self.queryset.model._meta
+        coerced = []
+        try:
+            for field, value in zip(self.fields, values):
+                if not isinstance(value, (str, int, float, bool)):
+                    return None
+                annotation = self.queryset.query.annotations.get(field)
+                if annotation is not None:
+                    # Anotación (p. ej. un Coalesce): el tipo lo da su output_field
+                    model_field = annotation.output_field
+                else:
+                    model_field = opts.get_field(field)
+                coerced.append(model_field.to_python(value))
+        except (FieldDoesNotExist, ValidationError, ValueError, TypeError):
+            return None
+        return coerced
+
+    def _cursor_for(self, obj, direction):
+        return _encode([getattr(obj, f) for f in self.fields], direction)
+
+    def get_page(self, cursor=None):
+        values, direction = _decode(cursor) if cursor else (None, None)
+        if values is not None:
+            values = self._coerce(values)
+
+        qs = self.queryset
+        backwards = values is not None and direction == "p"
+
+        if backwards:
+            flipped = [o[1:] if o.startswith("-") else f"-{o}" for o in self.ordering]
+            qs = qs.filter(self._keyset_q(values, reverse=True)).order_by(*flipped)
+        else:
+            if values is not None:
+                qs = qs.filter(self._keyset_q(values, reverse=False))
+            qs = qs.order_by(*self.ordering)
+
+        rows = list(qs[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return CursorPage(
+            rows,
+            next_cursor=self._cursor_for(rows[-1], "n") if rows and has_next else None,
+            previous_cursor=self._cursor_for(rows[0], "p") if rows and has_previous else None,
+        )
+
+
+def paginate_cursor(request, queryset, per_page, ordering=("-created", "-id")):
+    """Atajo para vistas: lee ?cursor= y devuelve la CursorPage."""
+    return CursorPaginator(queryset, per_page, ordering).get_page(
+        request.GET.get("cursor")
+    )
@@ -0,0 +1,88 @@
+# core/pwa.py
+"""
+Service worker generado a partir del manifest de estáticos.
+
+Al hacer `collectstatic`, ServiceWorkerStaticFilesStorage (core/storage.py)
+renderiza templates/service-worker.js con:
+- PRECACHE: las URLs con hash (css/app.css → css/app.3f2a9c01b7de.css) de
+  los archivos que encajan en PRECACHE_PATTERNS, por orden y sin pasar de
+  settings.PWA_PRECACHE_BUDGET bytes.
+- VERSION: hash de esa lista. Si ningún archivo cambió, el worker es
+  idéntico byte a byte y el navegador no lo reinstala; si cambió alguno, el
+  worker nuevo sólo descarga las URLs que aún no tiene y borra las viejas.
+
+El resultado se guarda en STATIC_ROOT/service-worker.js y lo sirve
+ServiceWorkerView en /service-worker.js (el alcance debe ser la raíz).
+Sin collectstatic (desarrollo) se renderiza al vuelo con DEV_PRECACHE.
+"""
+import fnmatch
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.template.loader import render_to_string
+
+SW_NAME = "service-worker.js"
+SW_TEMPLATE = "service-worker.js"
+DEFAULT_BUDGET = 2 * 1024 * 1024
+
+# Por prioridad: lo primero que hace falta para pintar cualquier página
+PRECACHE_PATTERNS = (
+    "css/*.css",
+    "js/app.js",
+    "core/icons/*",
+    "img/offline-bg-nexo.jpg",
+    "js/*.js",
+)
+# Páginas que se guardan al instalar (la pantalla sin conexión)
+PRECACHE_PAGES = ("/offline/",)
+
+DEV_PRECACHE = ("css/theme.css", "js/app.js")
+
+
+def select_precache(names, size_of, budget=None):
+    """
+    Nombres originales de `names` que entran en la precaché, por prioridad
+    de patrón y, dentro de cada patrón, de menor a mayor tamaño.
+    """
+    if budget is None:
+        budget = getattr(settings, "PWA_PRECACHE_BUDGET", DEFAULT_BUDGET)
+    chosen, used = [], 0
+    for pattern in PRECACHE_PATTERNS:
+        matches = sorted(
+            (n for n in names if fnmatch.fnmatch(n, pattern) and n not in chosen),
+            key=lambda n: (size_of(n), n),
+        )
+        for name in matches:
+            size = size_of(name)
+            if used + size > budget:
+                continue
+            chosen.append(name)
+            used += size
+    return chosen
+
+
+def render(urls, version, hashed=True):
+    return render_to_string(SW_TEMPLATE, {
+        "version": version,
+        "hashed": hashed,
+        "precache": json.dumps(list(urls) + list(PRECACHE_PAGES), indent=2),
+    })
+
+
+def build(storage, hashed_files):
+    """JS del worker para los estáticos recién recolectados en `storage`."""
+    chosen = select_precache(
+        list(hashed_files), lambda n: storage.size(hashed_files[n]),
+    )
+    # URL directa del nombre con hash (storage.url lo resolvería otra vez por el manifest)
+    urls = sorted(FileSystemStorage.url(storage, hashed_files[n]) for n in chosen)
+    version = hashlib.sha256("\n".join(urls).encode()).hexdigest()[:12]
+    return render(urls, version)
+
+
+def build_dev():
+    from django.templatetags.static import static
+
+    return render([static(n) for n in DEV_PRECACHE], "dev", hashed=False)
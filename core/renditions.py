@@ -0,0 +1,290 @@
+# core/renditions.py
+"""
+Variantes redimensionadas ("renditions") de las imágenes subidas.
+
+Para cada original se generan, con Pillow, versiones a anchos fijos en WebP
+(para el srcset) y en un formato de respaldo para el src: JPEG, o PNG si la
+imagen tiene transparencia. Se guardan junto al original:
+
+    news/2025/hero.jpg
+    news/2025/hero.renditions/480.webp
+    news/2025/hero.renditions/480.jpg
+    news/2025/hero.renditions/manifest.json   ← se escribe al final
+
+(con HashedFileSystemStorage, core/storage.py, cada variante lleva además
+el hash de su contenido: `480.<hash>.webp`; el manifest guarda los nombres
+reales y mantiene el suyo). Un ancho del formato de respaldo que pesaría
+más que el original no se guarda: para ese tamaño sirve el original.
+
+El manifest (anchos, rutas por formato, tamaño original) se cachea. Nunca
+se generan al renderizar: al guardar, las imágenes sin variantes se encolan
+(MediaJob, codex/signals.py) y las hace el worker `manage.py process_media`;
+lo ya subido, `manage.py build_renditions`. Mientras tanto, {% rendition %}
+sirve el original.
+
+Los GIF y los SVG no se redimensionan. Los GIF animados se pueden convertir
+a WebP animado (convert_animation), que suele pesar varias veces menos.
+"""
+import io
+import json
+import posixpath
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, ImageSequence
+
+WIDTHS = (320, 480, 768, 1200)
+PASSTHROUGH = (".gif", ".svg")
+QUALITY = {"webp": 78, "jpeg": 82}
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg", "png": "png"}
+MANIFEST = "manifest.json"
+CACHE_TIMEOUT = 24 * 60 * 60
+
+# Campos con imágenes "de foto" (los sprites pixel-art no se reescalan)
+RENDITION_FIELDS = {
+    "community.Post": ("image",),
+    "community.Thread": ("image",),
+    "accounts.Profile": ("avatar",),
+    "news.NewsArticle": ("hero_image", "banner_image"),
+    "codex.Domain": ("cover_image", "banner_image"),
+    "codex.LoreEntry": ("cover_image",),
+    "codex.Guide": ("cover_image",),
+    "codex.Character": ("image_full",),
+    "codex.Enemy": ("image_full",),
+}
+
+
+def rendition_dir(name):
+    return posixpath.splitext(name)[0] + ".renditions"
+
+
+def _cache_key(name):
+    return f"renditions:{name}"
+
+
+def is_passthrough(name):
+    return posixpath.splitext(name)[1].lower() in PASSTHROUGH
+
+
+def _encode(img, fmt):
+    buf = io.BytesIO()
+    if fmt == "jpeg":
+        img.convert("RGB").save(buf, "JPEG", quality=QUALITY["jpeg"], optimize=True, progressive=True)
+    elif fmt == "png":
+        img.save(buf, "PNG", optimize=True)
+    else:
+        img.save(buf, "WEBP", quality=QUALITY["webp"], method=4)
+    return buf.getvalue()
+
+
+def generate(field_file):
+    """Crea las variantes de `field_file` y devuelve su manifest."""
+    storage, name = field_file.storage, field_file.name
+    with storage.open(name, "rb") as fh:
+        original = fh.read()
+    img = Image.open(io.BytesIO(original))
+    img.load()
+    img = ImageOps.exif_transpose(img)
+
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+    fallback = "png" if has_alpha else "jpeg"
+
+    width, height = img.size
+    # Nunca se amplía: los anchos mayores que el original se sustituyen por él
+    widths = sorted({w for w in WIDTHS if w < width} | {min(width, WIDTHS[-1])})
+
+    folder = rendition_dir(name)
+    formats = {}
+    for fmt in ("webp", fallback):
+        formats[fmt] = {}
+        for w in widths:
+            resized = img if w == width else img.resize(
+                (w, max(1, round(height * w / width))), Image.LANCZOS
+            )
+            data = _encode(resized, fmt)
+            # Un PNG/JPEG de respaldo más pesado que el original no ahorra nada
+            if fmt == fallback and len(data) >= len(original):
+                continue
+            path = posixpath.join(folder, f"{w}.{EXTENSIONS[fmt]}")
+            if storage.exists(path):
+                storage.delete(path)
+            # El storage puede añadir el hash del contenido: vale el nombre devuelto
+            formats[fmt][str(w)] = storage.save(path, ContentFile(data))
+
+    manifest = {"source": name, "width": width, "height": height,
+                "fallback": fallback, "formats": formats}
+    manifest_path = posixpath.join(folder, MANIFEST)
+    if storage.exists(manifest_path):
+        storage.delete(manifest_path)
+    storage.save(manifest_path, ContentFile(json.dumps(manifest).encode()))
+
+    # Variantes de una generación anterior (otros ajustes → otro hash)
+    current = {p for paths in formats.values() for p in paths.values()}
+    _dirs, files = storage.listdir(folder)
+    for f in files:
+        path = posixpath.join(folder, f)
+        if f != MANIFEST and path not in current:
+            storage.delete(path)
+    cache.set(_cache_key(name), manifest, CACHE_TIMEOUT)
+    return manifest
+
+
+def get_manifest(field_file, create=False):
+    """
+    Manifest de `field_file` (caché → disco; generación sólo con `create`).
+    Devuelve None si no es una imagen procesable o si aún no existe.
+    """
+    if not field_file or is_passthrough(field_file.name):
+        return None
+    manifest = cache.get(_cache_key(field_file.name))
+    if manifest is not None:
+        return manifest
+
+    storage = field_file.storage
+    manifest_path = posixpath.join(rendition_dir(field_file.name), MANIFEST)
+    if storage.exists(manifest_path):
+        with storage.open(manifest_path, "rb") as fh:
+            manifest = json.loads(fh.read())
+        cache.set(_cache_key(field_file.name), manifest, CACHE_TIMEOUT)
+        return manifest
+
+    if not create:
+        return None
+    try:
+        return generate(field_file)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # Archivo perdido o que no es imagen: se servirá el original
+        return None
+
+
+def rendition_fields(obj):
+    return RENDITION_FIELDS.get(obj._meta.label, ())
+
+
+def pending(obj):
+    """Campos de `obj` con imagen procesable y sin variantes todavía."""
+    return [
+        name for name in rendition_fields(obj)
+        if getattr(obj, name) and not is_passthrough(getattr(obj, name).name)
+        and get_manifest(getattr(obj, name)) is None
+    ]
+
+
+def build_instance(obj, force=False):
+    """Genera las variantes que falten de `obj` (todas con `force`); devuelve cuántas."""
+    names = [n for n in rendition_fields(obj) if getattr(obj, n)] if force else pending(obj)
+    for name in names:
+        generate(getattr(obj, name))
+    return len(names)
+
+
+def srcset(field_file, fmt, manifest):
+    storage = field_file.storage
+    return ", ".join(
+        f"{storage.url(path)} {w}w" for w, path in
+        sorted(manifest["formats"][fmt].items(), key=lambda kv: int(kv[0]))
+    )
+
+
+def best_url(field_file, fmt, width, manifest):
+    """
+    Variante más pequeña que cubre `width` (o la mayor disponible); el
+    original si ninguna lo cubre por haberse descartado las más pesadas.
+    """
+    variants = sorted((int(w), p) for w, p in manifest["formats"][fmt].items())
+    if not variants or variants[-1][0] < min(width, manifest["width"], WIDTHS[-1]):
+        return field_file.url
+    for w, path in variants:
+        if w >= width:
+            return field_file.storage.url(path)
+    return field_file.storage.url(variants[-1][1])
+
+
+def delete_derivatives(storage, name):
+    """Borra las variantes y el WebP animado generados a partir de `name`."""
+    folder = rendition_dir(name)
+    try:
+        _dirs, files = storage.listdir(folder)
+    except (FileNotFoundError, NotImplementedError):
+        files = []
+    for f in files:
+        storage.delete(posixpath.join(folder, f))
+    for animated in find_animated(storage, name):
+        storage.delete(animated)
+    cache.delete_many([_cache_key(name), _animated_key(name)])
+
+
+# ─────────────────────────────────────────────────────────────
+# GIF animado → WebP animado
+# ─────────────────────────────────────────────────────────────
+def animated_name(name):
+    return posixpath.splitext(name)[0] + ".anim.webp"
+
+
+def is_animated_name(name):
+    return ".anim." in posixpath.basename(name)
+
+
+def find_animated(storage, name):
+    """
+    WebP animados de `name` en disco: `<nombre>.anim.webp`, o con el hash
+    del contenido en medio si el storage lo añade (core/storage.py).
+    """
+    folder, base = posixpath.split(posixpath.splitext(name)[0] + ".anim.")
+    try:
+        _dirs, files = storage.listdir(folder)
+    except (FileNotFoundError, NotImplementedError):
+        return [animated_name(name)] if storage.exists(animated_name(name)) else []
+    return sorted(
+        posixpath.join(folder, f) for f in files
+        if f.startswith(base) and f.endswith(".webp")
+    )
+
+
+def _animated_key(name):
+    return f"animated:{name}"
+
+
+def convert_animation(field_file):
+    """
+    Convierte el GIF de `field_file` a WebP animado sin pérdida (los sprites
+    son pixel-art) con los mismos tiempos y bucle. Devuelve el nombre del
+    archivo creado, o None si el resultado no pesa menos que el GIF.
+    """
+    storage, name = field_file.storage, field_file.name
+    with storage.open(name, "rb") as fh:
+        original = fh.read()
+    img = Image.open(io.BytesIO(original))
+
+    frames, durations = [], []
+    for frame in ImageSequence.Iterator(img):
+        frames.append(frame.convert("RGBA"))
+        durations.append(frame.info.get("duration", 100) or 100)
+
+    buf = io.BytesIO()
+    frames[0].save(
+        buf, "WEBP", save_all=True, append_images=frames[1:], duration=durations,
+        loop=img.info.get("loop", 0), lossless=True, method=6,
+    )
+    for old in find_animated(storage, name):
+        storage.delete(old)
+    if buf.tell() >= len(original):
+        cache.set(_animated_key(name), "", CACHE_TIMEOUT)
+        return None
+    target = storage.save(animated_name(name), ContentFile(buf.getvalue()))
+    cache.set(_animated_key(name), target, CACHE_TIMEOUT)
+    return target
+
+
+def animated_url(field_file):
+    """URL del WebP animado si ya se generó; si no, la del GIF original."""
+    if not field_file:
+        return ""
+    key = _animated_key(field_file.name)
+    target = cache.get(key)
+    if target is None:
+        found = find_animated(field_file.storage, field_file.name)
+        target = found[-1] if found else ""
+        cache.set(key, target, CACHE_TIMEOUT)
+    return field_file.storage.url(target) if target else field_file.url
@@ -0,0 +1,332 @@
+# core/search.py
+"""
+Índice de búsqueda de texto completo (posts, hilos, noticias y Códex).
+
+Cada objeto indexable se guarda como un documento (kind, object_id, title,
+body, slug, visible_at) en una tabla virtual FTS5 de SQLite. La URL no se
+guarda: se arma al buscar desde (kind, slug), así renombrar una ruta no deja
+el índice viejo. El índice se mantiene incrementalmente con las señales de
+core/signals.py y se reconstruye con rebuild() (`manage.py
+rebuild_search_index` y la migración que crea la tabla).
+
+Los documentos sólo leen campos (nada de métodos del modelo) para que
+rebuild() funcione también con los modelos históricos de una migración.
+
+El backend se elige con settings.SEARCH_BACKEND; para Postgres bastaría con
+otra clase con la misma interfaz sobre una columna tsvector.
+"""
+import datetime
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+
+TABLE = "search_index"
+MAX_TERMS = 12
+CHUNK_SIZE = 500
+
+
+# ─────────────────────────────────────────────────────────────
+# Documentos por modelo
+# ─────────────────────────────────────────────────────────────
+def _join(*parts):
+    return "\n".join(p for p in parts if p)
+
+
+def _post_doc(o):
+    if o.is_removed:
+        return None
+    return {"title": o.title, "body": _join(o.body, o.author.username), "slug": o.slug}
+
+
+def _thread_doc(o):
+    if o.is_removed:
+        return None
+    # La URL del hilo lleva también el foro
+    return {"title": o.title, "body": _join(o.body, o.author.username), "slug": f"{o.forum.slug}/{o.slug}"}
+
+
+def _news_doc(o):
+    if o.status == "draft":
+        return None
+    return {
+        "title": o.title,
+        "body": _join(o.summary, o.body, o.version),
+        "slug": o.slug,
+        # Las programadas se indexan ya, pero sólo aparecen desde publish_at
+        "visible_at": o.publish_at if o.status == "scheduled" else None,
+    }
+
+
+def _lore_doc(o):
+    return {"title": o.title, "body": _join(o.summary, o.body), "slug": o.slug}
+
+
+def _guide_doc(o):
+    return {"title": o.title, "body": _join(o.summary, o.body, o.tags), "slug": o.slug}
+
+
+def _character_doc(o):
+    return {"title": o.name, "body": _join(o.role, o.description), "slug": o.slug}
+
+
+def _enemy_doc(o):
+    return {"title": o.name, "body": _join(o.description, o.behavior), "slug": o.slug}
+
+
+def _artifact_doc(o):
+    return {
+        "title": o.name,
+        "body": _join(o.quote, o.description, o.usage, o.bearer, o.epoch),
+        "slug": o.slug,
+    }
+
+
+# "app_label.Model" -> (kind, etiqueta, función documento)
+SEARCH_MODELS = {
+    "community.Post": ("post", "Publicación", _post_doc),
+    "community.Thread": ("thread", "Hilo del foro", _thread_doc),
+    "news.NewsArticle": ("news", "Noticia", _news_doc),
+    "codex.LoreEntry": ("lore", "Historia", _lore_doc),
+    "codex.Guide": ("guide", "Guía", _guide_doc),
+    "codex.Character": ("character", "Personaje", _character_doc),
+    "codex.Enemy": ("enemy", "Enemigo", _enemy_doc),
+    "codex.Artifact": ("artifact", "Emblema", _artifact_doc),
+}
+
+KIND_LABELS = {kind: label for kind, label, _ in SEARCH_MODELS.values()}
+
+# Lo que leen los documentos además del propio objeto
+SELECT_RELATED = {
+    "post": ("author",),
+    "thread": ("author", "forum"),
+}
+
+
+def _thread_url(slug):
+    forum, thread = slug.split("/", 1)
+    return reverse("community:thread_detail", args=[forum, thread])
+
+
+# kind -> URL a partir del slug guardado
+URLS = {
+    "post": lambda slug: reverse("community:post_detail", args=[slug]),
+    "thread": _thread_url,
+    "news": lambda slug: reverse("news:detail", args=[slug]),
+    "lore": lambda slug: reverse("codex:lore_detail", args=[slug]),
+    "guide": lambda slug: reverse("codex:guide_detail", args=[slug]),
+    "character": lambda slug: reverse("codex:character_detail", args=[slug]),
+    "enemy": lambda slug: reverse("codex:enemy_detail", args=[slug]),
+    "artifact": lambda slug: reverse("codex:artifact_detail", args=[slug]),
+}
+
+
+def to_match(query):
+    """
+    Convierte texto libre en una expresión MATCH segura: cada palabra va
+    entre comillas (sin operadores FTS) y con prefijo, unidas con AND.
+    """
+    terms = re.findall(r"\w+", query or "")[:MAX_TERMS]
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def _stamp(value):
+    if value is None:
+        return ""
+    return value.astimezone(datetime.timezone.utc).isoformat()
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    object_id: int
+    title: str
+    slug: str
+    snippet: str
+    rank: float
+
+    @property
+    def label(self):
+        return KIND_LABELS.get(self.kind, self.kind)
+
+    @property
+    def url(self):
+        return URLS[self.kind](self.slug)
+
+
+# ─────────────────────────────────────────────────────────────
+# Backend SQLite FTS5
+# ─────────────────────────────────────────────────────────────
+class SQLiteFTS5Backend:
+    # Pesos bm25 por columna: kind, object_id, title, body, slug, visible_at
+    WEIGHTS = (0, 0, 5.0, 1.0, 0, 0)
+    INSERT = (
+        f"INSERT INTO {TABLE} (kind, object_id, title, body, slug, visible_at) "
+        "VALUES (%s, %s, %s, %s, %s, %s)"
+    )
+
+    def _row(self, kind, object_id, doc):
+        return [
+            kind,
+            object_id,
+            doc.get("title", ""),
+            doc.get("body", ""),
+            doc.get("slug", ""),
+            _stamp(doc.get("visible_at")),
+        ]
+
+    def index(self, kind, object_id, doc):
+        with connection.cursor() as cur:
+            cur.execute(
+                f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s",
+                [kind, object_id],
+            )
+            cur.execute(self.INSERT, self._row(kind, object_id, doc))
+
+    def index_many(self, kind, items):
+        """Inserta [(object_id, doc), …] sin borrar antes (tras clear(kind))."""
+        with connection.cursor() as cur:
+            cur.executemany(self.INSERT, [self._row(kind, pk, doc) for pk, doc in items])
+
+    def remove(self, kind, object_id):
+        with connection.cursor() as cur:
+            cur.execute(
+                f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s",
+                [kind, object_id],
+            )
+
+    def clear(self, kind=None):
+        with connection.cursor() as cur:
+            if kind:
+                cur.execute(f"DELETE FROM {TABLE} WHERE kind = %s", [kind])
+            else:
+                cur.execute(f"DELETE FROM {TABLE}")
+
+    def _visible_sql(self):
+        return "(visible_at = '' OR visible_at <= %s)", [_stamp(timezone.now())]
+
+    def search(self, query, kinds=None, limit=20, offset=0):
+        match = to_match(query)
+        if not match:
+            return []
+
+        visible, params = self._visible_sql()
+        where = [f"{TABLE} MATCH %s", visible]
+        params = [match] + params
+        if kinds:
+            where.append(f"kind IN ({', '.join(['%s'] * len(kinds))})")
+            params += list(kinds)
+
+        weights = ", ".join(str(w) for w in self.WEIGHTS)
+        sql = (
+            f"SELECT kind, object_id, title, slug, "
+            f"snippet({TABLE}, 3, char(2), char(3), '…', 16), "
+            f"bm25({TABLE}, {weights}) AS rank "
+            f"FROM {TABLE} WHERE {' AND '.join(where)} "
+            f"ORDER BY rank LIMIT %s OFFSET %s"
+        )
+        with connection.cursor() as cur:
+            cur.execute(sql, params + [limit, offset])
+            rows = cur.fetchall()
+
+        return [
+            SearchHit(
+                kind=kind,
+                object_id=int(object_id),
+                title=title,
+                slug=slug,
+                # Se escapa el texto y sólo después se marcan los aciertos
+                snippet=escape(snippet).replace("\x02", "<mark>").replace("\x03", "</mark>"),
+                rank=rank,
+            )
+            for kind, object_id, title, slug, snippet, rank in rows
+        ]
+
+    def matching_ids(self, kind, query):
+        """Subconsulta con los ids de `kind` que casan con `query` (para pk__in)."""
+        visible, params = self._visible_sql()
+        return RawSQL(
+            f"SELECT object_id FROM {TABLE} WHERE {TABLE} MATCH %s AND kind = %s AND {visible}",
+            [to_match(query), kind] + params,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    path = getattr(settings, "SEARCH_BACKEND", "core.search.SQLiteFTS5Backend")
+    return import_string(path)()
+
+
+def filter_queryset(qs, kind, query):
+    """Restringe `qs` a los objetos de `kind` que casan con `query` en el índice."""
+    if not to_match(query):
+        return qs.none()
+    return qs.filter(pk__in=get_backend().matching_ids(kind, query))
+
+
+def search(query, kinds=None, limit=20, offset=0):
+    return get_backend().search(query, kinds=kinds, limit=limit, offset=offset)
+
+
+# ─────────────────────────────────────────────────────────────
+# Mantenimiento incremental
+# ─────────────────────────────────────────────────────────────
+def _entry_for(model):
+    return SEARCH_MODELS.get(model._meta.label)
+
+
+def index_instance(instance):
+    entry = _entry_for(type(instance))
+    if entry is None:
+        return
+    kind, _label, to_doc = entry
+    doc = to_doc(instance)
+    if doc is None:
+        get_backend().remove(kind, instance.pk)
+    else:
+        get_backend().index(kind, instance.pk, doc)
+
+
+def unindex_instance(instance):
+    entry = _entry_for(type(instance))
+    if entry is not None:
+        get_backend().remove(entry[0], instance.pk)
+
+
+def rebuild(kinds=None, get_model=apps.get_model, backend=None, chunk_size=CHUNK_SIZE):
+    """
+    Vuelve a indexar desde la base de datos (sólo `kinds` si se indican),
+    leyendo e insertando por tramos de `chunk_size`. `get_model` permite
+    pasar el de una migración. Devuelve {kind: documentos}.
+    """
+    backend = backend or get_backend()
+    totals = {}
+    for label, (kind, _label, to_doc) in SEARCH_MODELS.items():
+        if kinds and kind not in kinds:
+            continue
+        qs = get_model(label)._default_manager.select_related(*SELECT_RELATED.get(kind, ()))
+        total, chunk = 0, []
+        with transaction.atomic():
+            backend.clear(kind)
+            for obj in qs.iterator(chunk_size=chunk_size):
+                doc = to_doc(obj)
+                if doc is None:
+                    continue
+                chunk.append((obj.pk, doc))
+                if len(chunk) >= chunk_size:
+                    backend.index_many(kind, chunk)
+                    total += len(chunk)
+                    chunk = []
+            if chunk:
+                backend.index_many(kind, chunk)
+                total += len(chunk)
+        totals[kind] = total
+    return totals
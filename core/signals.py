@@ -0,0 +1,80 @@
+# core/signals.py
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from .search import SEARCH_MODELS, index_instance, unindex_instance
+from .uploads import collect, file_fields, prepare_upload, upload_models
+
+
+def update_search_index(sender, instance, raw=False, **kwargs):
+    # raw=True viene de loaddata: los objetos relacionados pueden no existir aún
+    if not raw:
+        index_instance(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_instance(instance)
+
+
+def connect_search_signals():
+    for label in SEARCH_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(update_search_index, sender=model, dispatch_uid=f"search-save-{label}")
+        post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f"search-delete-{label}")
+
+
+# ─────────────────────────────────────────────────────────────
+# Subidas: normalización + borrado de archivos reemplazados
+# ─────────────────────────────────────────────────────────────
+def remember_files(sender, instance, **kwargs):
+    # Nombres cargados de la BD (los diferidos no están en __dict__)
+    instance._previous_files = {
+        f.attname: instance.__dict__.get(f.attname) for f in file_fields(sender)
+    }
+
+
+def normalize_uploads(sender, instance, raw=False, **kwargs):
+    if not raw:
+        for field in file_fields(sender):
+            prepare_upload(instance, field)
+
+
+def _collect_later(storage_names):
+    def run():
+        for storage, names in storage_names:
+            collect(storage, names)
+    if storage_names:
+        transaction.on_commit(run)
+
+
+def _name(value):
+    return getattr(value, "name", value) or ""
+
+
+def collect_replaced_files(sender, instance, raw=False, created=False, **kwargs):
+    previous = getattr(instance, "_previous_files", {})
+    stale = []
+    for field in file_fields(sender):
+        old = _name(previous.get(field.attname))
+        if not raw and not created and old and old != _name(getattr(instance, field.attname)):
+            stale.append((field.storage, [old]))
+    _collect_later(stale)
+    remember_files(sender, instance)
+
+
+def collect_deleted_files(sender, instance, **kwargs):
+    _collect_later([
+        (field.storage, [getattr(instance, field.attname).name])
+        for field in file_fields(sender)
+        if getattr(instance, field.attname)
+    ])
+
+
+def connect_upload_signals():
+    for model, _fields in upload_models():
+        label = model._meta.label
+        post_init.connect(remember_files, sender=model, dispatch_uid=f"upload-init-{label}")
+        pre_save.connect(normalize_uploads, sender=model, dispatch_uid=f"upload-pre-{label}")
+        post_save.connect(collect_replaced_files, sender=model, dispatch_uid=f"upload-post-{label}")
+        post_delete.connect(collect_deleted_files, sender=model, dispatch_uid=f"upload-delete-{label}")
@@ -0,0 +1,86 @@
+# core/storage.py
+"""
+Almacenamiento de media con nombres inmutables.
+
+HashedFileSystemStorage guarda cada archivo con un trozo del hash de su
+contenido en el nombre (`hero.jpg` → `hero.3f2a9c01b7de.jpg`): si el
+contenido cambia, cambia la URL, así que se puede servir con
+`Cache-Control: immutable` y el navegador no vuelve a preguntar.
+
+- Los nombres que ya llevan hash (las subidas normalizadas de
+  core/uploads.py, los atlas, los vídeos) se guardan tal cual.
+- Si ya existe un archivo con ese nombre, el contenido es el mismo: se
+  reutiliza sin escribir.
+- Los índices internos (KEEP_NAMES, p. ej. el manifest de las variantes)
+  se buscan por su nombre fijo y no se hashean ni se sirven como inmutables.
+
+La vista core.views.serve_media usa is_immutable() para las cabeceras.
+
+ServiceWorkerStaticFilesStorage (estáticos) escribe además el service
+worker al terminar `collectstatic` (ver core/pwa.py).
+"""
+import hashlib
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+HASH_LENGTH = 12
+KEEP_NAMES = ("manifest.json",)
+
+# Último segmento del nombre (sin extensión) hexadecimal de ≥12: "<hash>" o "foto.<hash>"
+_HASHED = re.compile(r"(^|\.)[0-9a-f]{%d,64}$" % HASH_LENGTH)
+
+
+def is_immutable(name):
+    """True si `name` lleva el hash de su contenido (la URL nunca cambia de contenido)."""
+    base = posixpath.basename(name)
+    if base in KEEP_NAMES:
+        return False
+    return bool(_HASHED.search(posixpath.splitext(base)[0]))
+
+
+def file_hash(content):
+    sha = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha.update(chunk if isinstance(chunk, bytes) else chunk.encode())
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return sha.hexdigest()[:HASH_LENGTH]
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    def hashed_name(self, name, content):
+        if posixpath.basename(name) in KEEP_NAMES or is_immutable(name):
+            return name
+        stem, ext = posixpath.splitext(name)
+        return f"{stem}.{file_hash(content)}{ext}"
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if is_immutable(name) and self.exists(name):
+            # Mismo hash → mismo contenido: ya está guardado
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+class ServiceWorkerStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    def post_process(self, *args, **kwargs):
+        yield from super().post_process(*args, **kwargs)
+        if kwargs.get("dry_run"):
+            return
+        from . import pwa
+
+        if self.exists(pwa.SW_NAME):
+            self.delete(pwa.SW_NAME)
+        self._save(pwa.SW_NAME, ContentFile(pwa.build(self, self.hashed_files).encode()))
+        yield pwa.SW_NAME, pwa.SW_NAME, True
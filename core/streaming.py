@@ -0,0 +1,122 @@
+# core/streaming.py
+"""
+Respuestas de archivo con peticiones condicionales y por rangos (vídeos).
+
+file_response(request, path):
+- ETag (mtime + tamaño) y Last-Modified → 304 / 412 con las reglas de
+  django.utils.cache.get_conditional_response.
+- `Range: bytes=…` (un solo rango; If-Range respetado) → 206 con
+  Content-Range, o 416 si el rango no cabe en el archivo. Varios rangos a la
+  vez no se soportan: se responde el archivo entero, como permite la RFC.
+- El cuerpo se lee en bloques fijos de CHUNK_SIZE. Cuando se sirve hasta el
+  final del archivo (el caso habitual: `bytes=N-` del <video>) se entrega el
+  propio fichero ya posicionado, y el servidor WSGI puede usar sendfile
+  (wsgi.file_wrapper) sin copiar en Python.
+"""
+import mimetypes
+import os
+import re
+
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    """Lector de `length` bytes de `fh` a partir de `start` (sin fileno: nada de sendfile)."""
+
+    def __init__(self, fh, start, length):
+        fh.seek(start)
+        self.fh = fh
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fh.close()
+
+
+def parse_range(header, size):
+    """
+    (inicio, fin) inclusivos de la cabecera Range, None si no aplica (ausente,
+    varios rangos o malformada) o "unsatisfiable" si queda fuera del archivo.
+    """
+    match = _RANGE.match((header or "").strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:                     # bytes=-N: los últimos N
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+def _if_range_matches(request, etag, mtime):
+    value = request.META.get("HTTP_IF_RANGE")
+    if not value:
+        return True
+    if value.startswith(('"', "W/")):
+        return value == etag          # If-Range exige comparación fuerte
+    date = parse_http_date_safe(value)
+    return date is not None and int(mtime) <= date
+
+
+def file_response(request, path, content_type=None):
+    stat = os.stat(path)
+    size, mtime = stat.st_size, stat.st_mtime
+    etag = f'"{int(mtime):x}-{size:x}"'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+    if not_modified is not None:
+        return not_modified
+
+    if content_type is None:
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    byte_range = None
+    if request.method in ("GET", "HEAD") and _if_range_matches(request, etag, mtime):
+        byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+
+    if byte_range == "unsatisfiable":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    else:
+        fh = open(path, "rb")
+        if byte_range is None:
+            response = FileResponse(fh, content_type=content_type)
+        else:
+            start, end = byte_range
+            if end == size - 1:
+                # Hasta el final: el fichero posicionado sirve tal cual (sendfile)
+                fh.seek(start)
+                response = FileResponse(fh, content_type=content_type, status=206)
+            else:
+                response = FileResponse(
+                    RangeFile(fh, start, end - start + 1), content_type=content_type, status=206
+                )
+                response["Content-Length"] = end - start + 1
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response.block_size = CHUNK_SIZE
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(mtime)
+    return response
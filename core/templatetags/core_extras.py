@@ -0,0 +1,72 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from core import renditions, video
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor):
+    """
+    Querystring actual (filtros, búsqueda…) con ?cursor= reemplazado.
+    Uso: <a href="{% cursor_url page_obj.next_cursor %}">
+    """
+    params = context["request"].GET.copy()
+    params.pop("page", None)
+    params["cursor"] = cursor
+    return f"?{params.urlencode()}"
+
+
+@register.simple_tag
+def rendition(field_file, width, sizes=None):
+    """
+    Atributos src/srcset/sizes de una imagen subida, para ocupar `width` px
+    de ancho como máximo. Uso: <img {% rendition x.cover_image 480 %} alt="…">
+    Sin variantes (GIF, SVG, error) devuelve sólo el src original.
+    """
+    if not field_file:
+        return ""
+    width = int(width)
+    manifest = renditions.get_manifest(field_file)
+    if manifest is None:
+        return format_html('src="{}"', field_file.url)
+    return format_html(
+        'src="{}" srcset="{}" sizes="{}"',
+        renditions.best_url(field_file, manifest["fallback"], width, manifest),
+        renditions.srcset(field_file, "webp", manifest),
+        sizes or f"(max-width: {width}px) 100vw, {width}px",
+    )
+
+
+@register.filter
+def animated_url(field_file):
+    """{{ x.sprite_gif|animated_url }}: WebP animado si existe, si no el GIF."""
+    return renditions.animated_url(field_file)
+
+
+@lru_cache(maxsize=None)
+def _static_exists(path):
+    # Los estáticos sólo cambian al desplegar: basta con mirar una vez
+    return finders.find(path) is not None
+
+
+@register.simple_tag
+def video_variant(path, variant):
+    """
+    URL estática de una variante de vídeo creada con `manage.py
+    build_video_variants` ("poster" o "mobile"), o "" si no existe.
+    Uso: {% video_variant 'videos/hero.mp4' 'poster' as poster %}
+    """
+    name = video.variant_name(path, variant)
+    return static(name) if _static_exists(name) else ""
+
+
+@register.simple_tag
+def static_if_exists(path):
+    """URL estática de `path`, o "" si no existe (archivos generados, p. ej. por build_css)."""
+    return static(path) if _static_exists(path) else ""
@@ -1,3 +1,297 @@
-from django.test import TestCase
+import io
+import posixpath
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models.functions import Coalesce
+from django.template import Context, Template
+from django.test import TestCase, RequestFactory, override_settings
+from PIL import Image
+
+from community.models import Post
+from . import cssbuild, pwa, renditions, search
+from .pagination import CursorPaginator, _encode, paginate_cursor
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("eco", password="x")
+        for i in range(7):
+            Post.objects.create(author=user, title=f"p{i}", body="...")
+
+    def titles(self, page):
+        return [p.title for p in page]
+
+    def test_walks_forward_and_back_without_count(self):
+        paginator = CursorPaginator(Post.objects.all(), 3, ("-created", "-id"))
+
+        with self.assertNumQueries(1):
+            first = paginator.get_page()
+        self.assertEqual(self.titles(first), ["p6", "p5", "p4"])
+        self.assertFalse(first.has_previous())
+
+        second = paginator.get_page(first.next_cursor)
+        third = paginator.get_page(second.next_cursor)
+        self.assertEqual(self.titles(third), ["p0"])
+        self.assertFalse(third.has_next())
+
+        back = paginator.get_page(third.previous_cursor)
+        self.assertEqual(self.titles(back), ["p3", "p2", "p1"])
+        self.assertTrue(back.has_next())
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        request = RequestFactory().get("/", {"cursor": "no-es-un-cursor"})
+        page = paginate_cursor(request, Post.objects.all(), 3)
+        self.assertEqual(self.titles(page), ["p6", "p5", "p4"])
+
+        # Token bien formado con valores que no encajan en las columnas
+        for values in (["zz", "1"], ["2024-01-01T00:00:00", "x"], [[1], 2]):
+            token = _encode(values, "n")
+            page = CursorPaginator(Post.objects.all(), 3).get_page(token)
+            self.assertEqual(self.titles(page), ["p6", "p5", "p4"])
+
+        # Orden por anotación, como NEWS_ORDERING: el tipo sale del output_field
+        annotated = Post.objects.annotate(sort_at=Coalesce("updated", "created"))
+        paginator = CursorPaginator(annotated, 3, ("-sort_at", "-id"))
+        for values in ([True, 1], ["zz", 1], ["2024-01-01T00:00:00", "x"]):
+            page = paginator.get_page(_encode(values, "n"))
+            self.assertEqual(self.titles(page), ["p6", "p5", "p4"])
+        second = paginator.get_page(paginator.get_page().next_cursor)
+        self.assertEqual(self.titles(second), ["p3", "p2", "p1"])
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("eco", password="x")
+
+    def test_index_follows_save_and_removal(self):
+        post = Post.objects.create(author=self.user, title="Guía del árbol", body="Tronco")
+        Post.objects.create(author=self.user, title="Otra cosa", body="nada")
+
+        hits = search.search("arbol")
+        self.assertEqual([(h.kind, h.object_id) for h in hits], [("post", post.pk)])
+        self.assertIn("<mark>", hits[0].snippet + search.search("tronco")[0].snippet)
+        self.assertEqual(hits[0].url, post.get_absolute_url())
+
+        # Reconstrucción por tramos: mismo resultado
+        self.assertEqual(search.rebuild(kinds={"post"}, chunk_size=1), {"post": 2})
+        self.assertEqual([h.object_id for h in search.search("arbol")], [post.pk])
+
+        post.is_removed = True
+        post.save()
+        self.assertEqual(search.search("arbol"), [])
+
+    def test_filter_queryset_and_unsafe_query(self):
+        post = Post.objects.create(author=self.user, title="Sapo jefe", body="...")
+        qs = search.filter_queryset(Post.objects.all(), "post", 'sapo")*')
+        self.assertEqual(list(qs), [post])
+        self.assertFalse(search.filter_queryset(Post.objects.all(), "post", "***").exists())
+
+
+class TempMediaMixin:
+    storage_backend = "django.core.files.storage.FileSystemStorage"
+
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media, STORAGES={
+            "default": {"BACKEND": self.storage_backend,
+                        "OPTIONS": {"location": self.media}},
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class RenditionTests(TempMediaMixin, TestCase):
+    def _post(self, size=(1600, 900), mode="RGB", fmt="JPEG", name="foto.jpg"):
+        # Ruido: con un color liso cualquier variante pesaría casi nada
+        img = Image.merge(mode, [Image.effect_noise(size, 80)] * len(mode))
+        buf = io.BytesIO()
+        img.save(buf, fmt)
+        user = User.objects.create_user(f"pintor{User.objects.count()}", password="x")
+        return Post.objects.create(
+            author=user, title="foto", body="…",
+            image=SimpleUploadedFile(name, buf.getvalue()),
+        )
+
+    def _render(self, post):
+        return Template("{% load core_extras %}<img {% rendition p.image 480 %}>").render(
+            Context({"p": post})
+        )
+
+    def test_variants_are_queued_and_tag_serves_original_meanwhile(self):
+        post = self._post()
+        self.assertEqual(self._render(post), f'<img src="{post.image.url}">')
+        self.assertFalse(post.image.storage.exists(renditions.rendition_dir(post.image.name)))
+
+        call_command("process_media", "--once", stdout=io.StringIO())
+        html = self._render(post)
+        self.assertIn("480.jpg", html)
+        for w in (320, 480, 768, 1200):
+            self.assertIn(f"{w}.webp {w}w", html)
+        self.assertNotIn(post.image.url + '"', html)
+
+        manifest = renditions.get_manifest(post.image)
+        with post.image.storage.open(manifest["formats"]["webp"]["480"]) as fh:
+            self.assertEqual(Image.open(fh).size, (480, 270))
+
+    def test_images_are_never_upscaled(self):
+        manifest = renditions.generate(self._post(size=(400, 300)).image)
+        self.assertEqual(list(manifest["formats"]["webp"]), ["320", "400"])
+
+    def test_heavier_png_fallback_is_skipped(self):
+        post = self._post(size=(800, 600), mode="RGBA", fmt="WEBP", name="foto.webp")
+        manifest = renditions.generate(post.image)
+        self.assertEqual(manifest["fallback"], "png")
+        size = post.image.size
+        for path in manifest["formats"]["png"].values():
+            self.assertLess(post.image.storage.size(path), size)
+        # El PNG a tamaño completo pesa más que el WebP subido: para ese ancho, el original
+        self.assertNotIn("800", manifest["formats"]["png"])
+        self.assertEqual(renditions.best_url(post.image, "png", 800, manifest), post.image.url)
+
+
+class UploadNormalizationTests(TempMediaMixin, TestCase):
+    def _jpeg(self, size, color="teal"):
+        exif = Image.Exif()
+        exif[0x010F] = "Camara"          # Make
+        buf = io.BytesIO()
+        Image.new("RGB", size, color).save(buf, "JPEG", exif=exif)
+        return SimpleUploadedFile("IMG_0001.jpg", buf.getvalue(), content_type="image/jpeg")
+
+    def test_uploads_are_capped_stripped_and_deduplicated(self):
+        user = User.objects.create_user("fotografa", password="x")
+        with self.settings(UPLOAD_IMAGE_MAX_PX=1000):
+            a = Post.objects.create(author=user, title="a", body="…", image=self._jpeg((3000, 1500)))
+            b = Post.objects.create(author=user, title="b", body="…", image=self._jpeg((3000, 1500)))
+
+        self.assertEqual(a.image.name, b.image.name)
+        self.assertRegex(a.image.name, r"^community/posts/\d+/[0-9a-f]{32}\.jpg$")
+        with a.image.storage.open(a.image.name) as fh:
+            img = Image.open(fh)
+            self.assertEqual(img.size, (1000, 500))
+            self.assertFalse(img.getexif())
+
+    def test_replaced_file_is_removed_once_unreferenced(self):
+        user = User.objects.create_user("editor", password="x")
+        post = Post.objects.create(author=user, title="a", body="…", image=self._jpeg((40, 40)))
+        old = post.image.name
+        storage = post.image.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.image = self._jpeg((40, 40), color="red")
+            post.save()
+        self.assertNotEqual(post.image.name, old)
+        self.assertFalse(storage.exists(old))
+        self.assertTrue(storage.exists(post.image.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.get(pk=post.pk).delete()
+        self.assertFalse(storage.exists(post.image.name))
+
+
+class HashedMediaTests(TempMediaMixin, TestCase):
+    storage_backend = "core.storage.HashedFileSystemStorage"
+
+    def test_derived_files_get_content_hashes_and_immutable_headers(self):
+        buf = io.BytesIO()
+        Image.new("RGB", (600, 300), "navy").save(buf, "JPEG")
+        user = User.objects.create_user("archivera", password="x")
+        post = Post.objects.create(
+            author=user, title="foto", body="…",
+            image=SimpleUploadedFile("foto.jpg", buf.getvalue(), content_type="image/jpeg"),
+        )
+        first = renditions.generate(post.image)
+        path = first["formats"]["webp"]["480"]
+        self.assertRegex(path, r"\.renditions/480\.[0-9a-f]{12}\.webp$")
+        # Mismo contenido → mismo nombre, sin copias
+        self.assertEqual(renditions.generate(post.image)["formats"], first["formats"])
+
+        response = self.client.get(post.image.storage.url(path))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+
+        manifest = posixpath.join(renditions.rendition_dir(post.image.name), renditions.MANIFEST)
+        response = self.client.get(post.image.storage.url(manifest))
+        self.assertEqual(response["Cache-Control"], "no-cache")
+
+
+class MediaRangeTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = bytes(range(256)) * 40
+        with open(posixpath.join(self.media, "clip.mp4"), "wb") as fh:
+            fh.write(self.data)
+
+    def get(self, **headers):
+        response = self.client.get("/media/clip.mp4", **headers)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_byte_ranges(self):
+        response, body = self.get(HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.data)}")
+        self.assertEqual(body, self.data[100:200])
+
+        response, body = self.get(HTTP_RANGE="bytes=10000-")
+        self.assertEqual((response.status_code, body), (206, self.data[10000:]))
+        response, body = self.get(HTTP_RANGE="bytes=-5")
+        self.assertEqual(body, self.data[-5:])
+
+        response, _ = self.get(HTTP_RANGE="bytes=999999-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.data)}")
+
+    def test_conditional_requests(self):
+        response, body = self.get()
+        self.assertEqual((response.status_code, body), (200, self.data))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        etag = response["ETag"]
+
+        response, _ = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # If-Range con otro ETag: el archivo cambió, se manda entero
+        response, body = self.get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"otro"')
+        self.assertEqual((response.status_code, len(body)), (200, len(self.data)))
+
+
+class ServiceWorkerTests(TestCase):
+    def test_precache_follows_pattern_priority_within_budget(self):
+        sizes = {"js/app.js": 400, "css/theme.css": 300, "css/big.css": 900,
+                 "js/extra.js": 200, "videos/hero.mp4": 10}
+        chosen = pwa.select_precache(list(sizes), sizes.get, budget=1000)
+        self.assertEqual(chosen, ["css/theme.css", "js/app.js", "js/extra.js"])
+
+    @override_settings(STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    })
+    def test_worker_is_served_for_revalidation(self):
+        response = self.client.get("/service-worker.js")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertIn("const PRECACHE = [", response.content.decode())
+
+
+class CssBuildTests(TestCase):
+    def test_only_known_utilities_grouped_by_screen(self):
+        css, count = cssbuild.generate({"p-4", "text-white/70", "md:grid-cols-3", "hover:bg-red-600", "no-es-clase"})
+        self.assertEqual(count, 4)
+        self.assertIn(r".text-white\/70{color:rgb(255 255 255 / 0.7)}", css)
+        self.assertIn(r".hover\:bg-red-600:hover{", css)
+        media = css.index("@media (min-width:768px)")
+        self.assertGreater(css.index(r".md\:grid-cols-3{"), media)
+        self.assertLess(css.index(".p-4{"), media)
+
+    def test_inset_axis_variants(self):
+        css, count = cssbuild.generate({"inset-x-0", "inset-y-4", "inset-0"})
+        self.assertEqual(count, 3)
+        self.assertIn(".inset-x-0{left:0px;right:0px}", css)
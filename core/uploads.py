@@ -0,0 +1,149 @@
+# core/uploads.py
+"""
+Normalización de subidas y recolección de archivos huérfanos.
+
+Antes de guardar un modelo con archivos nuevos (pre_save, core/signals.py):
+- Las imágenes se giran según EXIF, se reducen a UPLOAD_IMAGE_MAX_PX de
+  lado mayor, pierden los metadatos (EXIF/GPS; se conserva el perfil ICC) y
+  se recodifican en su misma familia (JPEG progresivo, PNG optimizado, WebP).
+  Los GIF (animados) y los archivos que no son imagen se dejan tal cual.
+- Todo archivo se nombra por el hash de su contenido: una subida idéntica
+  a otra del mismo directorio reutiliza el archivo existente sin escribir.
+
+Cuando un campo cambia de archivo o se borra la fila, el archivo anterior se
+elimina (con sus variantes, ver core/renditions.py) si ninguna otra fila lo
+usa ya; se hace tras el commit, para no borrar nada si la transacción falla.
+"""
+import hashlib
+import io
+import posixpath
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import models
+from PIL import Image, ImageOps
+
+UPLOAD_APPS = ("accounts", "community", "news", "codex")
+DEFAULT_MAX_PX = 2560
+JPEG_QUALITY = 85
+WEBP_QUALITY = 82
+HASH_LENGTH = 32
+
+# Familia de salida por formato de entrada (el resto: JPEG, o PNG si hay alfa)
+KEEP_FORMAT = {"JPEG": "JPEG", "MPO": "JPEG", "PNG": "PNG", "WEBP": "WEBP"}
+EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+
+def file_fields(model):
+    return [f for f in model._meta.concrete_fields if isinstance(f, models.FileField)]
+
+
+def upload_models():
+    """[(modelo, [FileField…])] de las apps con subidas de usuarios/editores."""
+    result = []
+    for label in UPLOAD_APPS:
+        for model in apps.get_app_config(label).get_models():
+            fields = file_fields(model)
+            if fields:
+                result.append((model, fields))
+    return result
+
+
+def max_px_for(field):
+    overrides = getattr(settings, "UPLOAD_IMAGE_MAX_PX_OVERRIDES", {})
+    label = f"{field.model._meta.label}.{field.name}"
+    return overrides.get(label, getattr(settings, "UPLOAD_IMAGE_MAX_PX", DEFAULT_MAX_PX))
+
+
+def normalize_image(data, max_px):
+    """(bytes, extensión) recodificados, o None si no es una imagen procesable."""
+    try:
+        img = Image.open(io.BytesIO(data))
+        fmt = img.format
+        if fmt == "GIF":
+            return None
+        img.load()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+    icc = img.info.get("icc_profile")
+    img = ImageOps.exif_transpose(img)
+    has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+    out_fmt = KEEP_FORMAT.get(fmt) or ("PNG" if has_alpha else "JPEG")
+    if out_fmt == "JPEG" and has_alpha:
+        out_fmt = "PNG"
+
+    if max(img.size) > max_px:
+        img.thumbnail((max_px, max_px), Image.LANCZOS)
+
+    buf = io.BytesIO()
+    extra = {"icc_profile": icc} if icc else {}
+    if out_fmt == "JPEG":
+        img.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True, **extra)
+    elif out_fmt == "WEBP":
+        img.save(buf, "WEBP", quality=WEBP_QUALITY, method=4, **extra)
+    else:
+        if img.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        img.save(buf, "PNG", optimize=True, **extra)
+
+    return buf.getvalue(), EXTENSIONS[out_fmt]
+
+
+def content_name(data, ext):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH] + ext.lower()
+
+
+def prepare_upload(instance, field):
+    """
+    Normaliza y renombra por contenido el archivo pendiente de `field`.
+    Si ya existe uno idéntico en el destino, lo reutiliza (no se escribe).
+    """
+    ff = getattr(instance, field.attname)
+    if not ff or ff._committed:
+        return
+
+    ff.file.seek(0)
+    data = ff.file.read()
+    ext = posixpath.splitext(ff.name)[1] or ""
+
+    if isinstance(field, models.ImageField):
+        normalized = normalize_image(data, max_px_for(field))
+        if normalized is not None:
+            data, ext = normalized
+
+    name = content_name(data, ext)
+    target = field.generate_filename(instance, name)
+    if field.storage.exists(target):
+        ff.name = target
+        ff._committed = True
+    else:
+        ff.file = ContentFile(data, name=name)
+        ff.name = name
+
+
+# ─────────────────────────────────────────────────────────────
+# Huérfanos
+# ─────────────────────────────────────────────────────────────
+def is_referenced(name):
+    return any(
+        model._default_manager.filter(**{field.name: name}).exists()
+        for model, fields in upload_models()
+        for field in fields
+    )
+
+
+def collect(storage, names):
+    """Borra de `storage` los `names` que ya no usa ninguna fila (y sus variantes)."""
+    from .renditions import delete_derivatives
+
+    removed = 0
+    for name in set(filter(None, names)):
+        if is_referenced(name):
+            continue
+        delete_derivatives(storage, name)
+        if storage.exists(name):
+            storage.delete(name)
+            removed += 1
+    return removed
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import HomeView, OfflineView
+from .views import HomeView, OfflineView, SearchView
 
 urlpatterns = [
     path('', HomeView.as_view(), name='home'),
+    path('buscar/', SearchView.as_view(), name='search'),
     path('offline/', OfflineView.as_view(), name='offline'),
 ]
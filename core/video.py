@@ -0,0 +1,90 @@
+# core/video.py
+"""
+Utilidades de vídeo: fotograma de póster, variante ligera para móvil y
+comprobación de "faststart" (átomo moov antes de mdat, para que el
+navegador empiece a reproducir sin descargar el archivo entero).
+
+Las variantes se guardan junto al original:
+
+    static/videos/hero.mp4
+    static/videos/hero.poster.jpg     ← primer fotograma útil
+    static/videos/hero.mobile.mp4     ← 480p, ~600 kbps, faststart
+
+El trabajo pesado lo hace ffmpeg (settings.FFMPEG_BINARY); sin él, las
+funciones que lo necesitan devuelven False y las plantillas siguen usando
+el original (ver el tag {% video_variant %}).
+"""
+import os
+import posixpath
+import shutil
+import struct
+import subprocess
+
+from django.conf import settings
+
+VARIANTS = {"poster": ".poster.jpg", "mobile": ".mobile.mp4"}
+MOBILE_HEIGHT = 480
+MOBILE_BITRATE = "600k"
+POSTER_AT = "0.5"    # s: el fotograma 0 suele ser negro
+
+
+def ffmpeg_binary():
+    return shutil.which(getattr(settings, "FFMPEG_BINARY", "ffmpeg"))
+
+
+def variant_name(name, variant):
+    return posixpath.splitext(name)[0] + VARIANTS[variant]
+
+
+def is_variant(name):
+    return any(name.endswith(suffix) for suffix in VARIANTS.values())
+
+
+def moov_first(path):
+    """True si el MP4 lleva el índice (moov) antes de los datos (mdat)."""
+    with open(path, "rb") as fh:
+        while True:
+            header = fh.read(8)
+            if len(header) < 8:
+                return False
+            size, kind = struct.unpack(">I4s", header)
+            if kind == b"moov":
+                return True
+            if kind == b"mdat":
+                return False
+            if size == 1:
+                size = struct.unpack(">Q", fh.read(8))[0] - 8
+            elif size == 0:
+                return False
+            fh.seek(size - 8, os.SEEK_CUR)
+
+
+def _run(args, dst):
+    binary = ffmpeg_binary()
+    if not binary:
+        return False
+    tmp = dst + ".tmp" + posixpath.splitext(dst)[1]
+    cmd = [binary, "-y", "-loglevel", "error", *args, tmp]
+    ok = subprocess.run(cmd, capture_output=True, timeout=600).returncode == 0
+    if ok:
+        os.replace(tmp, dst)
+    elif os.path.exists(tmp):
+        os.remove(tmp)
+    return ok
+
+
+def make_poster(src, dst):
+    return _run(["-ss", POSTER_AT, "-i", src, "-frames:v", "1", "-q:v", "3"], dst)
+
+
+def make_mobile(src, dst, height=MOBILE_HEIGHT, bitrate=MOBILE_BITRATE):
+    return _run([
+        "-i", src, "-an", "-vf", f"scale=-2:'min({height},ih)'",
+        "-c:v", "libx264", "-preset", "slow", "-profile:v", "main", "-pix_fmt", "yuv420p",
+        "-b:v", bitrate, "-maxrate", bitrate, "-bufsize", "2M", "-movflags", "+faststart",
+    ], dst)
+
+
+def make_faststart(path):
+    """Reescribe `path` con moov al principio (sin recodificar)."""
+    return _run(["-i", path, "-c", "copy", "-movflags", "+faststart"], path)
@@ -1,10 +1,54 @@
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse
+from django.utils._os import safe_join
 from django.views.generic import TemplateView
 import json
+import os
+
+from . import pwa, search
+from .storage import is_immutable
+from .streaming import file_response
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
 
 class HomeView(TemplateView):
     template_name = 'core/home.html'
 
+class SearchView(TemplateView):
+    """Búsqueda unificada (/buscar/?q=...&tipo=...) sobre el índice FTS."""
+    template_name = 'core/search.html'
+    per_page = 20
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        q = (self.request.GET.get('q') or '').strip()
+        kind = self.request.GET.get('tipo') or ''
+        if kind not in search.KIND_LABELS:
+            kind = ''
+        try:
+            page = max(int(self.request.GET.get('page') or 1), 1)
+        except ValueError:
+            page = 1
+
+        # Pedimos uno de más para saber si hay siguiente página
+        hits = search.search(
+            q,
+            kinds=[kind] if kind else None,
+            limit=self.per_page + 1,
+            offset=(page - 1) * self.per_page,
+        ) if q else []
+
+        ctx.update({
+            'query': q,
+            'current_kind': kind,
+            'kinds': search.KIND_LABELS,
+            'hits': hits[:self.per_page],
+            'page': page,
+            'has_next': len(hits) > self.per_page,
+        })
+        return ctx
+
 class OfflineView(TemplateView):
     template_name = 'core/offline.html'
 
@@ -29,118 +73,41 @@ class ManifestView(TemplateView):
 
 
 class ServiceWorkerView(TemplateView):
+    """
+    /service-worker.js: el generado por collectstatic (core/pwa.py), con
+    ETag para que la comprobación de actualizaciones del navegador cueste un
+    304. Sin collectstatic (desarrollo) se renderiza con la plantilla.
+    """
     content_type = 'application/javascript'
 
     def get(self, request, *args, **kwargs):
-        js = r"""
-// ========= Nexo SW v4 =========
-// - Cachea páginas HTML que visitas (Inicio, Códex, etc.)
-// - Si se cae la red: primero usa la copia en caché, si no existe muestra /offline/
-// ===============================
-
-const STATIC_CACHE = 'nexo-static-v4';
-const PAGES_CACHE  = 'nexo-pages-v1';
-const OFFLINE_URL  = '/offline/';
-
-// Recursos estáticos mínimos para que la app arranque y la pantalla offline
-const STATIC_ASSETS = [
-  '/',
-  '/offline/',
-  '/static/css/theme.css',
-  '/static/js/app.js'
-];
-
-// -------- INSTALL: precache básico --------
-self.addEventListener('install', event => {
-  event.waitUntil(
-    caches.open(STATIC_CACHE).then(cache => cache.addAll(STATIC_ASSETS))
-  );
-  self.skipWaiting();
-});
-
-// -------- ACTIVATE: limpia versiones viejas --------
-self.addEventListener('activate', event => {
-  event.waitUntil((async () => {
-    const keys = await caches.keys();
-    await Promise.all(
-      keys
-        .filter(k => ![STATIC_CACHE, PAGES_CACHE].includes(k))
-        .map(k => caches.delete(k))
-    );
-
-    // navigationPreload = un pequeño boost en navegaciones
-    if ('navigationPreload' in self.registration) {
-      await self.registration.navigationPreload.enable();
-    }
-
-    await self.clients.claim();
-  })());
-});
-
-// -------- FETCH --------
-self.addEventListener('fetch', event => {
-  const req = event.request;
-
-  // 1) Navegaciones de páginas HTML
-  if (req.mode === 'navigate') {
-    event.respondWith(handleNavigation(event));
-    return;
-  }
-
-  // 2) Archivos estáticos (CSS, JS, imágenes…)
-  if (req.url.includes('/static/')) {
-    event.respondWith(cacheFirst(req));
-  }
-});
-
-// ===== Estrategias =====
-
-// Navegaciones: network-first → cache → offline
-async function handleNavigation(event) {
-  const req = event.request;
-  const pagesCache = await caches.open(PAGES_CACHE);
-
-  try {
-    // a) Si hay navigationPreload, úsalo
-    const preload = await event.preloadResponse;
-    if (preload) {
-      pagesCache.put(req, preload.clone());
-      return preload;
-    }
-
-    // b) Petición normal a red
-    const networkResp = await fetch(req);
-    pagesCache.put(req, networkResp.clone()); // guardamos la copia para el futuro
-    return networkResp;
-
-  } catch (err) {
-    // c) Sin red: intentamos servir la versión cacheada de ESA ruta
-    const cached = await pagesCache.match(req);
-    if (cached) return cached;
-
-    // d) Último recurso: pantalla offline
-    const staticCache = await caches.open(STATIC_CACHE);
-    const offline = await staticCache.match(OFFLINE_URL);
-    return offline || new Response('Sin conexión', {
-      status: 503,
-      statusText: 'Offline'
-    });
-  }
-}
-
-// Estáticos: cache-first con actualización en segundo plano
-async function cacheFirst(req) {
-  const cache = await caches.open(STATIC_CACHE);
-  const cached = await cache.match(req);
-  if (cached) {
-    // Intento de refresco silencioso en background
-    fetch(req).then(resp => cache.put(req, resp.clone())).catch(() => {});
-    return cached;
-  }
-
-  const networkResp = await fetch(req);
-  cache.put(req, networkResp.clone());
-  return networkResp;
-}
-"""
-        return HttpResponse(js, content_type=self.content_type)
+        path = os.path.join(settings.STATIC_ROOT, pwa.SW_NAME)
+        if os.path.isfile(path):
+            response = file_response(request, path, content_type=self.content_type)
+        else:
+            response = HttpResponse(pwa.build_dev(), content_type=self.content_type)
+        # El navegador no debe usar una copia sin preguntar: el worker decide qué se cachea
+        response['Cache-Control'] = 'no-cache'
+        response['Service-Worker-Allowed'] = '/'
+        return response
+
+
+def serve_media(request, path):
+    """
+    Archivos subidos (MEDIA_URL), con Range y peticiones condicionales
+    (core/streaming.py) para que los vídeos se puedan adelantar. Los que
+    llevan el hash de su contenido en el nombre (core/storage.py) se cachean
+    un año sin revalidar; el resto se revalida con ETag / Last-Modified.
+    """
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    response = file_response(request, fullpath)
+    if is_immutable(path):
+        response["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        response["Cache-Control"] = "no-cache"
+    return response
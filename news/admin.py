@@ -1,11 +1,8 @@
 # news/admin.py
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils import timezone
-from django.contrib.auth import get_user_model
 from .models import Category, Tag, NewsArticle
 
-User = get_user_model()
-
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ("name", "slug", "color", "icon")
@@ -20,10 +17,11 @@ class TagAdmin(admin.ModelAdmin):
 
 def publish_and_notify(modeladmin, request, queryset):
     """
-    Publica los artículos seleccionados y envía 1 notificación por usuario.
-    OJO: si tienes muchísimos usuarios, esto puede tardar.
+    Publica los artículos seleccionados y encola un aviso para todos los
+    usuarios. Las notificaciones las crea en lotes el worker
+    `manage.py fanout_notifications`, no esta petición.
     """
-    from accounts.models import Notification  # import local para evitar ciclos
+    from accounts.notifications import broadcast  # import local para evitar ciclos
     now = timezone.now()
 
     for article in queryset:
@@ -31,20 +29,18 @@ def publish_and_notify(modeladmin, request, queryset):
         article.publish_at = article.publish_at or now
         article.save()
 
-    users = User.objects.all().only("id", "username")
-    notices = []
-    for article in queryset:
         title = article.title
         if article.is_patch_notes and article.version:
             msg = f"Nuevas notas de parche {article.version}: {title}"
         else:
             msg = f"Nueva noticia: {title}"
-        for u in users:
-            notices.append(Notification(user=u, message=msg))
-    # Crea en bloques para evitar consumo excesivo de memoria
-    from django.db import transaction
-    with transaction.atomic():
-        Notification.objects.bulk_create(notices, batch_size=1000)
+        broadcast(msg)
+
+    modeladmin.message_user(
+        request,
+        "Artículos publicados. Las notificaciones se enviarán en segundo plano.",
+        messages.SUCCESS,
+    )
 
 publish_and_notify.short_description = "Publicar y notificar a todos"
 
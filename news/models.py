@@ -4,19 +4,15 @@ from django.urls import reverse
 from django.utils.text import slugify
 from django.contrib.auth import get_user_model
 from codex.models import Asset  # reutilizamos las galerías del códex
-import time
 
 User = get_user_model()
 
-def _ts() -> int:
-    return int(time.time())
-
 def upload_news_media(instance, filename):
     slug = getattr(instance, "slug", None)
     if not slug and hasattr(instance, "article") and instance.article:
         slug = instance.article.slug
     slug = slug or "news"
-    return f'news/{slug}/{_ts()}_{filename}'
+    return f'news/{slug}/{filename}'
 
 
 class Category(models.Model):
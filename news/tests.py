@@ -1,3 +1,19 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import NewsArticle
+
+
+class ConditionalGetTests(TestCase):
+    def test_unchanged_list_revalidates_with_304(self):
+        NewsArticle.objects.create(title="Parche 1.2", slug="parche-1-2", status="published")
+        url = "/noticias/"
+        first = self.client.get(url, HTTP_HX_REQUEST="true")
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+
+        again = self.client.get(url, HTTP_HX_REQUEST="true", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+
+        NewsArticle.objects.create(title="Parche 1.3", slug="parche-1-3", status="published")
+        changed = self.client.get(url, HTTP_HX_REQUEST="true", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
@@ -1,12 +1,19 @@
 # news/views.py
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
 from django.db.models import Q
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from urllib.parse import urlparse, parse_qs
 
+from core import search
+from core.pagination import paginate_cursor
 from .models import NewsArticle, Category, Tag
 
+# Orden keyset: publish_at puede ser NULL, así que se pagina sobre
+# sort_at = COALESCE(publish_at, created) + id como desempate.
+NEWS_ORDERING = ("-pin_home", "-sort_at", "-id")
+PATCH_ORDERING = ("-sort_at", "-id")
+
 
 def _youtube_embed(url: str) -> str | None:
     """
@@ -35,7 +42,7 @@ def news_index(request):
                             .prefetch_related("tags") \
                             .filter(Q(status="published") |
                                     (Q(status="scheduled") & Q(publish_at__lte=timezone.now()))) \
-                            .order_by("-pin_home", "-publish_at", "-created")
+                            .annotate(sort_at=Coalesce("publish_at", "created"))
 
     cat_slug = request.GET.get("categoria")
     tag_slug = request.GET.get("tag")
@@ -46,9 +53,11 @@ def news_index(request):
     if tag_slug:
         qs = qs.filter(tags__slug=tag_slug)
     if q:
-        qs = qs.filter(Q(title__icontains=q) | Q(summary__icontains=q) | Q(body__icontains=q))
+        qs = search.filter_queryset(qs, "news", q)
 
-    p = Paginator(qs, 9).get_page(request.GET.get("page"))
+    p = paginate_cursor(request, qs, 9, NEWS_ORDERING)
+    if request.htmx:
+        return render(request, "news/_article_list.html", {"page_obj": p})
 
     ctx = {
         "page_obj": p,
@@ -79,6 +88,8 @@ def news_detail(request, slug):
 
 
 def patch_notes(request):
-    qs = NewsArticle.objects.filter(is_patch_notes=True, status="published").order_by("-publish_at", "-created")
-    p = Paginator(qs, 12).get_page(request.GET.get("page"))
-    return render(request, "news/patch_notes.html", {"page_obj": p})
+    qs = NewsArticle.objects.filter(is_patch_notes=True, status="published") \
+                            .annotate(sort_at=Coalesce("publish_at", "created"))
+    p = paginate_cursor(request, qs, 12, PATCH_ORDERING)
+    template = "news/_patch_list.html" if request.htmx else "news/patch_notes.html"
+    return render(request, template, {"page_obj": p})
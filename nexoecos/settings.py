@@ -21,6 +21,8 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # runserver sirve /static/ con WhiteNoise (Range para los vídeos)
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
 
     # App Codex con configuración (para cargar señales)
@@ -43,6 +45,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # estáticos en prod
+    # ETag de contenido en las respuestas que no lo traen → 304 al revalidar (service worker)
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
 
     'django.middleware.locale.LocaleMiddleware',
@@ -51,6 +55,8 @@ MIDDLEWARE = [
     'django_htmx.middleware.HtmxMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Cookie con la marca del usuario para el service worker (no va en el HTML cacheado)
+    'core.middleware.UserMarkerCookieMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -98,17 +104,64 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Django 4.2+ STORAGES (evita InvalidStorageError)
 STORAGES = {
     "default": {
-        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        # Nombres con el hash del contenido → URLs inmutables (core/storage.py)
+        "BACKEND": "core.storage.HashedFileSystemStorage",
         "OPTIONS": {
             "location": MEDIA_ROOT,
             "base_url": MEDIA_URL,
         },
     },
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        # Manifest + compresión de WhiteNoise, y genera el service worker (core/pwa.py)
+        "BACKEND": "core.storage.ServiceWorkerStaticFilesStorage",
     },
 }
 
+# Bytes máximos que el service worker descarga al instalarse (core/pwa.py)
+PWA_PRECACHE_BUDGET = 2 * 1024 * 1024
+
+# ================== CSS ==================
+# `manage.py build_css` (core/cssbuild.py): copia local de fontawesome-free
+# (css/all.css + webfonts/) para generar static/css/icons.css sin CDN.
+FONTAWESOME_SOURCE = os.environ.get("FONTAWESOME_SOURCE", str(BASE_DIR / "vendor" / "fontawesome-free"))
+
+# ================== IMÁGENES ==================
+# Subidas (core/uploads.py): lado mayor máximo en px; el avatar se muestra pequeño
+UPLOAD_IMAGE_MAX_PX = 2560
+UPLOAD_IMAGE_MAX_PX_OVERRIDES = {
+    "accounts.Profile.avatar": 512,
+}
+
+# GIF de animaciones del Códex → mp4/webm (codex/media.py); sin ffmpeg sólo WebP animado
+FFMPEG_BINARY = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+# Procesar animaciones y variantes de imagen en la propia petición (tras el
+# commit) en vez de encolarlas para `manage.py process_media`. Sólo desarrollo.
+CODEX_MEDIA_INLINE = os.environ.get("CODEX_MEDIA_INLINE", "") == "1"
+
+# ================== BÚSQUEDA ==================
+# Índice FTS5 de SQLite (core/search.py). Para Postgres: backend tsvector.
+SEARCH_BACKEND = "core.search.SQLiteFTS5Backend"
+
+# ================== CACHÉ ==================
+# Local-memory por defecto. Con varios procesos (gunicorn, workers) usa una
+# caché compartida para que la invalidación del Códex llegue a todos:
+#   CACHE_BACKEND=file  CACHE_LOCATION=/var/tmp/nexo-cache
+#   CACHE_BACKEND=redis CACHE_LOCATION=redis://127.0.0.1:6379/1
+_CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+CACHES = {
+    "default": {
+        "BACKEND": _CACHE_BACKENDS[os.environ.get("CACHE_BACKEND", "locmem")],
+        "LOCATION": os.environ.get("CACHE_LOCATION", "nexo-default"),
+    },
+}
+
+# Segundos que vive una página del Códex renderizada (la invalidación es por versión)
+CODEX_CACHE_TIMEOUT = 24 * 60 * 60
+
 # ================== AUTENTICACIÓN / REDIRECTS ==================
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'core:home'
@@ -119,6 +172,10 @@ LOGOUT_REDIRECT_URL = 'core:home'
 FIREBASE_SERVICE_ACCOUNT = BASE_DIR / "config" / "firebase-service-account.json"
 FIREBASE_PROJECT_ID = "integradora-300c3"
 
+# Backend de sincronización del Códex: "firestore" | "in-memory" | "null"
+# (el cliente de Firebase sólo se crea cuando el worker lo usa)
+CODEX_SYNC_BACKEND = os.environ.get("CODEX_SYNC_BACKEND", "firestore")
+
 # ================== SEGURIDAD EXTRA ==================
 CSRF_TRUSTED_ORIGINS = [
     'https://*.pythonanywhere.com',
@@ -1,11 +1,10 @@
 # urls.py (raíz del proyecto)
 
 from django.contrib import admin as dj_admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
 
-from core.views import ManifestView, ServiceWorkerView, OfflineView
+from core.views import ManifestView, ServiceWorkerView, OfflineView, serve_media
 from core.admin_site import nexo_admin_site  # AdminSite sólo superusuarios
 
 # Clonar registros del admin “normal”
@@ -30,6 +29,7 @@ urlpatterns = [
     path("offline/", OfflineView.as_view(), name="offline"),
 ]
 
-# Media en desarrollo
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Media con cabeceras de caché (un servidor delante puede servir la misma ruta)
+urlpatterns += [
+    re_path(r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"), serve_media, name="media"),
+]
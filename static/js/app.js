@@ -5,6 +5,18 @@ if ("serviceWorker" in navigator) {
     .catch((err) => {
       console.warn("[SW] Registro falló", err);
     });
+
+  // Cambio de usuario (login/logout): las páginas guardadas por el SW son de otro.
+  // La marca viene en la cookie "nexo_user" (core/middleware.py), no en el HTML cacheado.
+  document.addEventListener("DOMContentLoaded", () => {
+    const match = document.cookie.match(/(?:^|;\s*)nexo_user=([^;]*)/);
+    const user = match ? match[1] : "";
+    if (localStorage.getItem("nexo-user") === user) return;
+    localStorage.setItem("nexo-user", user);
+    navigator.serviceWorker.ready.then((reg) => {
+      if (reg.active) reg.active.postMessage({ type: "clear-pages" });
+    });
+  });
 }
 
 // ================== PWA Install (nav, hero, footer) ==================
@@ -234,8 +246,13 @@ document.addEventListener("DOMContentLoaded", () => {
     const ioVideo = new IntersectionObserver((entries) => {
       entries.forEach((e) => {
         if (!e.isIntersecting) return;
-        const mp4  = heroVideo.getAttribute("data-src-mp4");
-        const webm = heroVideo.getAttribute("data-src-webm");
+        let mp4  = heroVideo.getAttribute("data-src-mp4");
+        let webm = heroVideo.getAttribute("data-src-webm");
+        // Pantallas pequeñas / ahorro de datos: variante ligera si existe
+        const mobile = heroVideo.getAttribute("data-src-mobile");
+        const light = window.matchMedia("(max-width: 768px)").matches ||
+                      (navigator.connection && navigator.connection.saveData);
+        if (mobile && light) { mp4 = mobile; webm = null; }
         if (mp4 || webm) {
           if (webm) {
             const sWebm = document.createElement("source");
@@ -253,6 +270,7 @@ document.addEventListener("DOMContentLoaded", () => {
           }
           heroVideo.removeAttribute("data-src-mp4");
           heroVideo.removeAttribute("data-src-webm");
+          heroVideo.removeAttribute("data-src-mobile");
         }
         ioVideo.unobserve(heroVideo);
       });
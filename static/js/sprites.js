@@ -0,0 +1,75 @@
+// ================== Sprites desde atlas ==================
+// Reproduce en <canvas data-sprite="clave"> las animaciones empaquetadas por
+// codex/spritesheet.py: una sola imagen (data-atlas) + metadatos JSON
+// (json_script con id data-meta). Si falta la animación, usa data-fallback.
+(function () {
+  const players = document.querySelectorAll("canvas[data-sprite]");
+  if (!players.length) return;
+
+  const atlases = {};   // url -> Promise<HTMLImageElement>
+
+  function loadAtlas(url) {
+    if (!atlases[url]) {
+      atlases[url] = new Promise((resolve, reject) => {
+        const img = new Image();
+        img.decoding = "async";
+        img.onload = () => resolve(img);
+        img.onerror = reject;
+        img.src = url;
+      });
+    }
+    return atlases[url];
+  }
+
+  function fallback(canvas) {
+    const src = canvas.dataset.fallback;
+    if (!src) return canvas.remove();
+    const img = document.createElement("img");
+    img.src = src;
+    img.alt = canvas.getAttribute("aria-label") || "";
+    img.style.cssText = canvas.style.cssText;
+    canvas.replaceWith(img);
+  }
+
+  const reduceMotion = window.matchMedia("(prefers-reduced-motion: reduce)").matches;
+
+  players.forEach((canvas) => {
+    const metaEl = document.getElementById(canvas.dataset.meta);
+    const meta = metaEl ? JSON.parse(metaEl.textContent) : null;
+    const anim = meta && meta.animations && meta.animations[canvas.dataset.sprite];
+    if (!anim) return fallback(canvas);
+
+    canvas.width = meta.frame_w;
+    canvas.height = meta.frame_h;
+    const ctx = canvas.getContext("2d");
+    ctx.imageSmoothingEnabled = false;   // pixel-art nítido
+
+    loadAtlas(canvas.dataset.atlas).then((atlas) => {
+      let i = 0;
+      let last = 0;
+
+      function draw(index) {
+        const [x, y, w, h, ox, oy] = meta.frames[anim.frames[index]];
+        ctx.clearRect(0, 0, canvas.width, canvas.height);
+        ctx.drawImage(atlas, x, y, w, h, ox, oy, w, h);
+      }
+
+      draw(0);
+      if (reduceMotion || anim.frames.length < 2) return;
+
+      function tick(now) {
+        if (now - last >= anim.durations[i]) {
+          last = now;
+          i += 1;
+          if (i >= anim.frames.length) {
+            if (!anim.loop) return;
+            i = 0;
+          }
+          draw(i);
+        }
+        requestAnimationFrame(tick);
+      }
+      requestAnimationFrame(tick);
+    }).catch(() => fallback(canvas));
+  });
+})();
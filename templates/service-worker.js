@@ -1,60 +1,201 @@
-/* simple progressive service worker */
-const CACHE_STATIC = 'nexo-static-v3';
-const CORE_ASSETS = [
-  '/', '/offline/',
-  '/static/css/theme.css',
-  '/static/js/app.js',
-  '/static/icons/favicon.ico',
-  '/static/icons/favicon.svg',
+{% autoescape off %}// ========= Nexo SW =========
+// Generado por `collectstatic` (core/pwa.py): no editar el de STATIC_ROOT.
+// - Precaché: estáticos con hash en el nombre (nunca cambian de contenido).
+//   Un despliegue sólo descarga los que cambiaron y borra los que sobran.
+// - Páginas HTML: caché LRU acotada (PAGES_MAX_ENTRIES) con TTL por ruta
+//   (PAGE_ROUTES). Códex y noticias: stale-while-revalidate, revalidando con
+//   el ETag de Django (If-None-Match → 304 sin HTML). Comunidad y resto:
+//   red primero. Sin red: la copia en caché o /offline/.
+// ===========================
+
+// Cambia con la lista de precaché → el navegador instala el worker nuevo
+const VERSION      = '{{ version }}';
+const STATIC_CACHE = 'nexo-static';
+const RUNTIME_CACHE = 'nexo-runtime';
+const PAGES_CACHE  = 'nexo-pages-v2';
+const OFFLINE_URL  = '/offline/';
+const RUNTIME_MAX_ENTRIES = 60;
+const PAGES_MAX_ENTRIES = 50;
+const CACHED_AT = 'sw-cached-at';
+
+const MINUTE = 60 * 1000, HOUR = 60 * MINUTE;
+// Primera que encaje. ttl: cuánto se sirve una copia sin esperar a la red
+// (pasado, se va a la red; la copia sólo se usa sin conexión).
+// "network": ni se guarda (páginas personales / admin).
+const PAGE_ROUTES = [
+  { prefix: '/codex/',     strategy: 'swr',          ttl: 24 * HOUR },
+  { prefix: '/noticias/',  strategy: 'swr',          ttl: 30 * MINUTE },
+  { prefix: '/comunidad/', strategy: 'networkFirst' },
+  { prefix: '/accounts/',  strategy: 'network' },
+  { prefix: '/admin/',     strategy: 'network' },
+  { prefix: '/',           strategy: 'networkFirst' },
 ];
+// false en desarrollo (sin collectstatic): URLs sin hash → red primero
+const HASHED = {{ hashed|yesno:"true,false" }};
+
+const PRECACHE = {{ precache }};
 
-self.addEventListener('install', (e) => {
-  e.waitUntil(caches.open(CACHE_STATIC).then(c => c.addAll(CORE_ASSETS)));
+// -------- INSTALL: sólo lo que aún no está en caché --------
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(STATIC_CACHE);
+    const have = new Set((await cache.keys()).map(r => new URL(r.url).pathname));
+    const missing = PRECACHE.filter(url => url === OFFLINE_URL || !have.has(url));
+    await cache.addAll(missing.map(url => new Request(url, { cache: 'reload' })));
+  })());
   self.skipWaiting();
 });
 
-self.addEventListener('activate', (e) => {
-  e.waitUntil(
-    caches.keys().then(keys =>
-      Promise.all(keys.filter(k => k !== CACHE_STATIC).map(k => caches.delete(k)))
-    )
-  );
-  self.clients.claim();
+// -------- ACTIVATE: borra cachés y entradas de versiones viejas --------
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    const keep = [STATIC_CACHE, RUNTIME_CACHE, PAGES_CACHE];
+    const keys = await caches.keys();
+    await Promise.all(keys.filter(k => !keep.includes(k)).map(k => caches.delete(k)));
+
+    const wanted = new Set(PRECACHE);
+    const cache = await caches.open(STATIC_CACHE);
+    const stale = (await cache.keys()).filter(r => !wanted.has(new URL(r.url).pathname));
+    await Promise.all(stale.map(r => cache.delete(r)));
+
+    // Sin navigationPreload: pediría la página entera aunque haya copia
+    // válida; con stale-while-revalidate la revalidación es condicional (304)
+    if ('navigationPreload' in self.registration) {
+      await self.registration.navigationPreload.disable();
+    }
+
+    await self.clients.claim();
+  })());
 });
 
-// Network-first para documentos HTML
-async function networkFirst(req) {
-  try {
-    const fresh = await fetch(req);
-    const cache = await caches.open(CACHE_STATIC);
-    cache.put(req, fresh.clone());
-    return fresh;
-  } catch {
-    const cached = await caches.match(req);
-    if (cached) return cached;
-    if (req.mode === 'navigate') return caches.match('/offline/');
-    throw new Error('offline');
+// -------- FETCH --------
+self.addEventListener('fetch', event => {
+  const req = event.request;
+  if (req.method !== 'GET') return;
+
+  // 1) Navegaciones de páginas HTML
+  if (req.mode === 'navigate') {
+    event.respondWith(handleNavigation(event));
+    return;
   }
+
+  // 2) Archivos estáticos (CSS, JS, imágenes…)
+  const url = new URL(req.url);
+  if (url.origin === self.location.origin && url.pathname.startsWith('/static/')) {
+    event.respondWith(cacheFirst(req));
+  }
+});
+
+// ===== Estrategias =====
+
+function routeFor(url) {
+  return PAGE_ROUTES.find(r => url.pathname.startsWith(r.prefix));
 }
 
-// Stale-while-revalidate para estáticos
-async function swr(req) {
-  const cache = await caches.open(CACHE_STATIC);
-  const cached = await cache.match(req);
-  const network = fetch(req)
-    .then(res => { cache.put(req, res.clone()); return res; })
-    .catch(() => null);
-  return cached || network || Response.error();
+function isFresh(resp, ttl) {
+  const at = Number(resp.headers.get(CACHED_AT) || 0);
+  return Date.now() - at < ttl;
 }
 
-self.addEventListener('fetch', (e) => {
-  const req = e.request;
-  const url = new URL(req.url);
-  if (req.method !== 'GET') return;
+// Guarda una copia con la hora de guardado (para el TTL). put() mueve la
+// entrada al final: keys() queda en orden de uso → LRU.
+async function storePage(cache, req, resp) {
+  const headers = new Headers(resp.headers);
+  headers.set(CACHED_AT, String(Date.now()));
+  const body = await resp.blob();
+  await cache.put(req, new Response(body, { status: resp.status, statusText: resp.statusText, headers }));
+  await trimCache(cache, PAGES_MAX_ENTRIES);
+}
+
+function cacheable(resp) {
+  return resp && resp.ok && resp.type === 'basic' && !resp.redirected &&
+         !/no-store|private/.test(resp.headers.get('Cache-Control') || '');
+}
+
+async function offlineResponse() {
+  const staticCache = await caches.open(STATIC_CACHE);
+  const offline = await staticCache.match(OFFLINE_URL);
+  return offline || new Response('Sin conexión', {
+    status: 503,
+    statusText: 'Offline'
+  });
+}
 
-  if (req.headers.get('accept')?.includes('text/html')) {
-    e.respondWith(networkFirst(req));
-  } else if (url.pathname.startsWith('/static/')) {
-    e.respondWith(swr(req));
+// Pide la página con el ETag de la copia: 304 → sólo se renueva su hora
+async function revalidate(cache, req, cached) {
+  const headers = new Headers();
+  const etag = cached && cached.headers.get('ETag');
+  if (etag) headers.set('If-None-Match', etag);
+  const resp = await fetch(req.url, { headers, credentials: 'include', cache: 'no-store' });
+
+  if (resp.status === 304 && cached) {
+    await storePage(cache, req, cached);
+  } else if (cacheable(resp)) {
+    await storePage(cache, req, resp);
+  }
+}
+
+async function handleNavigation(event) {
+  const req = event.request;
+  const route = routeFor(new URL(req.url)) || { strategy: 'network' };
+
+  if (route.strategy === 'network') {
+    try {
+      return await fetch(req);
+    } catch (err) {
+      return offlineResponse();
+    }
+  }
+
+  const cache = await caches.open(PAGES_CACHE);
+  const cached = await cache.match(req, { ignoreVary: true });
+
+  // Stale-while-revalidate: la copia al momento y revalidación en segundo plano
+  if (route.strategy === 'swr' && cached && isFresh(cached, route.ttl)) {
+    event.waitUntil(revalidate(cache, req, cached.clone()).catch(() => {}));
+    return cached;
+  }
+
+  // Red primero (o copia caducada): red → copia → offline
+  try {
+    const resp = await fetch(req);
+    if (cacheable(resp)) event.waitUntil(storePage(cache, req, resp.clone()));
+    return resp;
+  } catch (err) {
+    return cached || offlineResponse();
+  }
+}
+
+// Al cambiar de usuario (login/logout) las páginas guardadas no valen
+self.addEventListener('message', event => {
+  if (event.data && event.data.type === 'clear-pages') {
+    event.waitUntil(caches.delete(PAGES_CACHE));
   }
 });
+
+// Estáticos: cache-first. Las URLs llevan el hash del contenido, así que lo
+// cacheado nunca está viejo: no hace falta refrescarlo.
+async function cacheFirst(req) {
+  const cached = await caches.match(req);
+  if (cached && HASHED) return cached;
+
+  try {
+    const networkResp = await fetch(req);
+    if (networkResp.ok) {
+      const cache = await caches.open(RUNTIME_CACHE);
+      await cache.put(req, networkResp.clone());
+      trimCache(cache, RUNTIME_MAX_ENTRIES);
+    }
+    return networkResp;
+  } catch (err) {
+    if (cached) return cached;
+    throw err;
+  }
+}
+
+// Borra las entradas más antiguas (keys() devuelve en orden de inserción)
+async function trimCache(cache, max) {
+  const keys = await cache.keys();
+  await Promise.all(keys.slice(0, Math.max(0, keys.length - max)).map(k => cache.delete(k)));
+}
+{% endautoescape %}